@@ -0,0 +1,135 @@
+import logging
+import os
+import sys
+import threading
+import time
+from sqlalchemy import text
+from . import crud, models, schemas
+from .database import SessionLocal, engine
+from .migrations import run_migrations, status
+
+logger = logging.getLogger(__name__)
+
+# Startup Bootstrap
+# Schema migrations and the initial Super Admin (a bcrypt hash on first run).
+# STARTUP_BOOTSTRAP selects where they run:
+#   background - on a thread once the server is up; API requests get 503 until it is done (default)
+#   sync       - when app.main is imported, before the server accepts requests
+#   off        - not in the web process; run `python -m app.bootstrap` as a release step
+# Background workers (audit flusher, reconcilers, NDU outbox) start after it.
+# In background mode a failed bootstrap (e.g. the database is not reachable
+# yet) is retried with exponential backoff, up to BOOTSTRAP_RETRY_MAX_SECONDS
+# between attempts, until it succeeds.
+# /healthz only says the process is alive; /readyz says bootstrap has finished
+# and the database answers.
+SYNC, BACKGROUND, OFF = "sync", "background", "off"
+MODES = (SYNC, BACKGROUND, OFF)
+STARTUP_BOOTSTRAP = os.getenv("STARTUP_BOOTSTRAP", BACKGROUND).strip().lower()
+if STARTUP_BOOTSTRAP not in MODES:
+    raise ValueError(f"Unknown STARTUP_BOOTSTRAP mode: {STARTUP_BOOTSTRAP}")
+BOOTSTRAP_RETRY_MAX_SECONDS = float(os.getenv("BOOTSTRAP_RETRY_MAX_SECONDS", "30"))
+
+def ensure_admin():
+    db = SessionLocal()
+    try:
+        if crud.get_user_by_username(db, "admin"):
+            logger.info("Super Admin already exists.")
+            return
+        logger.info("Creating Initial Super Admin...")
+        admin_data = schemas.UserCreate(
+            username="admin",
+            password="admin123",
+            full_name="Administrator",
+            role=models.Role.SUPER_ADMIN
+        )
+        crud.create_user(db, admin_data)
+        db.commit()
+        logger.info("Super Admin Created: admin / admin123")
+    finally:
+        db.close()
+
+def bootstrap() -> list[str]:
+    """Apply pending migrations and create the initial Super Admin."""
+    logger.info("Applying database migrations...")
+    applied = run_migrations(engine)
+    logger.info("Database schema is up to date.")
+    ensure_admin()
+    return applied
+
+class BootstrapState:
+    def __init__(self, retry_delay: float = 1.0, retry_max: float = BOOTSTRAP_RETRY_MAX_SECONDS):
+        self.ready = threading.Event()
+        self.error = None
+        self.duration_ms = None
+        self.attempts = 0
+        self.retry_delay = retry_delay
+        self.retry_max = retry_max
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run(self, then=None) -> bool:
+        started = time.perf_counter()
+        self.attempts += 1
+        try:
+            bootstrap()
+        except Exception as e:
+            self.error = str(e)
+            logger.error(f"Startup bootstrap failed (DB connection?): {e}")
+            return False
+        self.error = None
+        self.duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.ready.set()
+        if then is not None:
+            then()
+        return True
+
+    def run_until_ready(self, then=None):
+        delay = self.retry_delay
+        while not self.run(then):
+            logger.info(f"Retrying startup bootstrap in {delay:g}s")
+            if self._stop.wait(delay):
+                return
+            delay = min(delay * 2, self.retry_max)
+
+    def start(self, then=None):
+        # Background mode: `then` runs on the bootstrap thread once it succeeds
+        self._thread = threading.Thread(target=self.run_until_ready, args=(then,), name="bootstrap", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def readiness(self) -> dict:
+        checks = {}
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            checks["database"] = True
+        except Exception:
+            checks["database"] = False
+        if STARTUP_BOOTSTRAP == OFF and checks["database"] and not self.ready.is_set():
+            # Ready once a release step has applied every migration
+            try:
+                if all(applied for _, applied in status(engine)):
+                    self.ready.set()
+            except Exception as e:
+                logger.error(f"Schema status check failed: {e}")
+        checks["bootstrap"] = self.ready.is_set()
+        result = {"ready": all(checks.values()), "mode": STARTUP_BOOTSTRAP, "checks": checks, "bootstrap_ms": self.duration_ms, "attempts": self.attempts}
+        if self.error:
+            result["error"] = self.error
+        return result
+
+state = BootstrapState()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        applied = bootstrap()
+    except Exception as e:
+        logger.error(f"Bootstrap failed: {e}")
+        sys.exit(1)
+    print(f"{len(applied)} migration(s) applied")
@@ -1,20 +1,41 @@
-from sqlalchemy.orm import Session
+from functools import lru_cache
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 from . import models, schemas
-from passlib.context import CryptContext
+from .database import after_commit
+from .pagination import encode_cursor, decode_cursor
+from .services.search import apply_text_search
+from .services import changes, ledger, rollups, stats, versions
+from .services.principal_cache import principal_cache
+from .services.audit_writer import audit_writer
+from .services.serialization import row_dicts, schema_columns
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+INVENTORY_UNIQUE_FIELDS = ("kit_id", "serial_number", "qr_code")
+
+class DuplicateKeyError(ValueError):
+    """An inventory item reuses a unique key (INVENTORY_UNIQUE_FIELDS)."""
+    def __init__(self, field: str, value):
+        super().__init__(f"Duplicate {field}: {value}")
+        self.field = field
+        self.value = value
+
+# passlib (and its bcrypt backend) load on the first login, not at startup
+@lru_cache(maxsize=None)
+def pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
 
-# Audit Helper
+# Audit Helper (buffering is governed by AUDIT_WRITE_MODE, see services/audit_writer.py)
+# Like every helper here it never commits; the request's unit of work does.
 def log_audit(db: Session, user_id: int | None, action: str, details: str):
-    audit = models.AuditLog(user_id=user_id, action=action, details=details)
-    db.add(audit)
-    db.commit()
+    audit_writer.submit(db, user_id, action, details)
 
 def get_user_by_username(db: Session, username: str):
     return db.query(models.User).filter(models.User.username == username).first()
@@ -28,48 +49,123 @@ def create_user(db: Session, user: schemas.UserCreate):
         full_name=user.full_name
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    db.flush()
+    versions.bump(db, models.User)
     # No current_user context here easily available during init, skipping audit for init usually
     return db_user
 
-def get_inventory(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.InventoryItem).offset(skip).limit(limit).all()
+def update_user(db: Session, user: models.User, update: schemas.UserUpdate, actor_id: int):
+    updates = {field: value for field, value in update.model_dump(exclude_unset=True).items() if getattr(user, field) != value}
+    if not updates:
+        return user
+    for field, value in updates.items():
+        setattr(user, field, value)
+    if "role" in updates or "is_active" in updates:
+        # Revoke tokens issued under the old role/status
+        user.token_version = (user.token_version or 0) + 1
+    db.flush()
+    versions.bump(db, models.User)
+    after_commit(db, lambda: principal_cache.invalidate(user.username))
 
-def create_inventory_item(db: Session, item: schemas.InventoryCreate, user_id: int):
-    # Check if kit_id exists
-    existing = db.query(models.InventoryItem).filter(models.InventoryItem.kit_id == item.kit_id).first()
-    if existing:
-        raise Exception(f"Kit ID {item.kit_id} already exists")
+    log_audit(db, actor_id, "UPDATE_USER", f"Updated User {user.username} ({', '.join(updates)})")
+    return user
+
+def delete_user(db: Session, user: models.User):
+    username = user.username
+    db.delete(user)
+    db.flush()
+    versions.bump(db, models.User)
+    after_commit(db, lambda: principal_cache.invalidate(username))
+
+def filter_inventory(db: Session, filters: schemas.InventoryFilter, columns: list | None = None):
+    # `columns` selects plain rows instead of ORM instances (fast list path)
+    query = db.query(*columns) if columns else db.query(models.InventoryItem)
+    for field in ("status", "category", "state", "district", "institution", "batch_id"):
+        value = getattr(filters, field)
+        if value is not None:
+            query = query.filter(getattr(models.InventoryItem, field) == value)
+    if filters.q:
+        query = apply_text_search(query, filters.q, db.get_bind().dialect.name)
+    return query
 
+def get_inventory(db: Session, filters: schemas.InventoryFilter, skip: int = 0, limit: int = 100, cursor: str | None = None, columns: list | None = None):
+    # Keyset pagination on id; `skip` is kept for older clients
+    query = filter_inventory(db, filters, columns).order_by(models.InventoryItem.id)
+    if cursor:
+        last_id = decode_cursor(cursor).get("id")
+        if not isinstance(last_id, int):
+            raise ValueError("Invalid cursor")
+        query = query.filter(models.InventoryItem.id > last_id)
+    elif skip:
+        query = query.offset(skip)
+
+    items = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor({"id": items[-1].id})
+    return items, next_cursor
+
+def create_inventory_item(db: Session, item: schemas.InventoryCreate, user_id: int):
     db_item = models.InventoryItem(**item.model_dump())
     db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    # The unique constraints catch duplicates, concurrent ones included; the
+    # failed flush leaves the transaction to be rolled back by the caller
+    try:
+        db.flush()
+    except IntegrityError as e:
+        field = next((field for field in INVENTORY_UNIQUE_FIELDS if field in str(e.orig)), "kit_id")
+        raise DuplicateKeyError(field, getattr(item, field))
+    stats.inventory_created(db, [db_item.status])
+    rollups.items_created(db, [db_item])
+    changes.record(db, models.InventoryItem, [db_item.id])
     
     # Log Strict Transaction (RFP Clause 4.4)
-    location_str = f"{item.state}/{item.district or '-'}/{item.institution or '-'}"
-    transaction = models.InventoryTransaction(
-        kit_id=item.kit_id,
-        action_type="INITIAL_ALLOCATION",
-        from_location="VENDOR",
-        to_location=location_str,
-        user_id=user_id
-    )
-    db.add(transaction)
-    db.commit()
+    db.add(models.InventoryTransaction(**ledger.stamp(db, [ledger.ledger_row(db_item, ledger.INITIAL_ALLOCATION, "VENDOR", user_id)])[0]))
 
     log_audit(db, user_id, "CREATE_INVENTORY", f"Created Item {item.name} (Kit ID: {item.kit_id})")
     return db_item
 
-def get_trainings(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.TrainingProgram).offset(skip).limit(limit).all()
+def get_trainings(db: Session, skip: int = 0, limit: int = 100, expand: schemas.TrainingExpand = schemas.TrainingExpand.PARTICIPANTS):
+    # selectinload keeps a listing at 1 query per level instead of 1 + N + N*M lazy loads
+    query = db.query(models.TrainingProgram)
+    if expand == schemas.TrainingExpand.BATCHES:
+        query = query.options(selectinload(models.TrainingProgram.batches))
+    elif expand == schemas.TrainingExpand.PARTICIPANTS:
+        query = query.options(selectinload(models.TrainingProgram.batches).selectinload(models.Batch.participants))
+    return query.order_by(models.TrainingProgram.id).offset(skip).limit(limit).all()
+
+def get_training_rows(db: Session, skip: int = 0, limit: int = 100, expand: schemas.TrainingExpand = schemas.TrainingExpand.PARTICIPANTS):
+    # Fast list path: plain dicts assembled from one Core query per level
+    Training, Batch, Participant = models.TrainingProgram, models.Batch, models.Participant
+    trainings = row_dicts(db.query(*schema_columns(Training, schemas.TrainingSummary)).order_by(Training.id).offset(skip).limit(limit))
+    if expand == schemas.TrainingExpand.NONE or not trainings:
+        return trainings
+
+    batches = row_dicts(db.query(*schema_columns(Batch, schemas.BatchSummary))
+                        .filter(Batch.training_id.in_([training["id"] for training in trainings])).order_by(Batch.id))
+    if expand == schemas.TrainingExpand.PARTICIPANTS:
+        participants_by_batch = {batch["id"]: [] for batch in batches}
+        if batches:
+            participants = db.query(*schema_columns(Participant, schemas.Participant)) \
+                .filter(Participant.batch_id.in_(list(participants_by_batch))).order_by(Participant.id)
+            for participant in row_dicts(participants):
+                participants_by_batch[participant["batch_id"]].append(participant)
+        for batch in batches:
+            batch["participants"] = participants_by_batch[batch["id"]]
+
+    batches_by_training = {training["id"]: [] for training in trainings}
+    for batch in batches:
+        batches_by_training[batch["training_id"]].append(batch)
+    for training in trainings:
+        training["batches"] = batches_by_training[training["id"]]
+    return trainings
 
 def create_training(db: Session, training: schemas.TrainingCreate, user_id: int):
     db_training = models.TrainingProgram(**training.model_dump())
     db.add(db_training)
-    db.commit()
-    db.refresh(db_training)
+    db.flush()
+    changes.record(db, models.TrainingProgram, [db_training.id])
     
     log_audit(db, user_id, "CREATE_TRAINING", f"Created Program {training.title}")
     return db_training
@@ -78,18 +174,49 @@ def delete_inventory_item(db: Session, item_id: int, user_id: int):
     item = db.query(models.InventoryItem).filter(models.InventoryItem.id == item_id).first()
     if item:
         details = f"Deleted Item {item.name} (Kit ID: {item.kit_id})"
+        db.add(models.InventoryTransaction(**ledger.stamp(db, [
+            {"kit_id": item.kit_id, "action_type": ledger.REMOVE, "from_location": ledger.location(item), "user_id": user_id}
+        ])[0]))
         db.delete(item)
-        db.commit()
+        stats.inventory_deleted(db, item.status)
+        rollups.item_deleted(db, item)
+        changes.record(db, models.InventoryItem, [item.id], changes.DELETE)
         log_audit(db, user_id, "DELETE_INVENTORY", details)
         return True
     return False
 
+def create_batch(db: Session, batch: schemas.BatchCreate, user_id: int):
+    db_batch = models.Batch(**batch.model_dump())
+    db.add(db_batch)
+    db.flush()
+    stats.batch_created(db)
+    versions.bump(db, models.Batch)
+
+    log_audit(db, user_id, "CREATE_BATCH", f"Created Batch {batch.name} for Training {batch.training_id}")
+    return db_batch
+
+def enroll_participants(db: Session, batch: models.Batch, participants: list[schemas.ParticipantCreate], user_id: int):
+    db_participants = [models.Participant(**participant.model_dump(), batch_id=batch.id) for participant in participants]
+    db.add_all(db_participants)
+    # Keep the program's headline count in step with enrolment
+    db.query(models.TrainingProgram).filter(models.TrainingProgram.id == batch.training_id).update(
+        {models.TrainingProgram.participants_count: func.coalesce(models.TrainingProgram.participants_count, 0) + len(db_participants)}
+    )
+    db.flush()
+    versions.bump(db, models.Participant)
+    changes.record(db, models.TrainingProgram, [batch.training_id])
+
+    log_audit(db, user_id, "ENROLL_PARTICIPANTS", f"Enrolled {len(db_participants)} participant(s) in Batch {batch.name}")
+    return db_participants
+
 def delete_training(db: Session, training_id: int, user_id: int):
     training = db.query(models.TrainingProgram).filter(models.TrainingProgram.id == training_id).first()
     if training:
         details = f"Deleted Program {training.title}"
         db.delete(training)
-        db.commit()
+        # Its batches are detached (training_id set to NULL) on flush
+        versions.bump(db, models.Batch)
+        changes.record(db, models.TrainingProgram, [training_id], changes.DELETE)
         log_audit(db, user_id, "DELETE_TRAINING", details)
         return True
     return False
@@ -1,8 +1,13 @@
-from sqlalchemy import create_engine
+import logging
+import os
+import threading
+import time
+from sqlalchemy import create_engine, event, exc
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
-import os
+logger = logging.getLogger(__name__)
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./sql_app.db")
 
@@ -10,13 +15,146 @@ SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./sql_app.db")
 if SQLALCHEMY_DATABASE_URL.startswith("postgres://"):
     SQLALCHEMY_DATABASE_URL = SQLALCHEMY_DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+IS_SQLITE = SQLALCHEMY_DATABASE_URL.startswith("sqlite")
+IS_SQLITE_MEMORY = IS_SQLITE and (":memory:" in SQLALCHEMY_DATABASE_URL or SQLALCHEMY_DATABASE_URL.rstrip("/") == "sqlite:")
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+# Engine Profile (see .env.example)
+# Sync endpoints run on anyio's threadpool (THREADPOOL_LIMIT threads), and each
+# one may hold a connection, so the pool is sized to match: pool_size +
+# max_overflow covers every worker thread plus a little headroom for the
+# background jobs (audit flusher, counter reconciler).
+THREADPOOL_LIMIT = int(os.getenv("THREADPOOL_LIMIT", "40"))
+BACKGROUND_CONNECTIONS = 4
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", str(max(0, THREADPOOL_LIMIT + BACKGROUND_CONNECTIONS - DB_POOL_SIZE))))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", not IS_SQLITE)
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL", # Readers no longer block the writer
+    "synchronous": "NORMAL", # Safe with WAL; fsync at checkpoints instead of every commit
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")), # Wait for the write lock instead of "database is locked"
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": -int(os.getenv("SQLITE_CACHE_SIZE_KB", str(64 * 1024))), # Negative = KiB
+}
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.waits = 0 # Checkouts that took longer than 1ms
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, counter: str):
+        # connects / invalidations / timeouts; pool events fire on many threads
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            if seconds > 0.001:
+                self.waits += 1
+
+    def metrics(self, pool) -> dict:
+        live = {}
+        if isinstance(pool, QueuePool):
+            live = {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(0, pool.overflow()), # SQLAlchemy counts from -pool_size
+                "max_overflow": DB_MAX_OVERFLOW,
+            }
+        with self._lock:
+            return {
+                **live,
+                "pool_class": type(pool).__name__,
+                "threadpool_limit": THREADPOOL_LIMIT,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "slow_checkouts": self.waits,
+                "avg_checkout_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_checkout_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+pool_stats = PoolStats()
+
+class InstrumentedQueuePool(QueuePool):
+    # Times every checkout (including waits for a free connection)
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_stats.record("timeouts")
+            raise
+        finally:
+            pool_stats.record_wait(time.perf_counter() - started)
+
+engine_options = {"pool_pre_ping": DB_POOL_PRE_PING}
 connect_args = {}
-if "sqlite" in SQLALCHEMY_DATABASE_URL:
+if IS_SQLITE:
     connect_args = {"check_same_thread": False}
+if not IS_SQLITE_MEMORY:
+    engine_options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args=connect_args
+    SQLALCHEMY_DATABASE_URL, connect_args=connect_args, **engine_options
 )
+
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    pool_stats.record("connects")
+    if IS_SQLITE:
+        cursor = dbapi_connection.cursor()
+        for pragma, value in SQLITE_PRAGMAS.items():
+            if pragma == "journal_mode" and IS_SQLITE_MEMORY:
+                continue
+            cursor.execute(f"PRAGMA {pragma}={value}")
+        cursor.close()
+
+@event.listens_for(engine, "invalidate")
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    pool_stats.record("invalidations")
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
+
+# Unit of Work hooks
+# Request sessions are committed once by the get_db dependency. Side effects that
+# must only happen if that commit succeeds (cache invalidation, notifications)
+# are registered here and run after it; a rollback discards them.
+def after_commit(db: Session, callback):
+    db.info.setdefault("after_commit", []).append(callback)
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session: Session):
+    for callback in session.info.pop("after_commit", []):
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"after_commit callback failed: {e}")
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit(session: Session):
+    session.info.pop("after_commit", None)
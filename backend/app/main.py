@@ -1,21 +1,22 @@
 import logging
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base, SessionLocal
-from .routers import auth, inventory, training, content, integration, dashboard
-from . import crud, schemas, models
+from fastapi.responses import JSONResponse
+import anyio
+from .database import SessionLocal, THREADPOOL_LIMIT
+from .routers import auth, audit, changes, inventory, training, content, integration, dashboard, system
+from .bootstrap import BACKGROUND, STARTUP_BOOTSTRAP, SYNC, state as bootstrap_state
+from .services import attendance, audit_storage, ledger, ndu, rollups, stats, utilization
+from .services.audit_writer import audit_writer
 
 # Configure Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create Tables (Simplistic migration)
-try:
-    logger.info("Initializing database tables...")
-    Base.metadata.create_all(bind=engine)
-    logger.info("Database tables initialized successfully.")
-except Exception as e:
-    logger.error(f"Database initialization failed: {e}")
+# Migrations and the initial Super Admin (see app/bootstrap.py)
+if STARTUP_BOOTSTRAP == SYNC:
+    bootstrap_state.run()
 
 app = FastAPI(title="Project SAMARTH API", version="1.0.0")
 
@@ -26,31 +27,66 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+# Buffered audit events are flushed before the response in "request" mode
+@app.middleware("http")
+async def flush_audit_events(request: Request, call_next):
+    response = await call_next(request)
+    if audit_writer.flushes_per_request and audit_writer.queue_depth:
+        await run_in_threadpool(audit_writer.flush)
+    return response
+
+@app.on_event("startup")
+async def configure_threadpool():
+    # Sync endpoints share this limiter; the DB pool is sized against it
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_LIMIT
+
+# Until a background bootstrap finishes the schema may be missing
+@app.middleware("http")
+async def wait_for_bootstrap(request: Request, call_next):
+    if STARTUP_BOOTSTRAP == BACKGROUND and not bootstrap_state.ready.is_set() and request.url.path.startswith("/api/"):
+        return JSONResponse({"detail": "Service is starting"}, status_code=503, headers={"Retry-After": "1"})
+    return await call_next(request)
+
+def start_workers():
+    audit_writer.start()
+
+    # Dashboard counter reconciliation (seeds counters on first run)
+    app.state.stats_reconciler = stats.Reconciler(SessionLocal, jobs=(stats.reconcile, attendance.reconcile, rollups.reconcile))
+    app.state.stats_reconciler.start()
+
+    # Periodic stock snapshots for point-in-time inventory queries, then the
+    # daily utilization metrics (which start from those snapshots)
+    app.state.stock_snapshotter = stats.Reconciler(SessionLocal, interval=ledger.STOCK_SNAPSHOT_CHECK_SECONDS, jobs=(ledger.snapshot_if_due, utilization.refresh), name="stock-snapshotter")
+    app.state.stock_snapshotter.start()
+
+    # Audit partition roll-over and archiving
+    app.state.audit_retention = stats.Reconciler(SessionLocal, interval=audit_storage.AUDIT_RETENTION_CHECK_SECONDS, jobs=(audit_storage.maintain,), name="audit-retention")
+    app.state.audit_retention.start()
+
+    # NDU outbox delivery (drains anything left over from the previous run)
+    ndu.outbox_worker.start()
+
 @app.on_event("startup")
 def startup_event():
     logger.info("Application starting up...")
-    try:
-        db = SessionLocal()
-        try:
-            user = crud.get_user_by_username(db, "admin")
-            if not user:
-                logger.info("Creating Initial Super Admin...")
-                admin_data = schemas.UserCreate(
-                    username="admin",
-                    password="admin123",
-                    full_name="Administrator",
-                    role=models.Role.SUPER_ADMIN
-                )
-                crud.create_user(db, admin_data)
-                logger.info("Super Admin Created: admin / admin123")
-            else:
-                logger.info("Super Admin already exists.")
-        finally:
-            db.close()
-    except Exception as e:
-        logger.error(f"Startup event failed (DB connection?): {e}")
+    if STARTUP_BOOTSTRAP == BACKGROUND:
+        bootstrap_state.start(then=start_workers)
+    else:
+        start_workers()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    # Workers never started if a background bootstrap did not finish
+    bootstrap_state.stop()
+    for name in ("stats_reconciler", "stock_snapshotter", "audit_retention"):
+        if hasattr(app.state, name):
+            getattr(app.state, name).stop()
+    ndu.outbox_worker.stop()
+    ndu.close_gateway()
+    audit_writer.stop()
 
 # Include Routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
@@ -59,7 +95,21 @@ app.include_router(training.router, prefix="/api/v1/training", tags=["training"]
 app.include_router(content.router, prefix="/api/v1/content", tags=["content"])
 app.include_router(integration.router, prefix="/api/v1/integration", tags=["integration"])
 app.include_router(dashboard.router, prefix="/api/v1/dashboard", tags=["dashboard"])
+app.include_router(system.router, prefix="/api/v1/system", tags=["system"])
+app.include_router(audit.router, prefix="/api/v1/audit", tags=["audit"])
+app.include_router(changes.router, prefix="/api/v1/changes", tags=["changes"])
 
 @app.get("/")
 def read_root():
     return {"message": "Project SAMARTH API is running"}
+
+# Liveness: the process is up (no I/O)
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+# Readiness: bootstrap finished and the database answers
+@app.get("/readyz")
+def readyz():
+    result = bootstrap_state.readiness()
+    return JSONResponse(result, status_code=200 if result["ready"] else 503)
@@ -0,0 +1,74 @@
+import importlib
+import logging
+import pkgutil
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, select, text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+# Versioned Schema Migrations
+# Each module named vNNNN_<name>.py in this package defines `upgrade(conn)`.
+# Pending versions run in order, each in its own transaction, and are recorded
+# in schema_migrations. Migrations must be idempotent (IF NOT EXISTS /
+# checkfirst) because databases created by the old create_all bootstrap already
+# contain some of the objects they add.
+#
+#   python -m app.migrations            apply pending migrations
+#   python -m app.migrations status     list applied / pending versions
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations", _metadata,
+    Column("version", Integer, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("applied_at", DateTime(timezone=True), server_default=func.now()),
+)
+
+# Arbitrary constant shared by every app worker (Postgres advisory lock key)
+_PG_LOCK_KEY = 7_020_001
+
+def discover() -> list[tuple[int, str, object]]:
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        name = module_info.name
+        if not (name.startswith("v") and name[1:5].isdigit()):
+            continue
+        module = importlib.import_module(f"{__name__}.{name}")
+        migrations.append((int(name[1:5]), name, module))
+    return sorted(migrations, key=lambda migration: migration[0])
+
+def applied_versions(conn: Connection) -> set[int]:
+    _metadata.create_all(conn, checkfirst=True)
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+def _apply(conn: Connection, version: int, name: str, module):
+    if conn.dialect.name == "postgresql":
+        # Serialize concurrent workers starting at the same time
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PG_LOCK_KEY})
+        if version in applied_versions(conn):
+            return False
+    module.upgrade(conn)
+    conn.execute(schema_migrations.insert().values(version=version, name=name))
+    return True
+
+def run_migrations(engine: Engine, target: int | None = None) -> list[str]:
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+
+    applied = []
+    for version, name, module in discover():
+        if target is not None and version > target:
+            break
+        if version in done:
+            continue
+        logger.info(f"Applying migration {name}...")
+        with engine.begin() as conn:
+            if _apply(conn, version, name, module):
+                applied.append(name)
+    if applied:
+        logger.info(f"Applied {len(applied)} migration(s): {', '.join(applied)}")
+    return applied
+
+def status(engine: Engine) -> list[tuple[str, bool]]:
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+    return [(name, version in done) for version, name, _ in discover()]
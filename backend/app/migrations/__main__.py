@@ -0,0 +1,14 @@
+import logging
+import sys
+from ..database import engine
+from . import run_migrations, status
+
+logging.basicConfig(level=logging.INFO)
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["status"]:
+        for name, applied in status(engine):
+            print(f"[{'x' if applied else ' '}] {name}")
+    else:
+        applied = run_migrations(engine)
+        print(f"{len(applied)} migration(s) applied")
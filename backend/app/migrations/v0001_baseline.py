@@ -0,0 +1,12 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from .. import models
+from ..database import Base
+
+# Baseline: the schema previously created by Base.metadata.create_all at startup,
+# plus the users.token_version column that create_all could not add in place.
+
+def upgrade(conn: Connection):
+    Base.metadata.create_all(conn, checkfirst=True)
+    if "token_version" not in {column["name"] for column in inspect(conn).get_columns(models.User.__tablename__)}:
+        conn.execute(text("ALTER TABLE users ADD COLUMN token_version INTEGER NOT NULL DEFAULT 0"))
@@ -0,0 +1,7 @@
+from sqlalchemy.engine import Connection
+from ..services.search import init_inventory_search
+
+# FTS5 trigram table + sync triggers (SQLite) / pg_trgm GIN index (Postgres)
+
+def upgrade(conn: Connection):
+    init_inventory_search(conn)
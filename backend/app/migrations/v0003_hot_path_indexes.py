@@ -0,0 +1,29 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# Indexes for the hot read paths:
+#   audit_logs(timestamp, id)            recent activity, newest first
+#   inventory(status, id)                status filters + keyset pages, per-status counts
+#   inventory(batch_id)                  utilization / batch correlation
+#   inventory(state, district, institution, id)  location hierarchy filters
+#   content_items(category)              per-category counters
+#   content_items(ndu_reference_id)      NDU lookups
+#   content_items(id) WHERE ndu_reference_id IS NULL   pending-sync (partial)
+#   attendance(participant_id, date)     attendance per participant/day
+# Partial indexes are supported by both SQLite and Postgres.
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_audit_logs_timestamp_id ON audit_logs (timestamp, id)",
+    "CREATE INDEX IF NOT EXISTS ix_inventory_status_id ON inventory (status, id)",
+    "CREATE INDEX IF NOT EXISTS ix_inventory_batch_id ON inventory (batch_id)",
+    "CREATE INDEX IF NOT EXISTS ix_inventory_location ON inventory (state, district, institution, id)",
+    "CREATE INDEX IF NOT EXISTS ix_content_items_category ON content_items (category)",
+    "CREATE INDEX IF NOT EXISTS ix_content_items_ndu_reference_id ON content_items (ndu_reference_id)",
+    "CREATE INDEX IF NOT EXISTS ix_content_items_pending_sync ON content_items (id) WHERE ndu_reference_id IS NULL",
+    "CREATE INDEX IF NOT EXISTS ix_attendance_participant_date ON attendance (participant_id, date)",
+]
+
+def upgrade(conn: Connection):
+    for ddl in INDEXES:
+        conn.execute(text(ddl))
+    # Refresh planner statistics so the new indexes are picked up immediately
+    conn.execute(text("ANALYZE"))
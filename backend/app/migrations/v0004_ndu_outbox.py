@@ -0,0 +1,7 @@
+from sqlalchemy.engine import Connection
+from .. import models
+
+# Outbox table for asynchronous NDU synchronization (services/ndu.py)
+
+def upgrade(conn: Connection):
+    models.NduOutbox.__table__.create(conn, checkfirst=True)
@@ -0,0 +1,20 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from .. import models
+
+# Attendance is upserted per (participant, batch, day): keep the latest mark of
+# any duplicates, then enforce uniqueness. Column order serves the per-batch/day
+# lookups; per-participant reads use ix_attendance_participant_date (v0003).
+# The aggregate tables are seeded by the startup reconciler.
+
+def upgrade(conn: Connection):
+    conn.execute(text(
+        "DELETE FROM attendance WHERE id NOT IN "
+        "(SELECT max(id) FROM attendance GROUP BY participant_id, batch_id, date)"
+    ))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ux_attendance_batch_date_participant "
+        "ON attendance (batch_id, date, participant_id)"
+    ))
+    models.ParticipantAttendanceStat.__table__.create(conn, checkfirst=True)
+    models.BatchAttendanceStat.__table__.create(conn, checkfirst=True)
@@ -0,0 +1,25 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from .. import models
+
+# Stock ledger (services/ledger.py): each inventory_transactions row carries the
+# kit's position after the movement, and stock_snapshots hold periodic copies of
+# every position. Until now the ledger only held INITIAL_ALLOCATION rows and no
+# API moved kits, so existing rows are backfilled from the current positions.
+# The first snapshot is taken by the background snapshotter.
+POSITION_COLUMNS = {"status": "VARCHAR", "state": "VARCHAR", "district": "VARCHAR", "institution": "VARCHAR", "batch_id": "INTEGER"}
+
+def upgrade(conn: Connection):
+    existing = {column["name"] for column in inspect(conn).get_columns(models.InventoryTransaction.__tablename__)}
+    for name, type_ in POSITION_COLUMNS.items():
+        if name not in existing:
+            conn.execute(text(f"ALTER TABLE inventory_transactions ADD COLUMN {name} {type_}"))
+
+    conn.execute(text(
+        "UPDATE inventory_transactions SET "
+        + ", ".join(f"{name} = (SELECT inventory.{name} FROM inventory WHERE inventory.kit_id = inventory_transactions.kit_id)" for name in POSITION_COLUMNS)
+        + " WHERE status IS NULL"
+    ))
+
+    models.StockSnapshot.__table__.create(conn, checkfirst=True)
+    models.StockSnapshotItem.__table__.create(conn, checkfirst=True)
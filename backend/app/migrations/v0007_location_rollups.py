@@ -0,0 +1,19 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from .. import models
+
+# Kit counts per location node (services/rollups.py), seeded from inventory with
+# one GROUP BY per level so drill-downs work straight after the upgrade
+LEVEL_COLUMNS = ("state", "district", "institution")
+
+def upgrade(conn: Connection):
+    models.LocationRollup.__table__.create(conn, checkfirst=True)
+    if conn.execute(text("SELECT count(*) FROM location_rollups")).scalar():
+        return
+    for level in range(len(LEVEL_COLUMNS) + 1):
+        path = [f"COALESCE({column}, '')" if index < level else "''" for index, column in enumerate(LEVEL_COLUMNS)]
+        conn.execute(text(
+            "INSERT INTO location_rollups (level, state, district, institution, status, category, count) "
+            f"SELECT {level}, {', '.join(path)}, COALESCE(status, ''), COALESCE(category, ''), count(*) "
+            "FROM inventory GROUP BY 2, 3, 4, 5, 6"
+        ))
@@ -0,0 +1,11 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from .. import models
+
+# Daily utilization metrics (services/utilization.py), backfilled by the
+# background refresh. The timestamp index lets it read one day of the ledger
+# at a time.
+
+def upgrade(conn: Connection):
+    models.UtilizationDaily.__table__.create(conn, checkfirst=True)
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_inventory_transactions_timestamp ON inventory_transactions (timestamp)"))
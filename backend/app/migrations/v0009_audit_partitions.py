@@ -0,0 +1,50 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from .. import models
+from ..services.audit_storage import add_months, create_native_partition, month_start
+
+# Monthly audit partitions (services/audit_storage.py).
+# Postgres: audit_logs is rebuilt as a table partitioned by RANGE (timestamp),
+# with one partition per month that has rows, the next month, and a DEFAULT
+# partition as a safety net. The primary key becomes (id, timestamp) because a
+# partitioned table's keys must include the partition column; ids still come
+# from the same sequence.
+# SQLite: nothing to convert; the maintenance job rolls the hot table into
+# monthly tables.
+
+def _upgrade_postgres(conn: Connection):
+    if conn.execute(text("SELECT 1 FROM pg_class WHERE relname = 'audit_logs' AND relkind = 'p'")).first():
+        return
+    conn.execute(text("ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned"))
+    conn.execute(text("ALTER INDEX IF EXISTS ix_audit_logs_timestamp_id RENAME TO ix_audit_logs_unpartitioned_timestamp_id"))
+    conn.execute(text("ALTER INDEX IF EXISTS ix_audit_logs_id RENAME TO ix_audit_logs_unpartitioned_id"))
+    conn.execute(text(
+        "CREATE TABLE audit_logs ("
+        "id INTEGER NOT NULL DEFAULT nextval('audit_logs_id_seq'), "
+        "action VARCHAR, details TEXT, user_id INTEGER REFERENCES users (id), "
+        "timestamp TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(), "
+        "PRIMARY KEY (id, timestamp)"
+        ") PARTITION BY RANGE (timestamp)"
+    ))
+    conn.execute(text("ALTER SEQUENCE audit_logs_id_seq OWNED BY audit_logs.id"))
+    conn.execute(text("CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT"))
+
+    oldest, newest = conn.execute(text("SELECT min(timestamp), max(timestamp) FROM audit_logs_unpartitioned")).one()
+    now = conn.execute(text("SELECT now()")).scalar()
+    month = month_start(oldest or now)
+    last = add_months(month_start(max(newest or now, now)), 1)
+    while month <= last:
+        create_native_partition(conn, month)
+        month = add_months(month, 1)
+
+    conn.execute(text(
+        "INSERT INTO audit_logs (id, action, details, user_id, timestamp) "
+        "SELECT id, action, details, user_id, COALESCE(timestamp, now()) FROM audit_logs_unpartitioned"
+    ))
+    conn.execute(text("DROP TABLE audit_logs_unpartitioned"))
+    conn.execute(text("CREATE INDEX ix_audit_logs_timestamp_id ON audit_logs (timestamp, id)"))
+
+def upgrade(conn: Connection):
+    if conn.dialect.name == "postgresql":
+        _upgrade_postgres(conn)
+    models.AuditArchive.__table__.create(conn, checkfirst=True)
@@ -0,0 +1,23 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from ..services.audit_storage import PARTITION_PATTERN, partition_table
+
+# Composite indexes for the audit trail search (services/audit_search.py):
+#   audit_logs(user_id, timestamp, id)   one user's activity, newest first
+#   audit_logs(action, timestamp, id)    one action type, newest first
+# On Postgres the indexes are created on the partitioned table and cascade to
+# every partition; on SQLite the monthly tables rolled so far get them too.
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_audit_logs_user_timestamp_id ON audit_logs (user_id, timestamp, id)",
+    "CREATE INDEX IF NOT EXISTS ix_audit_logs_action_timestamp_id ON audit_logs (action, timestamp, id)",
+]
+
+def upgrade(conn: Connection):
+    for ddl in INDEXES:
+        conn.execute(text(ddl))
+    if conn.dialect.name != "postgresql":
+        for name in inspect(conn).get_table_names():
+            if PARTITION_PATTERN.match(name):
+                for index in partition_table(name).indexes:
+                    index.create(conn, checkfirst=True)
+    conn.execute(text("ANALYZE audit_logs"))
@@ -0,0 +1,8 @@
+from sqlalchemy.engine import Connection
+from .. import models
+
+# Per-table version counters behind the list endpoints' ETags
+# (services/versions.py). Tables start at version 0.
+
+def upgrade(conn: Connection):
+    models.TableVersion.__table__.create(conn, checkfirst=True)
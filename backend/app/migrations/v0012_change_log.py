@@ -0,0 +1,25 @@
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Connection
+from .. import models
+from ..services.changes import ENTITIES, UPSERT
+
+# Change feed log (services/changes.py). Existing rows are logged as upserts so
+# that a client starting from since=0 receives a full copy.
+
+def upgrade(conn: Connection):
+    models.ChangeLog.__table__.create(conn, checkfirst=True)
+    Log, Version = models.ChangeLog, models.TableVersion
+    if conn.execute(select(func.count()).select_from(Log)).scalar():
+        return
+
+    seq = 0
+    for name, (model, _) in ENTITIES.items():
+        ids = list(conn.execute(select(model.id).order_by(model.id)).scalars())
+        for start in range(0, len(ids), 5000):
+            conn.execute(insert(Log), [
+                {"seq": seq + offset + 1, "entity": name, "entity_id": entity_id, "op": UPSERT}
+                for offset, entity_id in enumerate(ids[start:start + 5000], start=start)
+            ])
+        seq += len(ids)
+    conn.execute(Version.__table__.delete().where(Version.name == Log.__tablename__))
+    conn.execute(insert(Version).values(name=Log.__tablename__, version=seq))
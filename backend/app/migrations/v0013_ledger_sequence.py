@@ -0,0 +1,21 @@
+from sqlalchemy import func, inspect, insert, select, text
+from sqlalchemy.engine import Connection
+from .. import models
+
+# Commit-ordered ledger sequence (services/ledger.py). Ids are assigned at
+# INSERT, so a transaction that commits late can hold a smaller id than rows a
+# snapshot already covers; seq is allocated under a locked counter row instead.
+# Existing rows keep their order (seq = id) and snapshots their watermark.
+
+def upgrade(conn: Connection):
+    Tx, Snapshot, Version = models.InventoryTransaction, models.StockSnapshot, models.TableVersion
+    for table in (Tx.__tablename__, Snapshot.__tablename__):
+        if "seq" not in {column["name"] for column in inspect(conn).get_columns(table)}:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN seq INTEGER"))
+    conn.execute(text("UPDATE inventory_transactions SET seq = id WHERE seq IS NULL"))
+    conn.execute(text("UPDATE stock_snapshots SET seq = transaction_id WHERE seq IS NULL"))
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_inventory_transactions_seq ON inventory_transactions (seq)"))
+
+    last = conn.execute(select(func.coalesce(func.max(Tx.seq), 0))).scalar()
+    conn.execute(Version.__table__.delete().where(Version.name == Tx.__tablename__))
+    conn.execute(insert(Version).values(name=Tx.__tablename__, version=last))
@@ -0,0 +1,18 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from .. import models
+
+# Ledger rows and snapshot items carry the kit's category with its position, so
+# utilization (services/utilization.py) no longer loads the inventory table to
+# group by category. Existing rows are backfilled from inventory; rows of kits
+# deleted since keep NULL, which is grouped as '' as before.
+
+def upgrade(conn: Connection):
+    for model in (models.InventoryTransaction, models.StockSnapshotItem):
+        table = model.__tablename__
+        if "category" not in {column["name"] for column in inspect(conn).get_columns(table)}:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN category VARCHAR"))
+        conn.execute(text(
+            f"UPDATE {table} SET category = (SELECT inventory.category FROM inventory WHERE inventory.kit_id = {table}.kit_id)"
+            " WHERE category IS NULL"
+        ))
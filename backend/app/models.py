@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Enum, Text
+from sqlalchemy import Boolean, Column, Date, ForeignKey, Index, Integer, String, DateTime, Enum, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -17,6 +17,7 @@ class User(Base):
     role = Column(String) # Stored as string, validated as Enum in Schema
     full_name = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0") # Bumped to revoke issued tokens
 
 class InventoryItem(Base):
     __tablename__ = "inventory"
@@ -47,11 +48,88 @@ class InventoryTransaction(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     kit_id = Column(String, index=True) # Link by Kit ID
-    action_type = Column(String) # ALLOCATE, RETURN, CONSUME, TRANSFER
+    action_type = Column(String) # INITIAL_ALLOCATION, ALLOCATE, RETURN, CONSUME, TRANSFER, REMOVE
     from_location = Column(String, nullable=True)
     to_location = Column(String, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    # Allocated in commit order (ledger.stamp); ids follow INSERT order instead
+    seq = Column(Integer, nullable=True)
+
+    # Position of the kit after this movement (replayed for point-in-time queries)
+    status = Column(String, nullable=True)
+    category = Column(String, nullable=True)
+    state = Column(String, nullable=True)
+    district = Column(String, nullable=True)
+    institution = Column(String, nullable=True)
+    batch_id = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index("ix_inventory_transactions_timestamp", "timestamp"),
+        Index("ix_inventory_transactions_seq", "seq", unique=True),
+    )
+
+# Kit counts per location node and (status, category); level 0 is national,
+# 1 state, 2 district, 3 institution. Unused key parts are '' (not NULL, so
+# they can be part of the primary key)
+class LocationRollup(Base):
+    __tablename__ = "location_rollups"
+
+    level = Column(Integer, primary_key=True)
+    state = Column(String, primary_key=True, default="")
+    district = Column(String, primary_key=True, default="")
+    institution = Column(String, primary_key=True, default="")
+    status = Column(String, primary_key=True, default="")
+    category = Column(String, primary_key=True, default="")
+    count = Column(Integer, nullable=False, default=0)
+
+# Daily utilization per (category, batch), filled from the ledger by
+# services/utilization.py. Stock columns count kits at the end of the day, so
+# summing them over a range gives kit-days; batch_id 0 is kits not in a batch
+class UtilizationDaily(Base):
+    __tablename__ = "utilization_daily"
+
+    day = Column(Date, primary_key=True)
+    category = Column(String, primary_key=True, default="")
+    batch_id = Column(Integer, primary_key=True, default=0)
+    kits = Column(Integer, nullable=False, default=0) # In service (not consumed)
+    allocated = Column(Integer, nullable=False, default=0)
+    active = Column(Integer, nullable=False, default=0) # Allocated and within the batch's dates
+    idle = Column(Integer, nullable=False, default=0) # AVAILABLE
+    allocations = Column(Integer, nullable=False, default=0) # ALLOCATE movements that day
+    returns = Column(Integer, nullable=False, default=0) # RETURN movements that day
+
+    __table_args__ = (
+        Index("ix_utilization_daily_batch_day", "batch_id", "day"),
+    )
+
+# Stock snapshots: every kit's position as of ledger row `transaction_id`, whose
+# seq is the watermark: every ledger row up to it is included, none after it
+class StockSnapshot(Base):
+    __tablename__ = "stock_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    transaction_id = Column(Integer, nullable=False)
+    seq = Column(Integer, nullable=True)
+    taken_at = Column(DateTime(timezone=True), nullable=False, index=True) # Timestamp of that ledger row
+    items = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class StockSnapshotItem(Base):
+    __tablename__ = "stock_snapshot_items"
+
+    snapshot_id = Column(Integer, ForeignKey("stock_snapshots.id", ondelete="CASCADE"), primary_key=True)
+    kit_id = Column(String, primary_key=True)
+    status = Column(String, nullable=True)
+    category = Column(String, nullable=True)
+    state = Column(String, nullable=True)
+    district = Column(String, nullable=True)
+    institution = Column(String, nullable=True)
+    batch_id = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        Index("ix_stock_snapshot_items_location", "snapshot_id", "state", "district", "institution"),
+    )
 
 class Batch(Base):
     __tablename__ = "batches"
@@ -108,6 +186,29 @@ class AuditLog(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True) # Nullable for failed login attempts
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
 
+    # Keyset pages on (timestamp, id), optionally narrowed to one user or action
+    __table_args__ = (
+        Index("ix_audit_logs_timestamp_id", "timestamp", "id"),
+        Index("ix_audit_logs_user_timestamp_id", "user_id", "timestamp", "id"),
+        Index("ix_audit_logs_action_timestamp_id", "action", "timestamp", "id"),
+    )
+
+# Audit partitions moved to compressed archive files (services/audit_storage.py)
+class AuditArchive(Base):
+    __tablename__ = "audit_archives"
+
+    id = Column(Integer, primary_key=True, index=True)
+    period_start = Column(DateTime(timezone=True), nullable=False)
+    period_end = Column(DateTime(timezone=True), nullable=False)
+    path = Column(String, nullable=False, unique=True)
+    rows = Column(Integer, nullable=False, default=0)
+    sha256 = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_audit_archives_period", "period_start", "period_end"),
+    )
+
 class IntegrationLog(Base):
     __tablename__ = "integration_logs"
 
@@ -136,3 +237,73 @@ class ContentItem(Base):
     has_troubleshooting = Column(Boolean, default=False)
     has_assessment_cues = Column(Boolean, default=False)
     quality_checked = Column(Boolean, default=False)
+
+class StatCounter(Base):
+    __tablename__ = "stat_counters"
+
+    # Maintained by the write paths (services/stats.py), reconciled periodically
+    name = Column(String, primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    # Bumped by every write path of the table (services/versions.py); never reset
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+# Change feed (services/changes.py): one row per insert/update/delete of a synced
+# entity; seq is allocated in commit order and never reused
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+
+    seq = Column(Integer, primary_key=True, autoincrement=False)
+    entity = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    op = Column(String, nullable=False) # UPSERT / DELETE
+    changed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_change_log_entity_seq", "entity", "seq"),
+    )
+
+class ParticipantAttendanceStat(Base):
+    __tablename__ = "participant_attendance_stats"
+
+    # Running totals maintained by services/attendance.py on every attendance write
+    participant_id = Column(Integer, ForeignKey("participants.id"), primary_key=True)
+    batch_id = Column(Integer, ForeignKey("batches.id"), index=True)
+    present = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+
+class BatchAttendanceStat(Base):
+    __tablename__ = "batch_attendance_stats"
+
+    batch_id = Column(Integer, ForeignKey("batches.id"), primary_key=True)
+    sessions = Column(Integer, nullable=False, default=0) # Distinct days with attendance
+    present = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+
+class NduOutbox(Base):
+    __tablename__ = "ndu_outbox"
+
+    # Transactional outbox: written with the entity change, drained by services/ndu.py
+    id = Column(Integer, primary_key=True, index=True)
+    idempotency_key = Column(String, unique=True, nullable=False) # Sent to NDU so retries are not applied twice
+    operation = Column(String, nullable=False) # SYNC_CONTENT, SYNC_TRAINING
+    entity_id = Column(Integer, nullable=False)
+    payload = Column(Text, nullable=False)
+    status = Column(String, nullable=False, default="PENDING") # PENDING, IN_PROGRESS, DONE, DEAD
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False)
+    locked_by = Column(String, nullable=True)
+    locked_until = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    ndu_id = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_ndu_outbox_due", "status", "next_attempt_at"),
+        Index("ix_ndu_outbox_entity", "operation", "entity_id"),
+    )
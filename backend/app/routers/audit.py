@@ -0,0 +1,73 @@
+import json
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import List, Literal, Optional
+from .. import crud, models, schemas
+from ..database import SessionLocal
+from .auth import get_current_active_user, get_db, get_super_admin_user
+from ..services import audit_search, audit_storage
+
+router = APIRouter()
+
+def require_admin(current_user: models.User = Depends(get_current_active_user)) -> models.User:
+    if current_user.role not in [models.Role.ADMIN, models.Role.SUPER_ADMIN]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return current_user
+
+# Audit Trail Search: newest first, keyset cursor in X-Next-Cursor; format=ndjson
+# streams every matching row from the cursor on instead of one page
+@router.get("/", response_model=List[schemas.AuditLogEntry])
+def read_audit_logs(response: Response, user_id: Optional[int] = None, action: Optional[str] = None, start: Optional[datetime] = None, end: Optional[datetime] = None, limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None, format: Literal["json", "ndjson"] = "json", db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(require_admin)):
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    filters = {"user_id": user_id, "action": action, "start": start, "end": end}
+    if cursor is None:
+        applied = ", ".join(f"{key}={value}" for key, value in filters.items() if value is not None) or "none"
+        crud.log_audit(db, current_user.id, "SEARCH_AUDIT", f"Searched audit logs (filters: {applied})")
+
+    if format == "ndjson":
+        if cursor:
+            try:
+                audit_search.parse_cursor(db, cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        lines = (json.dumps(record, separators=(",", ":")) + "\n" for record in audit_search.stream(SessionLocal, cursor=cursor, **filters))
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    try:
+        records, next_cursor = audit_search.page(db, limit=limit, cursor=cursor, **filters)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return records
+
+# Cold Archive: months past AUDIT_RETENTION_MONTHS, searched by time range
+@router.get("/archives", response_model=List[schemas.AuditArchive])
+def read_archives(db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(require_admin)):
+    return db.query(models.AuditArchive).order_by(models.AuditArchive.period_start, models.AuditArchive.id).all()
+
+@router.get("/archive")
+def search_archive(start: datetime, end: datetime, user_id: Optional[int] = None, action: Optional[str] = None, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(require_admin)):
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    paths = [archive.path for archive in audit_storage.archives_between(db, start, end)]
+    crud.log_audit(db, current_user.id, "SEARCH_AUDIT_ARCHIVE", f"Searched archived audit logs {start.isoformat()} - {end.isoformat()} ({len(paths)} file(s))")
+
+    # The files are read while streaming; the session is not needed past this point
+    def lines():
+        for record in audit_storage.search_archive(paths, start, end, user_id=user_id, action=action):
+            yield json.dumps(record, separators=(",", ":")) + "\n"
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.post("/maintenance")
+def run_maintenance(current_user: models.User = Depends(get_super_admin_user)):
+    # Same pass the background job runs every AUDIT_RETENTION_CHECK_SECONDS, on
+    # its own session like the job: it commits after every month it moves
+    db = SessionLocal()
+    try:
+        return audit_storage.maintain(db)
+    finally:
+        db.close()
@@ -1,24 +1,43 @@
+import os
 from datetime import datetime, timedelta
 from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, status
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from jose import JWTError, jwt
 from sqlalchemy.orm import Session
 from .. import crud, models, schemas
 from ..database import SessionLocal
+from ..services import serialization, versions
+from ..services.principal_cache import principal_cache
 
 # Configuration (In production, use Env variables)
 SECRET_KEY = "super-secret-key-change-this-in-prod"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Event streams authenticate with a short-lived ticket, not the access token
+STREAM_TICKET_AUDIENCE = "dashboard-stream"
+STREAM_TICKET_SECONDS = int(os.getenv("STREAM_TICKET_SECONDS", "60"))
+
+# bcrypt is CPU-bound: it gets its own small limiter so a login storm queues
+# there instead of occupying every slot of the shared request threadpool.
+PASSWORD_HASH_CONCURRENCY = int(os.getenv("PASSWORD_HASH_CONCURRENCY", str(os.cpu_count() or 2)))
+password_hash_limiter = anyio.CapacityLimiter(PASSWORD_HASH_CONCURRENCY)
 
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token")
 
+# Unit of Work: one transaction per request. Declared with scope="function" so the
+# commit runs after the endpoint (and response serialization) but before the
+# response is sent; any exception rolls the whole request back.
 def get_db():
     db = SessionLocal()
     try:
         yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
@@ -29,44 +48,90 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = datetime.utcnow() + timedelta(minutes=15)
     to_encode.update({"exp": expire})
+    from jose import jwt
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def create_stream_ticket(user: models.User) -> str:
+    claims = {"sub": user.username, "ver": user.token_version or 0, "aud": STREAM_TICKET_AUDIENCE}
+    return create_access_token(claims, expires_delta=timedelta(seconds=STREAM_TICKET_SECONDS))
+
+# Sync dependency: FastAPI runs it in the threadpool, keeping the DB lookup off the event loop
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db, scope="function")):
+    return _user_for_token(token, db)
+
+def _user_for_token(token: str, db: Session, audience: str | None = None) -> models.User:
+    # Access tokens carry no audience and tickets carry one, so neither passes for the other
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    from jose import JWTError, jwt # Loaded on first use to keep startup light
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], audience=audience)
         username: str = payload.get("sub")
-        if username is None:
+        if username is None or payload.get("aud") != audience:
             raise credentials_exception
         token_data = schemas.TokenData(username=username)
-    except JWTError:
+        token_version = int(payload.get("ver", 0))
+    except (JWTError, TypeError, ValueError):
         raise credentials_exception
+
+    # Principal cache: skip the user lookup for recently seen tokens
+    user = principal_cache.get(token_data.username, token_version)
+    if user is not None:
+        return user
     user = crud.get_user_by_username(db, username=token_data.username)
-    if user is None:
+    if user is None or (user.token_version or 0) != token_version:
         raise credentials_exception
+    principal_cache.put(token_data.username, token_version, user)
     return user
 
+# Pure attribute checks (no I/O), safe to run on the event loop
 async def get_current_active_user(current_user: models.User = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+# EventSource cannot send headers, so event streams pass a stream ticket
+# (POST /dashboard/stream-ticket) as ?ticket=; it is only checked when the stream
+# opens. The session closes before the stream starts; it holds no connection while open.
+def get_stream_user(ticket: str = Query(...), db: Session = Depends(get_db, scope="function")):
+    user = _user_for_token(ticket, db, audience=STREAM_TICKET_AUDIENCE)
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
+
 async def get_super_admin_user(current_user: models.User = Depends(get_current_active_user)):
     if current_user.role != models.Role.SUPER_ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized")
     return current_user
 
+def _load_credentials(db: Session, username: str):
+    user = crud.get_user_by_username(db, username=username)
+    if user is None:
+        return None
+    credentials = {
+        "id": user.id,
+        "hashed_password": user.hashed_password,
+        "claims": {"sub": user.username, "role": user.role, "ver": user.token_version or 0},
+    }
+    # End the read transaction so the pooled connection is not held during bcrypt
+    db.rollback()
+    return credentials
+
 @router.post("/token", response_model=schemas.Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = crud.get_user_by_username(db, username=form_data.username)
-    if not user or not crud.verify_password(form_data.password, user.hashed_password):
-        # Log Failure
-        crud.log_audit(db, None, "LOGIN_FAILURE", f"Failed login attempt for {form_data.username}")
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db, scope="function")):
+    # Blocking DB calls and hashing are offloaded; nothing here blocks the loop
+    credentials = await run_in_threadpool(_load_credentials, db, form_data.username)
+    password_ok = credentials is not None and await anyio.to_thread.run_sync(
+        crud.verify_password, form_data.password, credentials["hashed_password"], limiter=password_hash_limiter
+    )
+    if not password_ok:
+        # Log Failure (committed explicitly: the 401 below would roll the request back)
+        await run_in_threadpool(crud.log_audit, db, None, "LOGIN_FAILURE", f"Failed login attempt for {form_data.username}")
+        await run_in_threadpool(db.commit)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -74,16 +139,14 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
         )
     
     # Log Success
-    crud.log_audit(db, user.id, "LOGIN_SUCCESS", "User logged in")
+    await run_in_threadpool(crud.log_audit, db, credentials["id"], "LOGIN_SUCCESS", "User logged in")
 
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username, "role": user.role}, expires_delta=access_token_expires
-    )
+    access_token = create_access_token(data=credentials["claims"], expires_delta=access_token_expires)
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/init-users", status_code=status.HTTP_201_CREATED)
-def init_users(db: Session = Depends(get_db)):
+def init_users(db: Session = Depends(get_db, scope="function")):
     # Check if users exist
     if crud.get_user_by_username(db, "superadmin"):
         return {"message": "Users already initialized"}
@@ -107,14 +170,21 @@ def init_users(db: Session = Depends(get_db)):
     return {"message": "Super Admin and Admin created"}
 
 @router.get("/users/", response_model=List[schemas.User])
-def read_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+def read_users(request: Request, response: Response, skip: int = 0, limit: int = 100, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
     # Role check: Admin only
     if current_user.role != models.Role.SUPER_ADMIN and current_user.role != models.Role.ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized")
+    headers, not_modified = versions.conditional(db, request, models.User)
+    if not_modified:
+        return not_modified
+    if serialization.FAST_LIST_RESPONSES:
+        rows = db.query(*serialization.schema_columns(models.User, schemas.User)).offset(skip).limit(limit)
+        return serialization.rows_response(serialization.row_dicts(rows), schemas.User, headers=headers)
+    response.headers.update(headers)
     return db.query(models.User).offset(skip).limit(limit).all()
 
 @router.post("/users/", response_model=schemas.User)
-def create_new_user(user: schemas.UserCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+def create_new_user(user: schemas.UserCreate, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
     # Only Super Admin can create admins, Admin can create normal users (logic simplified here)
     if current_user.role != models.Role.SUPER_ADMIN:
         # Simplification: Only SuperAdmin can create users for now to be safe, or allow Admin too.
@@ -127,7 +197,7 @@ def create_new_user(user: schemas.UserCreate, db: Session = Depends(get_db), cur
     return crud.create_user(db=db, user=user)
 
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(user_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+def delete_user(user_id: int, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
     if current_user.role != models.Role.SUPER_ADMIN:
         raise HTTPException(status_code=403, detail="Only Super Admin can delete users")
         
@@ -137,6 +207,18 @@ def delete_user(user_id: int, db: Session = Depends(get_db), current_user: model
     if user.id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
         
-    db.delete(user)
-    db.commit()
+    crud.delete_user(db, user)
     return None
+
+@router.patch("/users/{user_id}", response_model=schemas.User)
+def update_user(user_id: int, update: schemas.UserUpdate, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    if current_user.role != models.Role.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Only Super Admin can modify users")
+
+    user = db.query(models.User).filter(models.User.id == user_id).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if user.id == current_user.id and (update.role is not None or update.is_active is False):
+        raise HTTPException(status_code=400, detail="Cannot change your own role or status")
+
+    return crud.update_user(db, user, update, actor_id=current_user.id)
@@ -0,0 +1,19 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from .. import models, schemas
+from .auth import get_current_active_user, get_db
+from ..services import changes
+
+router = APIRouter()
+
+# Delta Feed: what changed after `since` (0 = everything); resume from `next`
+@router.get("/", response_model=schemas.ChangeFeed)
+def read_changes(since: int = Query(0, ge=0), limit: int = Query(1000, ge=1, le=10000), entity: Optional[List[str]] = Query(None), db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    unknown = sorted(set(entity or ()) - set(changes.ENTITIES))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown entity: {', '.join(unknown)}")
+    if since > changes.latest_seq(db):
+        # A sequence this database never issued (e.g. restored from a backup)
+        raise HTTPException(status_code=410, detail="since is ahead of the change log; sync again from 0")
+    return changes.feed(db, since, limit=limit, entities=entity)
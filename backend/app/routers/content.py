@@ -1,26 +1,42 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from .. import crud, models, schemas
 from ..database import SessionLocal
 from .auth import get_current_active_user, get_db
+from ..services import changes, serialization, stats, versions
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.ContentOut)
-def create_content(content: schemas.ContentCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+def create_content(content: schemas.ContentCreate, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
     # Role check: Admin/SuperAdmin only
     if current_user.role not in [models.Role.ADMIN, models.Role.SUPER_ADMIN]:
         raise HTTPException(status_code=403, detail="Not authorized")
 
     db_content = models.ContentItem(**content.model_dump())
     db.add(db_content)
-    db.commit()
-    db.refresh(db_content)
+    db.flush()
+    stats.content_created(db, db_content)
+    changes.record(db, models.ContentItem, [db_content.id])
     
     crud.log_audit(db, current_user.id, "CREATE_CONTENT", f"Created Content: {content.title}")
     return db_content
 
 @router.get("/", response_model=List[schemas.ContentOut])
-def read_content(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+def read_content(request: Request, response: Response, skip: int = 0, limit: int = 100, fields: Optional[str] = Query(None, description="Comma-separated subset of fields to return"), db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    try:
+        fieldset = serialization.parse_fields(fields, models.ContentItem, schemas.ContentOut)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers, not_modified = versions.conditional(db, request, models.ContentItem)
+    if not_modified:
+        return not_modified
+    if fieldset:
+        rows = db.query(*serialization.fieldset_columns(models.ContentItem, fieldset)).offset(skip).limit(limit)
+        return serialization.fieldset_response(serialization.row_dicts(rows), schemas.ContentOut, fieldset, headers=headers)
+    if serialization.FAST_LIST_RESPONSES:
+        rows = db.query(*serialization.schema_columns(models.ContentItem, schemas.ContentOut)).offset(skip).limit(limit)
+        return serialization.rows_response(serialization.row_dicts(rows), schemas.ContentOut, headers=headers)
+    response.headers.update(headers)
     return db.query(models.ContentItem).offset(skip).limit(limit).all()
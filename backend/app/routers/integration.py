@@ -1,36 +1,96 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from .. import models, crud
+from typing import List, Optional
+from .. import models, crud, schemas
 from ..database import SessionLocal
 from .auth import get_current_active_user, get_db
-from ..services.ndu import MockNDUService
+from ..services import attendance, ndu
 
 router = APIRouter()
 
-@router.post("/sync/content/{content_id}")
-def sync_content_to_ndu(content_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+# Sync requests are queued in the NDU outbox with the request's transaction and
+# delivered in the background; poll status_url for the outcome.
+def _accepted(response: Response, entry: models.NduOutbox) -> schemas.SyncAccepted:
+    status_url = f"/api/v1/integration/outbox/{entry.id}"
+    response.headers["Location"] = status_url
+    return schemas.SyncAccepted(outbox_id=entry.id, status=entry.status, idempotency_key=entry.idempotency_key, status_url=status_url)
+
+def _enqueue(db: Session, operation: str, entity_id: int, payload: dict, idempotency_key: Optional[str]):
+    try:
+        return ndu.enqueue_sync(db, operation, entity_id, payload, idempotency_key)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.post("/sync/content/{content_id}", status_code=status.HTTP_202_ACCEPTED, response_model=schemas.SyncAccepted)
+def sync_content_to_ndu(content_id: int, response: Response, idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"), db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
     content = db.query(models.ContentItem).filter(models.ContentItem.id == content_id).first()
     if not content:
         raise HTTPException(status_code=404, detail="Content not found")
-    
-    service = MockNDUService(db)
-    success, message = service.sync_content(content)
-    
-    if not success:
-        raise HTTPException(status_code=502, detail=message)
-        
-    return {"message": message, "ndu_id": content.ndu_reference_id}
-
-@router.post("/sync/training/{training_id}")
-def sync_training_to_ndu(training_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+
+    entry = _enqueue(db, ndu.SYNC_CONTENT, content.id, ndu.content_payload(content), idempotency_key)
+    return _accepted(response, entry)
+
+@router.post("/sync/training/{training_id}", status_code=status.HTTP_202_ACCEPTED, response_model=schemas.SyncAccepted)
+def sync_training_to_ndu(training_id: int, response: Response, idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"), db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
     training = db.query(models.TrainingProgram).filter(models.TrainingProgram.id == training_id).first()
     if not training:
         raise HTTPException(status_code=404, detail="Training program not found")
-    
-    service = MockNDUService(db)
-    success, message = service.sync_training(training) # Fixed method name from sync_content to sync_training in original plan thought, ensuring code is correct
-    
-    if not success:
-        raise HTTPException(status_code=502, detail=message)
-        
-    return {"message": message, "ndu_id": training.ndu_mapping_id}
+
+    entry = _enqueue(db, ndu.SYNC_TRAINING, training.id, ndu.training_payload(training), idempotency_key)
+    return _accepted(response, entry)
+
+@router.post("/sync/progress/{batch_id}", status_code=status.HTTP_202_ACCEPTED, response_model=schemas.SyncAccepted)
+def sync_progress_to_ndu(batch_id: int, response: Response, idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"), db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    if not db.get(models.Batch, batch_id):
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    # Read from the attendance aggregates, not the attendance rows
+    payload = ndu.progress_payload(batch_id, attendance.progress_payload(db, batch_id))
+    entry = _enqueue(db, ndu.SYNC_PROGRESS, batch_id, payload, idempotency_key)
+    crud.log_audit(db, current_user.id, "SYNC_PROGRESS", f"Queued progress sync for Batch {batch_id}")
+    return _accepted(response, entry)
+
+# Bulk Sync (Admin only): every pending item in grouped payloads, per-item results
+async def _bulk_sync(operation: str, db: Session, current_user: models.User, batch_size: int, limit: Optional[int]):
+    if current_user.role not in [models.Role.ADMIN, models.Role.SUPER_ADMIN]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return await ndu.bulk_sync(db, operation, current_user.id, batch_size=batch_size, limit=limit)
+
+@router.post("/sync/bulk/content", response_model=schemas.BulkSyncReport)
+async def bulk_sync_content(batch_size: int = Query(ndu.NDU_BULK_BATCH_SIZE, ge=1, le=1000), limit: Optional[int] = Query(None, ge=1), db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    return await _bulk_sync(ndu.SYNC_CONTENT, db, current_user, batch_size, limit)
+
+@router.post("/sync/bulk/training", response_model=schemas.BulkSyncReport)
+async def bulk_sync_training(batch_size: int = Query(ndu.NDU_BULK_BATCH_SIZE, ge=1, le=1000), limit: Optional[int] = Query(None, ge=1), db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    return await _bulk_sync(ndu.SYNC_TRAINING, db, current_user, batch_size, limit)
+
+@router.get("/outbox/{entry_id}", response_model=schemas.OutboxEntry)
+def read_outbox_entry(entry_id: int, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    entry = db.get(models.NduOutbox, entry_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Outbox entry not found")
+    return entry
+
+# Dead Letters (Admin only)
+@router.get("/outbox/", response_model=List[schemas.OutboxEntry])
+def read_outbox(status: Optional[str] = ndu.DEAD, skip: int = 0, limit: int = 100, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    if current_user.role not in [models.Role.ADMIN, models.Role.SUPER_ADMIN]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    query = db.query(models.NduOutbox)
+    if status:
+        query = query.filter(models.NduOutbox.status == status)
+    return query.order_by(models.NduOutbox.id.desc()).offset(skip).limit(limit).all()
+
+@router.post("/outbox/{entry_id}/retry", status_code=status.HTTP_202_ACCEPTED, response_model=schemas.SyncAccepted)
+def retry_outbox_entry(entry_id: int, response: Response, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    if current_user.role not in [models.Role.ADMIN, models.Role.SUPER_ADMIN]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    entry = db.get(models.NduOutbox, entry_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Outbox entry not found")
+    if entry.status != ndu.DEAD:
+        raise HTTPException(status_code=400, detail="Only dead-lettered entries can be retried")
+
+    ndu.requeue(db, entry)
+    crud.log_audit(db, current_user.id, "RETRY_NDU_SYNC", f"Requeued NDU outbox entry {entry.id} ({entry.operation} #{entry.entity_id})")
+    return _accepted(response, entry)
@@ -1,33 +1,135 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
+from datetime import date, datetime
 from .. import crud, models, schemas
 from ..database import SessionLocal
 from .auth import get_current_active_user, get_db
+from ..services.importer import ImportFormatError, import_inventory, iter_import_rows
+from ..services import export, ledger, rollups, serialization, utilization, versions
+from ..pagination import decode_cursor, encode_cursor
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.Inventory])
-def read_inventory(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
-    items = crud.get_inventory(db, skip=skip, limit=limit)
+def read_inventory(request: Request, response: Response, filters: schemas.InventoryFilter = Depends(), skip: int = 0, limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None, fields: Optional[str] = Query(None, description="Comma-separated subset of fields to return"), db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    try:
+        fieldset = serialization.parse_fields(fields, models.InventoryItem, schemas.Inventory)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers, not_modified = versions.conditional(db, request, models.InventoryItem)
+    if not_modified:
+        return not_modified
+    if fieldset:
+        columns = serialization.fieldset_columns(models.InventoryItem, fieldset, key="id")
+    else:
+        columns = serialization.schema_columns(models.InventoryItem, schemas.Inventory) if serialization.FAST_LIST_RESPONSES else None
+    try:
+        items, next_cursor = crud.get_inventory(db, filters, skip=skip, limit=limit, cursor=cursor, columns=columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Opaque keyset cursor for the next page (absent on the last page)
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    if fieldset:
+        return serialization.fieldset_response(serialization.row_dicts(items), schemas.Inventory, fieldset, headers=headers)
+    if columns:
+        return serialization.rows_response(serialization.row_dicts(items), schemas.Inventory, headers=headers)
+    response.headers.update(headers)
     return items
 
 @router.post("/", response_model=schemas.Inventory)
-def create_item(item: schemas.InventoryCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+def create_item(item: schemas.InventoryCreate, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
     # In a real app, strict role check here (e.g. only Admin/SuperAdmin)
     try:
         return crud.create_inventory_item(db=db, item=item, user_id=current_user.id)
-    except Exception as e:
+    except crud.DuplicateKeyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+# Bulk Vendor Delivery Import (CSV / XLSX)
+@router.post("/import", response_model=schemas.ImportReport)
+def import_items(file: UploadFile = File(...), db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    if current_user.role not in [models.Role.ADMIN, models.Role.SUPER_ADMIN]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    try:
+        rows = iter_import_rows(file.file, file.filename)
+        return import_inventory(db, rows, user_id=current_user.id, filename=file.filename)
+    except ImportFormatError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+# Streaming Report Export (Clause 4.5): same filters as the list endpoint
+@router.get("/export")
+def export_inventory(format: Literal["csv", "xlsx", "pdf"] = "csv", filters: schemas.InventoryFilter = Depends(), db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    applied = ", ".join(f"{key}={value}" for key, value in filters.model_dump(exclude_none=True).items()) or "none"
+    crud.log_audit(db, current_user.id, "EXPORT_REPORT", f"User exported Inventory {format.upper()} Report (filters: {applied})")
+
+    rows = export.export_rows(SessionLocal, filters)
+    return StreamingResponse(
+        export.STREAMERS[format](rows),
+        media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{export.export_filename(format)}"'},
+    )
+
 @router.post("/audit-export")
-def audit_export_action(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+def audit_export_action(db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
     crud.log_audit(db, current_user.id, "EXPORT_REPORT", "User exported Inventory CSV Report")
     return {"message": "Logged"}
 
+# Stock Movements (Clause 4.4): appended to the ledger, kits' positions updated
+@router.post("/movements", response_model=List[schemas.StockMovement])
+def move_items(movement: schemas.MovementCreate, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    if current_user.role not in [models.Role.ADMIN, models.Role.SUPER_ADMIN]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    destination = movement.model_dump(include={"state", "district", "institution"}) if movement.state else None
+    try:
+        transactions = ledger.move(db, movement.kit_ids, movement.action_type, current_user.id, destination=destination, batch_id=movement.batch_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    details = f"{movement.action_type} {len(transactions)} kit(s)"
+    if destination:
+        details += f" to {transactions[0].to_location}"
+    if movement.batch_id is not None:
+        details += f" for Batch {movement.batch_id}"
+    crud.log_audit(db, current_user.id, f"{movement.action_type}_INVENTORY", details)
+    return transactions
+
+# Point-in-time stock: ?at= replays from the nearest snapshot; without it, current positions.
+# Pages by kit_id, keyset cursor in X-Next-Cursor
+@router.get("/positions", response_model=schemas.StockPositions)
+def read_positions(response: Response, at: Optional[datetime] = None, status: Optional[str] = None, category: Optional[str] = None, state: Optional[str] = None, district: Optional[str] = None, institution: Optional[str] = None, batch_id: Optional[int] = None, limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    filters = {"status": status, "category": category, "state": state, "district": district, "institution": institution, "batch_id": batch_id}
+    try:
+        if at is None:
+            items, next_cursor = ledger.current_positions(db, limit=limit, cursor=cursor, **{key: value for key, value in filters.items() if value is not None})
+            result = {"items": items}
+        else:
+            result = ledger.positions_at(db, at, limit=limit, cursor=cursor, **filters)
+            next_cursor = result.pop("next_cursor")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return result
+
+@router.post("/snapshots", response_model=Optional[schemas.StockSnapshot])
+def create_snapshot(db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    if current_user.role not in [models.Role.ADMIN, models.Role.SUPER_ADMIN]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    # None when nothing has moved since the last snapshot
+    return ledger.take_snapshot(db)
+
+# Regional Rollups: counts for one node of state -> district -> institution and its children
+@router.get("/rollups", response_model=schemas.LocationRollup)
+def read_rollups(state: Optional[str] = None, district: Optional[str] = None, institution: Optional[str] = None, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    try:
+        return rollups.drill_down(db, state=state, district=district, institution=institution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 # Correlation Reporting (Clause 4.5 Hardening)
 @router.get("/utilization")
-def get_utilization_metrics(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+def get_utilization_metrics(db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
     total = db.query(models.InventoryItem).count()
     if total == 0:
         return {"utilization_rate": 0, "allocated": 0, "total": 0}
@@ -42,8 +144,32 @@ def get_utilization_metrics(db: Session = Depends(get_db), current_user: models.
         "correlation_status": "High" if rate > 70 else "Low"
     }
 
+# Utilization over time, read from the daily metrics table (complete days only)
+@router.get("/utilization/history", response_model=List[schemas.UtilizationBucket])
+def read_utilization_history(start: date, end: date, granularity: Literal["day", "week", "month"] = "day", category: Optional[str] = None, batch_id: Optional[int] = None, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    return utilization.history(db, start, end, granularity=granularity, category=category, batch_id=batch_id)
+
+# After /utilization/history so that path is not read as a kit_id
+@router.get("/{kit_id}/history", response_model=List[schemas.StockMovement])
+def read_item_history(kit_id: str, response: Response, limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    before_id = None
+    if cursor:
+        try:
+            before_id = decode_cursor(cursor).get("id")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if not isinstance(before_id, int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    transactions = ledger.history(db, kit_id, limit=limit + 1, before_id=before_id)
+    if len(transactions) > limit:
+        transactions = transactions[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor({"id": transactions[-1].id})
+    return transactions
+
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_item(item_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+def delete_item(item_id: int, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
     # Only Super Admin can delete inventory usually, but let's allow Admin for now as per plan
     success = crud.delete_inventory_item(db, item_id, user_id=current_user.id)
     if not success:
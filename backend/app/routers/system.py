@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from .. import models
+from .auth import get_db, get_super_admin_user
+from ..services import ndu
+from ..services.principal_cache import principal_cache
+from ..services.audit_writer import audit_writer
+from ..services.events import hub
+from ..database import engine, pool_stats
+
+router = APIRouter()
+
+# Operational Metrics (Super Admin only)
+@router.get("/metrics")
+def get_system_metrics(db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_super_admin_user)):
+    return {
+        "principal_cache": principal_cache.metrics(),
+        "audit_writer": audit_writer.metrics(),
+        "event_hub": hub.metrics(),
+        "db_pool": pool_stats.metrics(engine.pool),
+        "ndu_outbox": {**ndu.outbox_worker.metrics(), "entries": ndu.status_counts(db)},
+        "ndu_gateway": ndu.get_gateway().metrics(),
+    }
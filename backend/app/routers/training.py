@@ -1,29 +1,95 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Union
 from .. import crud, models, schemas
 from ..database import SessionLocal
 from .auth import get_current_active_user, get_db
+from ..services import attendance, serialization, versions
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.Training])
-def read_trainings(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
-    trainings = crud.get_trainings(db, skip=skip, limit=limit)
-    return trainings
+TRAINING_SCHEMAS = {
+    schemas.TrainingExpand.NONE: schemas.TrainingSummary,
+    schemas.TrainingExpand.BATCHES: schemas.TrainingWithBatches,
+    schemas.TrainingExpand.PARTICIPANTS: schemas.Training,
+}
+
+# Tables each shape reads, for its ETag
+TRAINING_TABLES = {
+    schemas.TrainingExpand.NONE: (models.TrainingProgram,),
+    schemas.TrainingExpand.BATCHES: (models.TrainingProgram, models.Batch),
+    schemas.TrainingExpand.PARTICIPANTS: (models.TrainingProgram, models.Batch, models.Participant),
+}
+
+@router.get("/", response_model=List[Union[schemas.Training, schemas.TrainingWithBatches, schemas.TrainingSummary]])
+def read_trainings(request: Request, response: Response, skip: int = 0, limit: int = 100, expand: schemas.TrainingExpand = schemas.TrainingExpand.PARTICIPANTS, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    headers, not_modified = versions.conditional(db, request, *TRAINING_TABLES[expand])
+    if not_modified:
+        return not_modified
+    # expand=none|batches returns a shallower shape and loads only what it serializes
+    if serialization.FAST_LIST_RESPONSES:
+        rows = crud.get_training_rows(db, skip=skip, limit=limit, expand=expand)
+        return serialization.rows_response(rows, TRAINING_SCHEMAS[expand], headers=headers)
+    response.headers.update(headers)
+    trainings = crud.get_trainings(db, skip=skip, limit=limit, expand=expand)
+    schema = TRAINING_SCHEMAS[expand]
+    return [schema.model_validate(training) for training in trainings]
 
 @router.post("/", response_model=schemas.Training)
-def create_training(training: schemas.TrainingCreate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+def create_training(training: schemas.TrainingCreate, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
     # Role check
     if current_user.role != models.Role.ADMIN and current_user.role != models.Role.SUPER_ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized")
     return crud.create_training(db=db, training=training, user_id=current_user.id)
 
 @router.delete("/{training_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_training(training_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_active_user)):
+def delete_training(training_id: int, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
     if current_user.role != models.Role.SUPER_ADMIN:
         raise HTTPException(status_code=403, detail="Not authorized")
     success = crud.delete_training(db, training_id, user_id=current_user.id)
     if not success:
         raise HTTPException(status_code=404, detail="Training not found")
     return None
+
+# Batches & Participants
+@router.post("/batches/", response_model=schemas.BatchSummary)
+def create_batch(batch: schemas.BatchCreate, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    if current_user.role != models.Role.ADMIN and current_user.role != models.Role.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if not db.get(models.TrainingProgram, batch.training_id):
+        raise HTTPException(status_code=404, detail="Training not found")
+    return crud.create_batch(db, batch, user_id=current_user.id)
+
+@router.post("/batches/{batch_id}/participants", response_model=List[schemas.Participant])
+def enroll_participants(batch_id: int, participants: List[schemas.ParticipantCreate], db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    if current_user.role != models.Role.ADMIN and current_user.role != models.Role.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    batch = db.get(models.Batch, batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return crud.enroll_participants(db, batch, participants, user_id=current_user.id)
+
+# Attendance (Clause 4.3): one call marks a whole batch for a day
+@router.put("/batches/{batch_id}/attendance", response_model=schemas.AttendanceResult)
+def mark_attendance(batch_id: int, sheet: schemas.AttendanceSheet, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    if current_user.role != models.Role.ADMIN and current_user.role != models.Role.SUPER_ADMIN:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if not db.get(models.Batch, batch_id):
+        raise HTTPException(status_code=404, detail="Batch not found")
+    if not sheet.records:
+        raise HTTPException(status_code=400, detail="No attendance records")
+
+    # A participant listed twice keeps the last mark
+    marks = {record.participant_id: record.status for record in sheet.records}
+    try:
+        result = attendance.mark_batch(db, batch_id, sheet.date, marks)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    crud.log_audit(db, current_user.id, "MARK_ATTENDANCE", f"Marked attendance for Batch {batch_id} on {sheet.date}: {len(marks)} participant(s)")
+    return result
+
+@router.get("/batches/{batch_id}/attendance/summary", response_model=schemas.BatchAttendanceSummary)
+def read_attendance_summary(batch_id: int, db: Session = Depends(get_db, scope="function"), current_user: models.User = Depends(get_current_active_user)):
+    if not db.get(models.Batch, batch_id):
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return attendance.batch_summary(db, batch_id)
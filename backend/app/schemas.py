@@ -1,6 +1,7 @@
-from pydantic import BaseModel, ConfigDict, field_validator
-from typing import Optional, List
-from datetime import datetime
+import enum
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Optional, List, Literal
+from datetime import date, datetime
 from .models import Role
 
 # User Schemas
@@ -12,6 +13,11 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
 
+class UserUpdate(BaseModel):
+    role: Optional[Role] = None
+    full_name: Optional[str] = None
+    is_active: Optional[bool] = None
+
 class User(UserBase):
     id: int
     is_active: bool
@@ -22,6 +28,10 @@ class Token(BaseModel):
     access_token: str
     token_type: str
 
+class StreamTicket(BaseModel):
+    ticket: str
+    expires_in: int # Seconds
+
 class TokenData(BaseModel):
     username: Optional[str] = None
 
@@ -59,6 +69,124 @@ class Inventory(InventoryBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class InventoryFilter(BaseModel):
+    status: Optional[str] = None
+    category: Optional[str] = None
+    state: Optional[str] = None
+    district: Optional[str] = None
+    institution: Optional[str] = None
+    batch_id: Optional[int] = None
+    q: Optional[str] = None # Free-text over kit_id/name/serial_number/model
+
+# Stock Ledger Schemas
+class MovementCreate(BaseModel):
+    action_type: Literal["ALLOCATE", "RETURN", "CONSUME", "TRANSFER"]
+    kit_ids: List[str] = Field(min_length=1, max_length=1000)
+    # Destination; omitted means the kits stay where they are (required for TRANSFER)
+    state: Optional[str] = None
+    district: Optional[str] = None
+    institution: Optional[str] = None
+    batch_id: Optional[int] = None # Required for ALLOCATE
+
+class StockMovement(BaseModel):
+    id: int
+    kit_id: str
+    action_type: str
+    from_location: Optional[str] = None
+    to_location: Optional[str] = None
+    status: Optional[str] = None
+    state: Optional[str] = None
+    district: Optional[str] = None
+    institution: Optional[str] = None
+    batch_id: Optional[int] = None
+    user_id: Optional[int] = None
+    timestamp: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
+
+class StockPosition(BaseModel):
+    kit_id: str
+    status: Optional[str] = None
+    category: Optional[str] = None
+    state: Optional[str] = None
+    district: Optional[str] = None
+    institution: Optional[str] = None
+    batch_id: Optional[int] = None
+
+class StockPositions(BaseModel):
+    at: Optional[datetime] = None
+    snapshot_id: Optional[int] = None
+    snapshot_at: Optional[datetime] = None
+    replayed: int = 0 # Ledger rows replayed on top of the snapshot
+    items: List[StockPosition]
+
+class StockSnapshot(BaseModel):
+    id: int
+    transaction_id: int
+    seq: int
+    taken_at: datetime
+    items: int
+    model_config = ConfigDict(from_attributes=True)
+
+# Utilization Schemas
+class UtilizationBucket(BaseModel):
+    period: date # First day of the bucket
+    days: int
+    kit_days: int
+    allocated_kit_days: int
+    active_kit_days: int # Allocated within the batch's start/end dates
+    idle_kit_days: int
+    allocations: int
+    returns: int
+    utilization_rate: float
+    turnover: float # Allocations per kit in service
+
+# Audit Schemas
+class AuditLogEntry(BaseModel):
+    id: int
+    action: Optional[str] = None
+    details: Optional[str] = None
+    user_id: Optional[int] = None
+    timestamp: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
+
+class AuditArchive(BaseModel):
+    id: int
+    period_start: datetime
+    period_end: datetime
+    path: str
+    rows: int
+    sha256: str
+    created_at: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
+
+# Location Rollup Schemas
+class LocationRollupNode(BaseModel):
+    name: Optional[str] = None
+    total: int
+    by_status: dict[str, int]
+    by_category: dict[str, int]
+
+class LocationRollup(BaseModel):
+    level: Literal["national", "state", "district", "institution"]
+    state: Optional[str] = None
+    district: Optional[str] = None
+    institution: Optional[str] = None
+    total: int
+    by_status: dict[str, int]
+    by_category: dict[str, int]
+    children: List[LocationRollupNode]
+
+class ImportRowError(BaseModel):
+    row: int
+    kit_id: Optional[str] = None
+    error: str
+
+class ImportReport(BaseModel):
+    total: int
+    created: int
+    failed: int
+    errors: List[ImportRowError] = []
+
 # Batch & Participant Schemas
 class ParticipantBase(BaseModel):
     name: str
@@ -82,12 +210,44 @@ class BatchBase(BaseModel):
 class BatchCreate(BatchBase):
     training_id: int
 
-class Batch(BatchBase):
+class BatchSummary(BatchBase):
     id: int
     training_id: int
-    participants: List[Participant] = []
     model_config = ConfigDict(from_attributes=True)
 
+class Batch(BatchSummary):
+    participants: List[Participant] = []
+
+# Attendance Schemas
+class AttendanceMark(BaseModel):
+    participant_id: int
+    status: Literal["PRESENT", "ABSENT"]
+
+class AttendanceSheet(BaseModel):
+    date: date
+    records: List[AttendanceMark]
+
+class AttendanceResult(BaseModel):
+    batch_id: int
+    date: date
+    marked: int
+    created: int
+    updated: int
+
+class ParticipantAttendance(BaseModel):
+    participant_id: int
+    present: int
+    total: int
+    attendance_pct: float
+
+class BatchAttendanceSummary(BaseModel):
+    batch_id: int
+    sessions: int
+    present: int
+    total: int
+    attendance_pct: float
+    participants: List[ParticipantAttendance]
+
 # Training Schemas
 class TrainingBase(BaseModel):
     title: str
@@ -100,12 +260,23 @@ class TrainingBase(BaseModel):
 class TrainingCreate(TrainingBase):
     pass
 
-class Training(TrainingBase):
+# Response shapes for GET /training/?expand=none|batches|participants
+class TrainingSummary(TrainingBase):
     id: int
-    batches: List[Batch] = []
 
     model_config = ConfigDict(from_attributes=True)
 
+class TrainingWithBatches(TrainingSummary):
+    batches: List[BatchSummary] = []
+
+class Training(TrainingSummary):
+    batches: List[Batch] = []
+
+class TrainingExpand(str, enum.Enum):
+    NONE = "none"
+    BATCHES = "batches"
+    PARTICIPANTS = "participants"
+
 # Content Schemas
 class ContentBase(BaseModel):
     title: str
@@ -127,3 +298,48 @@ class ContentOut(ContentBase):
     approval_status: str
 
     model_config = ConfigDict(from_attributes=True)
+
+# Change Feed Schemas
+class EntityChanges(BaseModel):
+    upserted: List[dict] = [] # Current rows, in the entity's list schema
+    deleted: List[int] = []
+
+class ChangeFeed(BaseModel):
+    since: int
+    next: int
+    has_more: bool
+    changes: dict[str, EntityChanges]
+
+# NDU Outbox Schemas
+class SyncAccepted(BaseModel):
+    outbox_id: int
+    status: str
+    idempotency_key: str
+    status_url: str
+
+class OutboxEntry(BaseModel):
+    id: int
+    idempotency_key: str
+    operation: str
+    entity_id: int
+    status: str
+    attempts: int
+    next_attempt_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    ndu_id: Optional[str] = None
+    created_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class BulkSyncItem(BaseModel):
+    entity_id: int
+    status: str
+    ndu_id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkSyncReport(BaseModel):
+    total: int
+    synced: int
+    failed: int
+    results: List[BulkSyncItem]
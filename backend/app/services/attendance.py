@@ -0,0 +1,141 @@
+import logging
+from datetime import date, datetime, time
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from .. import models
+from . import stats
+
+logger = logging.getLogger(__name__)
+
+# Attendance (Clause 4.3)
+# A whole batch is marked for a day in one call: one upsert keyed on
+# (participant_id, batch_id, date). The per-participant and per-batch totals
+# are adjusted by the delta of each mark (new mark, or PRESENT <-> ABSENT
+# change) in the same transaction, so progress reads never scan attendance.
+# Marks of the same batch are serialized on the batch row. The stats
+# reconciler rebuilds the totals periodically to correct any drift.
+PRESENT, ABSENT = "PRESENT", "ABSENT"
+
+def attendance_day(day: date) -> datetime:
+    # Attendance.date is a DateTime column; marks are stored at midnight
+    return datetime.combine(day, time.min)
+
+def percentage(present: int, total: int) -> float:
+    return round(present / total * 100, 2) if total else 0.0
+
+def mark_batch(db: Session, batch_id: int, day: date, marks: dict[int, str]) -> dict:
+    """Upsert one day's attendance for a batch (no commit)."""
+    Attendance, Participant = models.Attendance, models.Participant
+    day = attendance_day(day)
+
+    enrolled = set(db.scalars(select(Participant.id).where(Participant.batch_id == batch_id, Participant.id.in_(list(marks)))))
+    unknown = sorted(set(marks) - enrolled)
+    if unknown:
+        raise ValueError(f"Participants not enrolled in batch {batch_id}: {unknown}")
+
+    # Marks of one batch queue on its row, so `previous` is exactly what this
+    # upsert replaces and concurrent marks cannot both apply the same delta
+    stats.lock_row(db, models.Batch, batch_id)
+    previous = dict(db.execute(
+        select(Attendance.participant_id, Attendance.status).where(Attendance.batch_id == batch_id, Attendance.date == day)
+    ).all())
+
+    rows = [{"participant_id": participant_id, "batch_id": batch_id, "date": day, "status": status}
+            for participant_id, status in sorted(marks.items())]
+    statement = stats.upsert_statement(db.get_bind().dialect.name, Attendance)
+    if statement is not None:
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[Attendance.batch_id, Attendance.date, Attendance.participant_id],
+            set_={"status": statement.excluded.status},
+        ), rows)
+    else:
+        for row in rows:
+            updated = db.query(Attendance).filter(
+                Attendance.batch_id == batch_id, Attendance.date == day, Attendance.participant_id == row["participant_id"]
+            ).update({Attendance.status: row["status"]})
+            if not updated:
+                db.add(Attendance(**row))
+
+    # Aggregate deltas
+    participant_rows = []
+    for participant_id, status in marks.items():
+        old = previous.get(participant_id)
+        present = int(status == PRESENT) - int(old == PRESENT)
+        total = 0 if old is not None else 1
+        if present or total:
+            participant_rows.append({"participant_id": participant_id, "batch_id": batch_id, "present": present, "total": total})
+    present = sum(row["present"] for row in participant_rows)
+    total = sum(row["total"] for row in participant_rows)
+    stats.increment(db, models.ParticipantAttendanceStat, "participant_id", participant_rows, ("present", "total"))
+    stats.increment(db, models.BatchAttendanceStat, "batch_id", [{
+        "batch_id": batch_id, "sessions": 0 if previous else 1, "present": present, "total": total,
+    }], ("sessions", "present", "total"))
+    stats.attendance_marked(db, present, total)
+
+    created = sum(1 for participant_id in marks if participant_id not in previous)
+    return {"batch_id": batch_id, "date": day.date(), "marked": len(marks), "created": created, "updated": len(marks) - created}
+
+def batch_summary(db: Session, batch_id: int) -> dict:
+    batch = db.get(models.BatchAttendanceStat, batch_id)
+    Stat = models.ParticipantAttendanceStat
+    participants = db.query(Stat).filter(Stat.batch_id == batch_id).order_by(Stat.participant_id).all()
+    present, total = (batch.present, batch.total) if batch else (0, 0)
+    return {
+        "batch_id": batch_id,
+        "sessions": batch.sessions if batch else 0,
+        "present": present,
+        "total": total,
+        "attendance_pct": percentage(present, total),
+        "participants": [{
+            "participant_id": stat.participant_id,
+            "present": stat.present,
+            "total": stat.total,
+            "attendance_pct": percentage(stat.present, stat.total),
+        } for stat in participants],
+    }
+
+def progress_payload(db: Session, batch_id: int) -> dict:
+    # progress_data for the NDU progress sync, read from the aggregates
+    summary = batch_summary(db, batch_id)
+    return {
+        "sessions": summary["sessions"],
+        "attendance_pct": summary["attendance_pct"],
+        "participants": {row["participant_id"]: row["attendance_pct"] for row in summary["participants"]},
+    }
+
+def reconcile(db: Session) -> int:
+    """Rebuild the attendance aggregates from the attendance rows; returns existing rows corrected."""
+    Attendance = models.Attendance
+    stats.lock_for_rebuild(db, models.ParticipantAttendanceStat, models.BatchAttendanceStat)
+    present = func.sum(case((Attendance.status == PRESENT, 1), else_=0))
+    actual_participants = {
+        participant_id: (batch_id, int(present_count or 0), total)
+        for participant_id, batch_id, present_count, total in db.query(
+            Attendance.participant_id, func.max(Attendance.batch_id), present, func.count(Attendance.id)
+        ).group_by(Attendance.participant_id)
+    }
+    actual_batches = {
+        batch_id: (sessions, int(present_count or 0), total)
+        for batch_id, sessions, present_count, total in db.query(
+            Attendance.batch_id, func.count(func.distinct(Attendance.date)), present, func.count(Attendance.id)
+        ).group_by(Attendance.batch_id)
+    }
+
+    corrected = 0
+    for model, key, actual, columns in (
+        (models.ParticipantAttendanceStat, "participant_id", actual_participants, ("batch_id", "present", "total")),
+        (models.BatchAttendanceStat, "batch_id", actual_batches, ("sessions", "present", "total")),
+    ):
+        stored = {getattr(row, key): tuple(getattr(row, column) for column in columns) for row in db.query(model)}
+        for id_, values in actual.items():
+            if stored.get(id_) != values:
+                db.merge(model(**{key: id_}, **dict(zip(columns, values))))
+                if id_ in stored: # Missing rows are seeded, not drift
+                    corrected += 1
+        for id_ in set(stored) - set(actual):
+            db.query(model).filter(getattr(model, key) == id_).delete()
+            corrected += 1
+    db.commit()
+    if corrected:
+        logger.warning(f"Attendance aggregates drifted, corrected {corrected} row(s)")
+    return corrected
@@ -0,0 +1,105 @@
+from datetime import datetime
+from typing import Iterator
+from sqlalchemy import String, Table, select, tuple_, type_coerce
+from sqlalchemy.orm import Session
+from .. import models
+from ..pagination import decode_cursor, encode_cursor
+from . import audit_storage
+
+# Audit Trail Search
+# Newest first, keyset-paginated on (timestamp, id). Every filter combination
+# has a matching composite index (timestamp, id), (user_id, timestamp, id),
+# (action, timestamp, id), so a page is an index seek from the cursor and
+# costs the same however deep it is.
+# Postgres reads the partitioned audit_logs table and prunes partitions
+# itself. On SQLite the hot table and the monthly audit_logs_YYYY_MM tables are
+# walked newest month first, and the walk stops as soon as no older month can
+# reach the page. Archived months are searched through audit_storage instead.
+STREAM_PAGE_SIZE = 1000
+
+def _key(db: Session, table: Table):
+    # SQLite keeps timestamps as text in two formats (CURRENT_TIMESTAMP
+    # defaults, bound datetimes with microseconds); comparing the stored text
+    # keeps pages exact and still uses the indexes
+    if db.get_bind().dialect.name == "sqlite":
+        return type_coerce(table.c.timestamp, String)
+    return table.c.timestamp
+
+def _key_value(db: Session, value: datetime):
+    # A datetime bound in the same representation as _key
+    value = audit_storage.as_utc(value)
+    if db.get_bind().dialect.name != "sqlite":
+        return value
+    text = value.strftime("%Y-%m-%d %H:%M:%S")
+    return f"{text}.{value.microsecond:06d}" if value.microsecond else text
+
+def _encode(row) -> str:
+    key = row.sort_key if isinstance(row.sort_key, str) else audit_storage.as_utc(row.sort_key).isoformat()
+    return encode_cursor({"timestamp": key, "id": row.id})
+
+def parse_cursor(db: Session, cursor: str) -> tuple:
+    # (sort key, id) of the last row of the previous page; raises ValueError
+    values = decode_cursor(cursor)
+    key, last_id = values.get("timestamp"), values.get("id")
+    if not isinstance(key, str) or not isinstance(last_id, int):
+        raise ValueError("Invalid cursor")
+    if db.get_bind().dialect.name != "sqlite":
+        try:
+            key = datetime.fromisoformat(key)
+        except ValueError:
+            raise ValueError("Invalid cursor")
+    return key, last_id
+
+def _sources(db: Session, start: datetime | None, end: datetime | None, before) -> list[tuple[Table, object]]:
+    # (table, upper bound of its timestamps in key form or None), newest first
+    hot = models.AuditLog.__table__
+    if audit_storage.is_native(db):
+        return [(hot, None)]
+    sources = [(hot, None)]
+    for month, name in sorted(audit_storage.partitions(db).items(), reverse=True):
+        lower, upper = audit_storage.bound(month), audit_storage.bound(audit_storage.add_months(month, 1))
+        if (end is not None and lower >= audit_storage.as_utc(end)) or (start is not None and upper <= audit_storage.as_utc(start)):
+            continue
+        if before is not None and _key_value(db, lower) > before[0]:
+            continue # Entirely newer than the cursor
+        sources.append((audit_storage.partition_table(name), _key_value(db, upper)))
+    return sources
+
+def page(db: Session, limit: int = 100, cursor: str | None = None, user_id: int | None = None, action: str | None = None, start: datetime | None = None, end: datetime | None = None) -> tuple[list[dict], str | None]:
+    """One page of matching audit rows, newest first, and the cursor of the next page (None on the last)."""
+    before = parse_cursor(db, cursor) if cursor else None
+    rows = []
+    for table, upper in _sources(db, start, end, before):
+        # Older sources cannot reach the page once it is full of newer rows
+        if upper is not None and len(rows) > limit and rows[limit].sort_key >= upper:
+            break
+        key = _key(db, table)
+        query = select(*(table.c[column] for column in audit_storage.AUDIT_COLUMNS), key.label("sort_key"))
+        if user_id is not None:
+            query = query.where(table.c.user_id == user_id)
+        if action is not None:
+            query = query.where(table.c.action == action)
+        if start is not None:
+            query = query.where(key >= _key_value(db, start))
+        if end is not None:
+            query = query.where(key < _key_value(db, end))
+        if before is not None:
+            query = query.where(tuple_(key, table.c.id) < tuple_(*before))
+        rows += db.execute(query.order_by(key.desc(), table.c.id.desc()).limit(limit + 1)).all()
+        rows = sorted(rows, key=lambda row: (row.sort_key, row.id), reverse=True)[:limit + 1]
+
+    next_cursor = _encode(rows[limit - 1]) if len(rows) > limit else None
+    return [audit_storage.record(row) for row in rows[:limit]], next_cursor
+
+def stream(session_factory, cursor: str | None = None, **filters) -> Iterator[dict]:
+    # Streaming outlives the request's unit of work, so pages are read through
+    # a dedicated session that is closed when the stream ends
+    db = session_factory()
+    try:
+        while True:
+            records, cursor = page(db, limit=STREAM_PAGE_SIZE, cursor=cursor, **filters)
+            yield from records
+            if cursor is None:
+                break
+    finally:
+        db.close()
@@ -0,0 +1,227 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+from datetime import date, datetime, timezone
+from typing import Iterator
+from sqlalchemy import Column, DateTime, Index, Integer, MetaData, String, Table, Text, delete, func, inspect, insert, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from .. import models
+from ..database import IS_SQLITE, IS_SQLITE_MEMORY, SQLALCHEMY_DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+# Audit Storage
+# Audit rows are partitioned by calendar month (UTC):
+#   - Postgres: audit_logs is natively partitioned by RANGE (timestamp)
+#     (migration v0009); the maintenance job creates next month's partition
+#     ahead of time.
+#   - SQLite: audit_logs is the hot table for the current month; the
+#     maintenance job rolls older rows into audit_logs_YYYY_MM tables.
+# Partitions older than AUDIT_RETENTION_MONTHS are written to gzipped NDJSON
+# files in AUDIT_ARCHIVE_DIR, recorded in audit_archives and dropped. Archive
+# files are never rewritten: rows that reach an already-archived month later
+# get a new file. search_archive() reads the files overlapping a time range.
+# AUDIT_ARCHIVE_DIR defaults to audit_archive/ next to the SQLite database file;
+# other databases must set it, and expired months stay in place until they do.
+def _default_archive_dir() -> str | None:
+    if not IS_SQLITE or IS_SQLITE_MEMORY:
+        return None
+    database = os.path.abspath(make_url(SQLALCHEMY_DATABASE_URL).database)
+    return os.path.join(os.path.dirname(database), "audit_archive")
+
+AUDIT_RETENTION_MONTHS = int(os.getenv("AUDIT_RETENTION_MONTHS", "6"))
+AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR") or _default_archive_dir()
+AUDIT_RETENTION_CHECK_SECONDS = int(os.getenv("AUDIT_RETENTION_CHECK_SECONDS", "3600"))
+PARTITION_PATTERN = re.compile(r"^audit_logs_(\d{4})_(\d{2})$")
+AUDIT_COLUMNS = ("id", "action", "details", "user_id", "timestamp")
+
+def month_start(value: date | datetime) -> date:
+    return date(value.year, value.month, 1)
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def bound(month: date) -> datetime:
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite returns naive UTC datetimes
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def iso_utc(value: datetime) -> str:
+    # The API's datetime format (pydantic): UTC with a "Z" suffix, for every audit output
+    return as_utc(value).isoformat().replace("+00:00", "Z")
+
+def partition_name(month: date) -> str:
+    return f"audit_logs_{month:%Y_%m}"
+
+_partition_metadata = MetaData()
+
+def partition_table(name: str) -> Table:
+    # Same columns as audit_logs; used for SQLite partitions and to read any partition
+    if name not in _partition_metadata.tables:
+        table = Table(
+            name, _partition_metadata,
+            Column("id", Integer, primary_key=True),
+            Column("action", String),
+            Column("details", Text),
+            Column("user_id", Integer),
+            Column("timestamp", DateTime(timezone=True)),
+        )
+        Index(f"ix_{name}_timestamp_id", table.c.timestamp, table.c.id)
+        Index(f"ix_{name}_user_timestamp_id", table.c.user_id, table.c.timestamp, table.c.id)
+        Index(f"ix_{name}_action_timestamp_id", table.c.action, table.c.timestamp, table.c.id)
+    return _partition_metadata.tables[name]
+
+def is_native(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return db.execute(text("SELECT relkind FROM pg_class WHERE relname = 'audit_logs' AND relkind = 'p'")).first() is not None
+
+def partitions(db: Session) -> dict[date, str]:
+    """Monthly partitions ({month: table name}), excluding the SQLite hot table."""
+    if is_native(db):
+        names = db.scalars(text(
+            "SELECT child.relname FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent WHERE parent.relname = 'audit_logs'"
+        ))
+    else:
+        names = inspect(db.connection()).get_table_names()
+    found = {}
+    for name in names:
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            found[date(int(match[1]), int(match[2]), 1)] = name
+    return found
+
+def create_native_partition(db, month: date):
+    # `db` is a Session or, from the migration, a Connection
+    db.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF audit_logs "
+        f"FOR VALUES FROM ('{bound(month).isoformat()}') TO ('{bound(add_months(month, 1)).isoformat()}')"
+    ))
+
+def _log(db: Session, action: str, details: str):
+    # Written straight to the hot table: the job runs outside any request
+    db.execute(insert(models.AuditLog).values(action=action, details=details, timestamp=datetime.now(timezone.utc)))
+
+def roll(db: Session, current: date) -> dict[date, int]:
+    """SQLite: move hot rows from months before `current` into their monthly tables (commits)."""
+    hot = models.AuditLog.__table__
+    moved = {}
+    while True:
+        oldest = db.scalar(select(func.min(hot.c.timestamp)).where(hot.c.timestamp < bound(current)))
+        if oldest is None:
+            break
+        month = month_start(oldest)
+        in_month = (hot.c.timestamp >= bound(month)) & (hot.c.timestamp < bound(add_months(month, 1)))
+        table = partition_table(partition_name(month))
+        table.create(db.connection(), checkfirst=True)
+        count = db.execute(insert(table).from_select(AUDIT_COLUMNS, select(*(hot.c[column] for column in AUDIT_COLUMNS)).where(in_month))).rowcount
+        # Logged before the delete so the hot table never empties and ids are not reused
+        _log(db, "ROLL_AUDIT_PARTITION", f"Moved {count} audit row(s) of {month:%Y-%m} into {table.name}")
+        db.execute(delete(hot).where(in_month))
+        db.commit()
+        moved[month] = count
+    return moved
+
+def _archive_path(name: str) -> str:
+    path = os.path.join(AUDIT_ARCHIVE_DIR, f"{name}.ndjson.gz")
+    suffix = 1
+    while os.path.exists(path):
+        path = os.path.join(AUDIT_ARCHIVE_DIR, f"{name}.{suffix}.ndjson.gz")
+        suffix += 1
+    return path
+
+def record(row) -> dict:
+    values = {column: row._mapping[column] for column in AUDIT_COLUMNS}
+    values["timestamp"] = iso_utc(values["timestamp"]) if values["timestamp"] else None
+    return values
+
+def archive(db: Session, month: date, name: str) -> models.AuditArchive | None:
+    """Write one partition to an archive file, record it and drop the partition (commits)."""
+    table = partition_table(name)
+    os.makedirs(AUDIT_ARCHIVE_DIR, exist_ok=True)
+    path = _archive_path(name)
+    temporary = f"{path}.tmp"
+    digest = hashlib.sha256()
+    rows = 0
+    with open(temporary, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as compressed:
+            for row in db.execute(select(table).order_by(table.c.timestamp, table.c.id).execution_options(yield_per=5000)):
+                line = (json.dumps(record(row), separators=(",", ":")) + "\n").encode()
+                compressed.write(line)
+                digest.update(line)
+                rows += 1
+        raw.flush()
+        os.fsync(raw.fileno())
+
+    entry = None
+    if rows:
+        os.link(temporary, path) # Fails rather than overwrite an existing archive
+        os.chmod(path, 0o444)
+        entry = models.AuditArchive(
+            period_start=bound(month), period_end=bound(add_months(month, 1)), path=path, rows=rows, sha256=digest.hexdigest()
+        )
+        db.add(entry)
+    os.remove(temporary)
+
+    if is_native(db):
+        db.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {name}"))
+        db.execute(text(f"DROP TABLE {name}"))
+    else:
+        table.drop(db.connection())
+    _log(db, "ARCHIVE_AUDIT_PARTITION", f"Archived {rows} audit row(s) of {month:%Y-%m}" + (f" to {path}" if rows else ""))
+    db.commit()
+    return entry
+
+def maintain(db: Session, now: datetime | None = None) -> dict:
+    """Periodic job: keep partitions ahead (Postgres) or roll the hot table (SQLite), then archive expired months."""
+    current = month_start(as_utc(now or datetime.now(timezone.utc)))
+    rolled = {}
+    if is_native(db):
+        create_native_partition(db, current)
+        create_native_partition(db, add_months(current, 1))
+        db.commit()
+    else:
+        rolled = roll(db, current)
+
+    cutoff = add_months(current, -AUDIT_RETENTION_MONTHS)
+    archived = []
+    expired = {month: name for month, name in partitions(db).items() if month < cutoff}
+    if expired and AUDIT_ARCHIVE_DIR is None:
+        logger.warning(f"{len(expired)} audit partition(s) past retention are kept: AUDIT_ARCHIVE_DIR is not set")
+        expired = {}
+    for month, name in sorted(expired.items()):
+        archive(db, month, name)
+        archived.append(f"{month:%Y-%m}")
+    if archived:
+        logger.info(f"Archived audit partitions: {', '.join(archived)}")
+    return {"rolled": {f"{month:%Y-%m}": count for month, count in rolled.items()}, "archived": archived}
+
+# Archive search
+def archives_between(db: Session, start: datetime, end: datetime) -> list[models.AuditArchive]:
+    Archive = models.AuditArchive
+    return db.query(Archive).filter(Archive.period_end > as_utc(start), Archive.period_start < as_utc(end)).order_by(Archive.period_start, Archive.id).all()
+
+def search_archive(paths: list[str], start: datetime, end: datetime, user_id: int | None = None, action: str | None = None) -> Iterator[dict]:
+    """Matching archived rows in [start, end), file by file; needs no database session."""
+    start, end = as_utc(start), as_utc(end)
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as lines:
+            for line in lines:
+                record = json.loads(line)
+                timestamp = datetime.fromisoformat(record["timestamp"]) if record["timestamp"] else None
+                if timestamp is None or not start <= timestamp < end:
+                    continue
+                if user_id is not None and record["user_id"] != user_id:
+                    continue
+                if action is not None and record["action"] != action:
+                    continue
+                record["timestamp"] = iso_utc(timestamp) # Older files hold "+00:00"
+                yield record
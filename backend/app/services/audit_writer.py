@@ -0,0 +1,171 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from .. import models
+from ..database import SessionLocal, after_commit
+from .audit_storage import iso_utc
+from .events import AUDIT, hub
+
+logger = logging.getLogger(__name__)
+
+# Buffered Audit Writer
+# AUDIT_WRITE_MODE selects the durability trade-off:
+#   sync    - row is added to the caller's session and commits with its unit of work (default)
+#   request - events are queued when the unit of work commits and bulk-inserted
+#             before the HTTP response is sent
+#   async   - events are queued when the unit of work commits and bulk-inserted
+#             by a background flusher; at most AUDIT_MAX_QUEUE events can be
+#             lost if the process dies
+# In both buffered modes the flusher also drains the queue every
+# AUDIT_FLUSH_INTERVAL_SECONDS or once AUDIT_BATCH_SIZE events are waiting.
+# Events are pushed to the live audit feed (services/events.py) once committed.
+SYNC, REQUEST, ASYNC = "sync", "request", "async"
+MODES = (SYNC, REQUEST, ASYNC)
+
+class AuditWriter:
+    def __init__(self, session_factory, mode: str = SYNC, batch_size: int = 200, flush_interval: float = 1.0, max_queue: int = 10000):
+        if mode not in MODES:
+            raise ValueError(f"Unknown audit write mode: {mode}")
+        self.session_factory = session_factory
+        self.mode = mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._queue = deque()
+        self._queue_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        # Metrics
+        self.flushed_events = 0
+        self.flush_count = 0
+        self.flush_failures = 0
+        self.dropped_events = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    @property
+    def buffered(self) -> bool:
+        return self.mode != SYNC
+
+    @property
+    def flushes_per_request(self) -> bool:
+        return self.mode == REQUEST
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def submit(self, db: Session, user_id: int | None, action: str, details: str):
+        if not self.buffered:
+            db.add(models.AuditLog(user_id=user_id, action=action, details=details))
+            event = {"user_id": user_id, "action": action, "timestamp": iso_utc(datetime.now(timezone.utc))}
+            after_commit(db, lambda: hub.publish(AUDIT, event))
+            return
+
+        # Queued only once the caller's transaction commits; a rollback drops it
+        event = {"user_id": user_id, "action": action, "details": details, "timestamp": datetime.now(timezone.utc)}
+        after_commit(db, lambda: self._enqueue(event))
+
+    def _enqueue(self, event: dict):
+        with self._queue_lock:
+            self._queue.append(event)
+            depth = len(self._queue)
+        if depth >= self.max_queue:
+            # Backpressure keeps the loss window bounded
+            self.flush()
+        elif depth >= self.batch_size:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._queue_lock:
+                events = list(self._queue)
+                self._queue.clear()
+            if not events:
+                return 0
+
+            started = time.perf_counter()
+            db = self.session_factory()
+            try:
+                for offset in range(0, len(events), self.batch_size):
+                    db.execute(insert(models.AuditLog), events[offset:offset + self.batch_size])
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self.flush_failures += 1
+                self._requeue(events)
+                logger.error(f"Audit flush of {len(events)} events failed: {e}")
+                return 0
+            finally:
+                db.close()
+
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.flush_count += 1
+            self.flushed_events += len(events)
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self._total_flush_ms += elapsed_ms
+            for event in events:
+                hub.publish(AUDIT, {"user_id": event["user_id"], "action": event["action"], "timestamp": iso_utc(event["timestamp"])})
+            return len(events)
+
+    def _requeue(self, events: list):
+        with self._queue_lock:
+            room = max(0, self.max_queue - len(self._queue))
+            kept = events[-room:] if room else []
+            self.dropped_events += len(events) - len(kept)
+            self._queue.extendleft(reversed(kept))
+
+    def start(self):
+        if not self.buffered or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._wakeup.set()
+            self._thread.join(timeout=10)
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def metrics(self) -> dict:
+        return {
+            "mode": self.mode,
+            "queue_depth": self.queue_depth,
+            "max_queue": self.max_queue,
+            "flushed_events": self.flushed_events,
+            "flush_count": self.flush_count,
+            "flush_failures": self.flush_failures,
+            "dropped_events": self.dropped_events,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "avg_flush_ms": round(self._total_flush_ms / self.flush_count, 2) if self.flush_count else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 2),
+        }
+
+def _build_writer() -> AuditWriter:
+    return AuditWriter(
+        SessionLocal,
+        mode=os.getenv("AUDIT_WRITE_MODE", SYNC).lower(),
+        batch_size=int(os.getenv("AUDIT_BATCH_SIZE", "200")),
+        flush_interval=float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1.0")),
+        max_queue=int(os.getenv("AUDIT_MAX_QUEUE", "10000")),
+    )
+
+audit_writer = _build_writer()
@@ -0,0 +1,84 @@
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from .. import models, schemas
+from . import serialization, stats, versions
+
+# Change Feed
+# Every write to a synced entity appends (seq, entity, id, op) rows to
+# change_log in the same transaction, and deletes leave a tombstone. Sequence
+# numbers are allocated from the change_log counter in table_versions, whose
+# row stays locked until the writer commits, so they become visible in order:
+# a client that has seen seq N never later finds a smaller one. A feed page
+# is compacted to the latest op per entity, and upserts carry the entity's
+# current row, so a client that syncs rarely receives each changed row once.
+UPSERT, DELETE = "UPSERT", "DELETE"
+ENTITIES = {
+    "inventory": (models.InventoryItem, schemas.Inventory),
+    "trainings": (models.TrainingProgram, schemas.TrainingSummary),
+    "content": (models.ContentItem, schemas.ContentOut),
+}
+ENTITY_NAMES = {model: name for name, (model, _) in ENTITIES.items()}
+FETCH_CHUNK_SIZE = 500
+
+def latest_seq(db: Session) -> int:
+    return versions.read(db, models.ChangeLog)[models.ChangeLog.__tablename__]
+
+def _allocate(db: Session, count: int) -> int:
+    # Last of `count` new sequence numbers; the counter row stays locked until commit
+    Version = models.TableVersion
+    stats.increment(db, Version, "name", [{"name": models.ChangeLog.__tablename__, "version": count}], ("version",))
+    return db.scalar(select(Version.version).where(Version.name == models.ChangeLog.__tablename__))
+
+def record(db: Session, model, ids, op: str = UPSERT):
+    """Log changes to `model` rows and bump the table's version (no commit)."""
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        return
+    first = _allocate(db, len(ids)) - len(ids) + 1
+    db.execute(insert(models.ChangeLog), [
+        {"seq": first + offset, "entity": ENTITY_NAMES[model], "entity_id": entity_id, "op": op}
+        for offset, entity_id in enumerate(ids)
+    ])
+    versions.bump(db, model)
+
+def _current_rows(db: Session, name: str, ids: list[int]) -> list[dict]:
+    model, schema = ENTITIES[name]
+    rows = []
+    for start in range(0, len(ids), FETCH_CHUNK_SIZE):
+        query = select(*serialization.schema_columns(model, schema)).where(model.id.in_(ids[start:start + FETCH_CHUNK_SIZE]))
+        rows += serialization.row_dicts(db.execute(query))
+    return rows
+
+def feed(db: Session, since: int, limit: int = 1000, entities: list[str] | None = None) -> dict:
+    """Compacted changes after `since`, at most `limit` log entries; resume from `next`."""
+    Log = models.ChangeLog
+    last = latest_seq(db) # Read first: every seq up to it is committed
+    query = select(Log.seq, Log.entity, Log.entity_id, Log.op).where(Log.seq > since)
+    if entities:
+        query = query.where(Log.entity.in_(entities))
+    entries = db.execute(query.order_by(Log.seq).limit(limit + 1)).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    latest = {}
+    for entry in entries:
+        latest[(entry.entity, entry.entity_id)] = entry.op
+    changes = {}
+    for name, (model, schema) in ENTITIES.items():
+        upserted = sorted(entity_id for (entity, entity_id), op in latest.items() if entity == name and op == UPSERT)
+        deleted = {entity_id for (entity, entity_id), op in latest.items() if entity == name and op == DELETE}
+        if not upserted and not deleted:
+            continue
+        rows = _current_rows(db, name, upserted)
+        # Gone since it was logged; its tombstone follows on a later page
+        deleted |= set(upserted) - {row["id"] for row in rows}
+        changes[name] = {
+            "upserted": serialization.list_adapter(schema).dump_python(serialization.normalize_rows(rows, schema), mode="json"),
+            "deleted": sorted(deleted),
+        }
+
+    if has_more:
+        next_seq = entries[-1].seq
+    else:
+        next_seq = max([since, last] + [entry.seq for entry in entries[-1:]])
+    return {"since": since, "next": next_seq, "has_more": has_more, "changes": changes}
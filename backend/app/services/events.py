@@ -0,0 +1,120 @@
+import asyncio
+import itertools
+import json
+import logging
+import os
+from typing import AsyncIterator, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Event Hub (Server-Sent Events)
+# In-process publish/subscribe. Write paths publish once their transaction has
+# committed, from any thread; the event is serialized once and handed to the
+# event loop, which copies it into the bounded queue of every subscriber of
+# that topic. An idle stream is a coroutine parked on its queue, woken only for
+# events and heartbeats. A subscriber whose queue is full is evicted instead of
+# slowing publishers or buffering without bound; its client reconnects and
+# re-reads the current state. Events are not persisted or shared between
+# processes: each API process pushes the writes it handled itself.
+EVENTS_CLIENT_BUFFER = int(os.getenv("EVENTS_CLIENT_BUFFER", "100"))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+# Streams are closed after this long so clients re-authenticate on reconnect
+EVENTS_MAX_STREAM_SECONDS = float(os.getenv("EVENTS_MAX_STREAM_SECONDS", "3600"))
+RECONNECT_MS = 3000
+COUNTERS, AUDIT = "counters", "audit"
+
+class Subscription:
+    def __init__(self, topics: Iterable[str], buffer_size: int):
+        self.topics = frozenset(topics)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.evicted = False
+
+class EventHub:
+    def __init__(self, buffer_size: int = EVENTS_CLIENT_BUFFER, heartbeat: float = EVENTS_HEARTBEAT_SECONDS, max_stream: float = EVENTS_MAX_STREAM_SECONDS):
+        self.buffer_size = buffer_size
+        self.heartbeat = heartbeat
+        self.max_stream = max_stream
+        self._subscribers: set[Subscription] = set()
+        self._loop = None
+        self._ids = itertools.count(1)
+        # Metrics
+        self.published = 0
+        self.delivered = 0
+        self.evicted = 0
+
+    def publish(self, topic: str, data):
+        # Thread-safe; costs nothing while nobody is subscribed
+        loop = self._loop
+        if loop is None or not self._subscribers:
+            return
+        event = (next(self._ids), topic, json.dumps(data, separators=(",", ":"), default=str))
+        try:
+            loop.call_soon_threadsafe(self._dispatch, event)
+        except RuntimeError:
+            pass # Event loop already closed (shutdown)
+
+    def _dispatch(self, event: tuple):
+        self.published += 1
+        for subscription in list(self._subscribers):
+            if event[1] not in subscription.topics:
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                self._evict(subscription)
+
+    def _evict(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+        subscription.evicted = True
+        self.evicted += 1
+        # Drop the backlog and wake the stream so it can close
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+        logger.info("Evicted a slow event stream subscriber")
+
+    def subscribe(self, topics: Iterable[str]) -> Subscription:
+        # Called on the event loop
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(topics, self.buffer_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    async def stream(self, subscription: Subscription) -> AsyncIterator[str]:
+        """SSE frames for one subscriber until it is evicted or the stream times out."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_stream
+        try:
+            yield f"retry: {RECONNECT_MS}\n\n"
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    return
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), min(self.heartbeat, remaining))
+                except asyncio.TimeoutError:
+                    # Comment line: keeps proxies from closing an idle connection
+                    yield ": heartbeat\n\n"
+                    continue
+                if event is None:
+                    yield "event: evicted\ndata: {}\n\n"
+                    return
+                event_id, topic, data = event
+                yield f"id: {event_id}\nevent: {topic}\ndata: {data}\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    def metrics(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "buffer_size": self.buffer_size,
+            "published": self.published,
+            "delivered": self.delivered,
+            "evicted": self.evicted,
+        }
+
+hub = EventHub()
@@ -0,0 +1,164 @@
+import csv
+import io
+import os
+import tempfile
+from datetime import date
+from typing import Iterable, Iterator
+from .. import crud, models, schemas
+
+# Streaming Inventory Export (Clause 4.5)
+# Rows are pulled from the DB with yield_per and written out incrementally, so
+# memory stays flat regardless of how many rows the filters match.
+FETCH_SIZE = 1000
+EXPORT_COLUMNS = [
+    ("Kit ID", models.InventoryItem.kit_id),
+    ("Item Name", models.InventoryItem.name),
+    ("Category", models.InventoryItem.category),
+    ("Model", models.InventoryItem.model),
+    ("Serial No", models.InventoryItem.serial_number),
+    ("Status", models.InventoryItem.status),
+    ("State", models.InventoryItem.state),
+    ("District", models.InventoryItem.district),
+    ("Institution", models.InventoryItem.institution),
+    ("Batch ID", models.InventoryItem.batch_id),
+]
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+
+def export_rows(session_factory, filters: schemas.InventoryFilter) -> Iterator[tuple]:
+    # Streaming outlives the request's unit of work, so rows are read through
+    # a dedicated session that is closed when the stream ends.
+    db = session_factory()
+    try:
+        columns = [column for _, column in EXPORT_COLUMNS]
+        query = crud.filter_inventory(db, filters).with_entities(*columns).order_by(models.InventoryItem.id)
+        yield from query.yield_per(FETCH_SIZE)
+    finally:
+        db.close()
+
+def export_filename(format: str) -> str:
+    return f"inventory_report_{date.today().isoformat()}.{format}"
+
+def stream_csv(rows: Iterable[tuple]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([label for label, _ in EXPORT_COLUMNS])
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % FETCH_SIZE == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+def stream_xlsx(rows: Iterable[tuple]) -> Iterator[bytes]:
+    # openpyxl write-only mode spools sheet XML to disk; the finished file is
+    # then streamed back in chunks and removed.
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Inventory")
+    sheet.append([label for label, _ in EXPORT_COLUMNS])
+    for row in rows:
+        sheet.append(list(row))
+
+    handle, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(handle)
+    try:
+        workbook.save(path)
+        with open(path, "rb") as f:
+            while chunk := f.read(64 * 1024):
+                yield chunk
+    finally:
+        os.remove(path)
+
+# Minimal PDF writer: objects are emitted as soon as a page is full and their
+# byte offsets are tracked for the trailing xref table, so no page is kept.
+_PDF_PAGE_WIDTH = 842 # A4 landscape, points
+_PDF_PAGE_HEIGHT = 595
+_PDF_MARGIN = 36
+_PDF_FONT_SIZE = 8
+_PDF_LINE_HEIGHT = 11
+_PDF_COLUMN_WIDTHS = [70, 120, 70, 70, 80, 60, 70, 70, 120, 40]
+
+def _pdf_escape(value) -> str:
+    text = "" if value is None else str(value)
+    text = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+def _pdf_fit(value, width: int) -> str:
+    text = "" if value is None else str(value)
+    max_chars = int(width / (_PDF_FONT_SIZE * 0.5))
+    return text if len(text) <= max_chars else text[:max_chars - 1] + "~"
+
+def _pdf_line(values, y: int, font: str) -> str:
+    parts = []
+    x = _PDF_MARGIN
+    for value, width in zip(values, _PDF_COLUMN_WIDTHS):
+        parts.append(f"BT /{font} {_PDF_FONT_SIZE} Tf {x} {y} Td ({_pdf_escape(_pdf_fit(value, width))}) Tj ET")
+        x += width
+    return "\n".join(parts)
+
+def stream_pdf(rows: Iterable[tuple], title: str = "Project SAMARTH - Inventory Report") -> Iterator[bytes]:
+    offsets = {}
+    position = 0
+    page_ids = []
+    next_id = 5 # 1 catalog, 2 page tree, 3-4 fonts
+
+    def emit(obj_id: int, body: bytes) -> bytes:
+        nonlocal position
+        offsets[obj_id] = position
+        data = f"{obj_id} 0 obj\n".encode() + body + b"\nendobj\n"
+        position += len(data)
+        return data
+
+    def page(lines: list[str]) -> bytes:
+        nonlocal next_id
+        content = "\n".join(lines).encode("latin-1")
+        content_id, page_id = next_id, next_id + 1
+        next_id += 2
+        page_ids.append(page_id)
+        return (
+            emit(content_id, f"<< /Length {len(content)} >>\nstream\n".encode() + content + b"\nendstream")
+            + emit(page_id, (
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_PDF_PAGE_WIDTH} {_PDF_PAGE_HEIGHT}] "
+                f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {content_id} 0 R >>"
+            ).encode())
+        )
+
+    header = b"%PDF-1.4\n"
+    position = len(header)
+    yield header
+    yield emit(3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    yield emit(4, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>")
+
+    top = _PDF_PAGE_HEIGHT - _PDF_MARGIN
+    page_header = [
+        f"BT /F2 12 Tf {_PDF_MARGIN} {top} Td ({_pdf_escape(title)}) Tj ET",
+        _pdf_line([label for label, _ in EXPORT_COLUMNS], top - 2 * _PDF_LINE_HEIGHT, "F2"),
+    ]
+    lines, y = list(page_header), top - 3 * _PDF_LINE_HEIGHT
+    for row in rows:
+        if y < _PDF_MARGIN:
+            yield page(lines)
+            lines, y = list(page_header), top - 3 * _PDF_LINE_HEIGHT
+        lines.append(_pdf_line(row, y, "F1"))
+        y -= _PDF_LINE_HEIGHT
+    yield page(lines)
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    yield emit(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode())
+    yield emit(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    xref_position = position
+    size = next_id
+    xref = [f"xref\n0 {size}\n", "0000000000 65535 f \n"]
+    for obj_id in range(1, size):
+        xref.append(f"{offsets[obj_id]:010d} 00000 n \n")
+    xref.append(f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref_position}\n%%EOF\n")
+    yield "".join(xref).encode()
+
+STREAMERS = {"csv": stream_csv, "xlsx": stream_xlsx, "pdf": stream_pdf}
@@ -0,0 +1,142 @@
+import codecs
+import csv
+from itertools import islice
+from typing import BinaryIO, Iterator
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.orm import Session
+from .. import crud, models, schemas
+from . import changes, ledger, rollups, stats
+
+# Bulk Inventory Import (CSV / XLSX)
+# Rows are parsed lazily and processed in chunks: one set-based duplicate check
+# per chunk, then executemany inserts for items and their ledger rows. The whole
+# import is part of the request's single transaction, with one summary audit entry.
+CHUNK_SIZE = 1000
+UNIQUE_FIELDS = crud.INVENTORY_UNIQUE_FIELDS
+
+class ImportFormatError(Exception):
+    pass
+
+def _normalize_header(value) -> str:
+    return str(value or "").strip().lower().replace(" ", "_")
+
+def _normalize_cell(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+def _iter_csv(stream: BinaryIO) -> Iterator[list]:
+    text_stream = codecs.getreader("utf-8-sig")(stream)
+    try:
+        yield from csv.reader(text_stream)
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise ImportFormatError(f"Unreadable CSV file: {e}")
+
+def _iter_xlsx(stream: BinaryIO) -> Iterator[tuple]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFormatError("XLSX import requires openpyxl")
+    try:
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except Exception as e:
+        raise ImportFormatError(f"Unreadable XLSX file: {e}")
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+def iter_import_rows(stream: BinaryIO, filename: str) -> Iterator[tuple[int, dict]]:
+    """Yield (row_number, record) pairs; row 1 is the header."""
+    name = (filename or "").lower()
+    if name.endswith(".csv"):
+        raw_rows = _iter_csv(stream)
+    elif name.endswith(".xlsx"):
+        raw_rows = _iter_xlsx(stream)
+    else:
+        raise ImportFormatError("Unsupported file type (expected .csv or .xlsx)")
+
+    header = next(raw_rows, None)
+    if not header:
+        raise ImportFormatError("File is empty")
+    columns = [_normalize_header(value) for value in header]
+    if "kit_id" not in columns:
+        raise ImportFormatError("Missing required column: kit_id")
+
+    for row_number, values in enumerate(raw_rows, start=2):
+        if not any(_normalize_cell(value) for value in values):
+            continue # Skip blank lines
+        record = {column: _normalize_cell(value) for column, value in zip(columns, values) if column}
+        yield row_number, record
+
+def _existing_keys(db: Session, items: list[schemas.InventoryCreate]) -> dict[str, set]:
+    Item = models.InventoryItem
+    wanted = {field: {getattr(item, field) for item in items if getattr(item, field)} for field in UNIQUE_FIELDS}
+    clauses = [getattr(Item, field).in_(values) for field, values in wanted.items() if values]
+    existing = {field: set() for field in UNIQUE_FIELDS}
+    if not clauses:
+        return existing
+    for row in db.execute(select(Item.kit_id, Item.serial_number, Item.qr_code).where(or_(*clauses))):
+        for field in UNIQUE_FIELDS:
+            value = getattr(row, field)
+            if value in wanted[field]:
+                existing[field].add(value)
+    return existing
+
+def _import_chunk(db: Session, chunk: list[tuple[int, dict]], seen: dict[str, set], user_id: int, errors: list) -> int:
+    valid = []
+    for row_number, record in chunk:
+        try:
+            item = schemas.InventoryCreate(**{key: value for key, value in record.items() if value is not None})
+        except ValidationError as e:
+            message = "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+            errors.append({"row": row_number, "kit_id": record.get("kit_id"), "error": message})
+            continue
+        valid.append((row_number, item))
+
+    existing = _existing_keys(db, [item for _, item in valid])
+    accepted = []
+    for row_number, item in valid:
+        conflict = None
+        for field in UNIQUE_FIELDS:
+            value = getattr(item, field)
+            if value and (value in existing[field] or value in seen[field]):
+                conflict = str(crud.DuplicateKeyError(field, value))
+                break
+        if conflict:
+            errors.append({"row": row_number, "kit_id": item.kit_id, "error": conflict})
+            continue
+        for field in UNIQUE_FIELDS:
+            if getattr(item, field):
+                seen[field].add(getattr(item, field))
+        accepted.append(item)
+
+    if not accepted:
+        return 0
+
+    ids = db.execute(insert(models.InventoryItem).returning(models.InventoryItem.id), [item.model_dump() for item in accepted]).scalars().all()
+    db.execute(insert(models.InventoryTransaction), ledger.stamp(db, [
+        ledger.ledger_row(item, ledger.INITIAL_ALLOCATION, "VENDOR", user_id) for item in accepted
+    ]))
+    stats.inventory_created(db, [item.status for item in accepted])
+    rollups.items_created(db, accepted)
+    changes.record(db, models.InventoryItem, ids)
+    return len(accepted)
+
+def import_inventory(db: Session, rows: Iterator[tuple[int, dict]], user_id: int, filename: str, chunk_size: int = CHUNK_SIZE) -> dict:
+    seen = {field: set() for field in UNIQUE_FIELDS}
+    errors = []
+    total = created = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        total += len(chunk)
+        created += _import_chunk(db, chunk, seen, user_id, errors)
+
+    errors.sort(key=lambda error: error["row"])
+    # One summary audit entry for the whole import
+    crud.log_audit(db, user_id, "IMPORT_INVENTORY", f"Imported {created}/{total} items from {filename} ({len(errors)} rejected)")
+    return {"total": total, "created": created, "failed": len(errors), "errors": errors}
@@ -0,0 +1,275 @@
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from .. import models
+from ..pagination import decode_cursor, encode_cursor
+from . import changes, rollups, stats
+
+logger = logging.getLogger(__name__)
+
+# Stock Ledger (Clause 4.4)
+# Every movement appends an inventory_transactions row holding the kit's
+# position after the move, and updates the kit's current position on the
+# inventory row in the same transaction. Point-in-time queries start from the
+# nearest stock snapshot at or before the requested time and replay only the
+# ledger rows between that snapshot and the next one, so their cost depends on
+# the snapshot cadence, not on the size of the ledger. Ledger rows are numbered
+# (seq) from a counter row in table_versions that stays locked until the writer
+# commits, so seq follows commit order: once a snapshot has seen seq N, no row
+# with a smaller seq can still appear. The timestamp is stamped with the seq
+# rather than left to the database default (transaction start on Postgres), so
+# both follow the same order and `at` bounds the replay consistently. Positions carry the kit's category so
+# readers of the ledger and snapshots (utilization) need not join inventory.
+INITIAL_ALLOCATION, ALLOCATE, RETURN, CONSUME, TRANSFER, REMOVE = (
+    "INITIAL_ALLOCATION", "ALLOCATE", "RETURN", "CONSUME", "TRANSFER", "REMOVE"
+)
+AVAILABLE, ALLOCATED, CONSUMED = "AVAILABLE", "ALLOCATED", "CONSUMED"
+POSITION_COLUMNS = ("status", "category", "state", "district", "institution", "batch_id")
+
+# A snapshot is taken once this many ledger rows have accumulated since the
+# last one, or after the interval if anything moved at all
+STOCK_SNAPSHOT_ROWS = int(os.getenv("STOCK_SNAPSHOT_ROWS", "50000"))
+STOCK_SNAPSHOT_INTERVAL_HOURS = float(os.getenv("STOCK_SNAPSHOT_INTERVAL_HOURS", "24"))
+STOCK_SNAPSHOT_CHECK_SECONDS = int(os.getenv("STOCK_SNAPSHOT_CHECK_SECONDS", "300"))
+SNAPSHOT_CHUNK_SIZE = 5000
+
+def location(position) -> str:
+    return f"{position.state}/{position.district or '-'}/{position.institution or '-'}"
+
+def position(row) -> dict:
+    return {column: getattr(row, column) for column in POSITION_COLUMNS}
+
+def ledger_row(item, action_type: str, from_location: str | None, user_id: int) -> dict:
+    return {
+        "kit_id": item.kit_id,
+        "action_type": action_type,
+        "from_location": from_location,
+        "to_location": location(item),
+        "user_id": user_id,
+        **position(item),
+    }
+
+def stamp(db: Session, rows: list[dict]) -> list[dict]:
+    """Number and timestamp new ledger rows (column dicts) in commit order (no commit)."""
+    Version, name = models.TableVersion, models.InventoryTransaction.__tablename__
+    stats.increment(db, Version, "name", [{"name": name, "version": len(rows)}], ("version",))
+    first = db.scalar(select(Version.version).where(Version.name == name)) - len(rows) + 1
+    # Taken under the counter lock, so timestamps do not go backwards along seq
+    now = datetime.now(timezone.utc)
+    for seq, row in enumerate(rows, start=first):
+        row["seq"] = seq
+        row.setdefault("timestamp", now)
+    return rows
+
+def as_utc(at: datetime) -> datetime:
+    # Naive datetimes are taken as UTC, like the ledger timestamps
+    return at.replace(tzinfo=timezone.utc) if at.tzinfo is None else at.astimezone(timezone.utc)
+
+# Movements
+def _moved_position(item: models.InventoryItem, action_type: str, destination: dict | None, batch_id: int | None) -> dict:
+    moved = position(item)
+    if action_type == ALLOCATE:
+        moved.update(status=ALLOCATED, batch_id=batch_id)
+    elif action_type == RETURN:
+        moved.update(status=AVAILABLE, batch_id=None)
+    elif action_type == CONSUME:
+        moved.update(status=CONSUMED)
+    if destination:
+        moved.update(destination)
+    return moved
+
+def _movement_error(item: models.InventoryItem, action_type: str) -> str | None:
+    if item.status == CONSUMED:
+        return f"{item.kit_id} is consumed"
+    if action_type == ALLOCATE and item.status != AVAILABLE:
+        return f"{item.kit_id} is {item.status}, not {AVAILABLE}"
+    if action_type == RETURN and item.status != ALLOCATED:
+        return f"{item.kit_id} is {item.status}, not {ALLOCATED}"
+    return None
+
+def move(db: Session, kit_ids: list[str], action_type: str, user_id: int, destination: dict | None = None, batch_id: int | None = None) -> list[models.InventoryTransaction]:
+    """Apply one movement to every kit in `kit_ids` (no commit); raises ValueError on invalid moves."""
+    Item = models.InventoryItem
+    kit_ids = list(dict.fromkeys(kit_ids))
+    if action_type == ALLOCATE:
+        if batch_id is None:
+            raise ValueError("batch_id is required to allocate kits")
+        if db.get(models.Batch, batch_id) is None:
+            raise ValueError(f"Batch {batch_id} not found")
+    if action_type == TRANSFER and not destination:
+        raise ValueError("A destination state is required to transfer kits")
+
+    items = db.query(Item).filter(Item.kit_id.in_(kit_ids)).order_by(Item.id).with_for_update().all()
+    errors = [f"Unknown kit {kit_id}" for kit_id in sorted(set(kit_ids) - {item.kit_id for item in items})]
+    errors += filter(None, (_movement_error(item, action_type) for item in items))
+    if errors:
+        raise ValueError("; ".join(errors))
+
+    rows = []
+    status_deltas, rollup_deltas = Counter(), Counter()
+    for item in items:
+        from_location = location(item)
+        status_deltas[item.status] -= 1
+        rollup_deltas[rollups.leaf(item)] -= 1
+        for column, value in _moved_position(item, action_type, destination, batch_id).items():
+            setattr(item, column, value)
+        status_deltas[item.status] += 1
+        rollup_deltas[rollups.leaf(item)] += 1
+        rows.append(ledger_row(item, action_type, from_location, user_id))
+    transactions = [models.InventoryTransaction(**row) for row in stamp(db, rows)]
+    db.add_all(transactions)
+    db.flush()
+    stats.inventory_moved(db, status_deltas)
+    rollups.adjust(db, rollup_deltas)
+    changes.record(db, Item, [item.id for item in items])
+    return transactions
+
+def history(db: Session, kit_id: str, limit: int = 100, before_id: int | None = None) -> list[models.InventoryTransaction]:
+    # Newest first; keyset on id
+    Tx = models.InventoryTransaction
+    query = db.query(Tx).filter(Tx.kit_id == kit_id)
+    if before_id is not None:
+        query = query.filter(Tx.id < before_id)
+    return query.order_by(Tx.id.desc()).limit(limit).all()
+
+# Point-in-time positions
+def apply(positions: dict, row):
+    # Replays one ledger row onto {kit_id: position}
+    if row.action_type == REMOVE or row.status is None:
+        positions.pop(row.kit_id, None)
+    else:
+        positions[row.kit_id] = position(row)
+
+def _matches(row, filters: dict) -> bool:
+    return all(getattr(row, column) == value for column, value in filters.items())
+
+def _after(cursor: str | None) -> str | None:
+    # Keyset cursor on kit_id, the order of every position listing
+    if not cursor:
+        return None
+    kit_id = decode_cursor(cursor).get("kit_id")
+    if not isinstance(kit_id, str):
+        raise ValueError("Invalid cursor")
+    return kit_id
+
+def _page(items: list[dict], limit: int | None) -> tuple[list[dict], str | None]:
+    if limit is None or len(items) <= limit:
+        return items, None
+    return items[:limit], encode_cursor({"kit_id": items[limit - 1]["kit_id"]})
+
+def current_positions(db: Session, limit: int | None = None, cursor: str | None = None, **filters) -> tuple[list[dict], str | None]:
+    """Current positions by kit_id, one page of `limit` (all if None), and the next page's cursor."""
+    Item = models.InventoryItem
+    after = _after(cursor)
+    query = db.query(Item.kit_id, *(getattr(Item, column) for column in POSITION_COLUMNS))
+    for column, value in filters.items():
+        query = query.filter(getattr(Item, column) == value)
+    if after is not None:
+        query = query.filter(Item.kit_id > after)
+    query = query.order_by(Item.kit_id)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    return _page([{"kit_id": row.kit_id, **position(row)} for row in query], limit)
+
+def positions_at(db: Session, at: datetime, limit: int | None = None, cursor: str | None = None, **filters) -> dict:
+    """Positions of the kits matching `filters` (position columns) at time `at`, paged like current_positions."""
+    Snapshot, SnapshotItem, Tx = models.StockSnapshot, models.StockSnapshotItem, models.InventoryTransaction
+    at = as_utc(at)
+    after = _after(cursor)
+    filters = {column: value for column, value in filters.items() if value is not None}
+
+    base = db.query(Snapshot).filter(Snapshot.taken_at <= at).order_by(Snapshot.taken_at.desc(), Snapshot.id.desc()).first()
+    tail = db.query(Tx.kit_id, Tx.action_type, *(getattr(Tx, column) for column in POSITION_COLUMNS)).filter(Tx.timestamp <= at)
+    if base is not None:
+        tail = tail.filter(Tx.seq > base.seq)
+    # Rows up to `at` all precede the next snapshot, so the replay stops there
+    following = db.query(Snapshot.seq).filter(Snapshot.taken_at > at).order_by(Snapshot.taken_at).limit(1).scalar()
+    if following is not None:
+        tail = tail.filter(Tx.seq <= following)
+    if after is not None:
+        tail = tail.filter(Tx.kit_id > after)
+
+    latest = {}
+    replayed = 0
+    for row in tail.order_by(Tx.seq).yield_per(SNAPSHOT_CHUNK_SIZE):
+        latest[row.kit_id] = row
+        replayed += 1
+
+    positions = {}
+    if base is not None:
+        query = db.query(SnapshotItem.kit_id, *(getattr(SnapshotItem, column) for column in POSITION_COLUMNS)).filter(SnapshotItem.snapshot_id == base.id)
+        for column, value in filters.items():
+            query = query.filter(getattr(SnapshotItem, column) == value)
+        if after is not None:
+            query = query.filter(SnapshotItem.kit_id > after)
+        # The page can only hold the first limit + 1 snapshot rows not superseded by the tail
+        for row in query.order_by(SnapshotItem.kit_id).yield_per(SNAPSHOT_CHUNK_SIZE):
+            if row.kit_id not in latest:
+                positions[row.kit_id] = position(row)
+                if limit is not None and len(positions) > limit:
+                    break
+    for kit_id, row in latest.items():
+        if row.action_type != REMOVE and row.status is not None and _matches(row, filters):
+            positions[kit_id] = position(row)
+
+    kit_ids = sorted(positions) if limit is None else sorted(positions)[:limit + 1]
+    items, next_cursor = _page([{"kit_id": kit_id, **positions[kit_id]} for kit_id in kit_ids], limit)
+    return {
+        "at": at,
+        "snapshot_id": base.id if base else None,
+        "snapshot_at": base.taken_at if base else None,
+        "replayed": replayed,
+        "items": items,
+        "next_cursor": next_cursor,
+    }
+
+# Snapshots
+def take_snapshot(db: Session) -> models.StockSnapshot | None:
+    """Snapshot every position as of the newest ledger row (no commit); None if nothing moved."""
+    Snapshot, SnapshotItem, Tx = models.StockSnapshot, models.StockSnapshotItem, models.InventoryTransaction
+    last = db.query(Tx.id, Tx.seq, Tx.timestamp).order_by(Tx.seq.desc()).first()
+    base = db.query(Snapshot).order_by(Snapshot.seq.desc()).first()
+    if last is None or (base is not None and base.seq >= last.seq):
+        return None
+
+    # Built by replaying the ledger onto the previous snapshot rather than by
+    # copying the inventory table, so it is exact as of `last` even while kits move
+    positions = {}
+    if base is not None:
+        for row in db.query(SnapshotItem.kit_id, *(getattr(SnapshotItem, column) for column in POSITION_COLUMNS)).filter(SnapshotItem.snapshot_id == base.id).yield_per(SNAPSHOT_CHUNK_SIZE):
+            positions[row.kit_id] = position(row)
+    tail = db.query(Tx.kit_id, Tx.action_type, *(getattr(Tx, column) for column in POSITION_COLUMNS)).filter(Tx.seq <= last.seq)
+    if base is not None:
+        tail = tail.filter(Tx.seq > base.seq)
+    for row in tail.order_by(Tx.seq).yield_per(SNAPSHOT_CHUNK_SIZE):
+        apply(positions, row)
+
+    snapshot = Snapshot(transaction_id=last.id, seq=last.seq, taken_at=last.timestamp, items=len(positions))
+    db.add(snapshot)
+    db.flush()
+    rows = [{"snapshot_id": snapshot.id, "kit_id": kit_id, **values} for kit_id, values in positions.items()]
+    for start in range(0, len(rows), SNAPSHOT_CHUNK_SIZE):
+        db.execute(insert(SnapshotItem), rows[start:start + SNAPSHOT_CHUNK_SIZE])
+    logger.info(f"Stock snapshot {snapshot.id}: {len(rows)} kit(s) as of ledger seq {last.seq}")
+    return snapshot
+
+def snapshot_if_due(db: Session) -> models.StockSnapshot | None:
+    # Background job: owns its session and commits the snapshot
+    Snapshot, Tx = models.StockSnapshot, models.InventoryTransaction
+    base = db.query(Snapshot).order_by(Snapshot.seq.desc()).first()
+    pending = db.query(func.count(Tx.id))
+    if base is not None:
+        pending = pending.filter(Tx.seq > base.seq)
+    pending = pending.scalar()
+    if not pending:
+        return None
+    if base is not None and pending < STOCK_SNAPSHOT_ROWS:
+        created_at = as_utc(base.created_at)
+        if datetime.now(timezone.utc) - created_at < timedelta(hours=STOCK_SNAPSHOT_INTERVAL_HOURS):
+            return None
+    snapshot = take_snapshot(db)
+    db.commit()
+    return snapshot
@@ -1,102 +1,514 @@
-import uuid
+import asyncio
+import hashlib
 import json
+import logging
+import os
 import random
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import anyio
+from sqlalchemy import and_, case, func, insert, or_, select, update
 from sqlalchemy.orm import Session
 from .. import models
+from ..database import SessionLocal, after_commit
+from . import changes, stats
+from .ndu_gateway import AsyncNDUClient, LoopThread, NDUError
+
+logger = logging.getLogger(__name__)
+
+# NDU Synchronization (Clause 4.6)
+# Sync requests are written to the ndu_outbox table in the same transaction as
+# the entity change and delivered by OutboxWorker in the background:
+#   - bounded concurrency (NDU_WORKERS deliveries in flight)
+#   - exponential backoff with jitter between attempts, up to NDU_MAX_ATTEMPTS
+#   - dead-lettering (status DEAD) once attempts run out or NDU rejects the payload
+#   - every entry carries an idempotency key that is sent to NDU, so a retry after
+#     a lost response cannot register the same item twice
+# NDU_GATEWAY_URL selects the pooled HTTP gateway (services/ndu_gateway.py);
+# without it an in-process mock is used. bulk_sync() below covers every pending
+# item at once in grouped payloads.
+PENDING, IN_PROGRESS, DONE, DEAD = "PENDING", "IN_PROGRESS", "DONE", "DEAD"
+SYNC_CONTENT, SYNC_TRAINING, SYNC_PROGRESS = "SYNC_CONTENT", "SYNC_TRAINING", "SYNC_PROGRESS"
+
+NDU_GATEWAY_URL = os.getenv("NDU_GATEWAY_URL")
+NDU_TIMEOUT_SECONDS = float(os.getenv("NDU_TIMEOUT_SECONDS", "10"))
+NDU_BULK_BATCH_SIZE = int(os.getenv("NDU_BULK_BATCH_SIZE", "100"))
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+# Payloads (snapshotted into the outbox when the sync is requested)
+def content_payload(content: models.ContentItem) -> dict:
+    return {
+        "title": content.title,
+        "category": content.category,
+        "duration": content.duration_minutes,
+        "source": "SAMARTH_PORTAL"
+    }
+
+def training_payload(training: models.TrainingProgram) -> dict:
+    return {
+        "program_name": training.title,
+        "instructor": training.instructor,
+        "date": training.date,
+        "participants": training.participants_count
+    }
+
+def progress_payload(batch_id: int, progress_data: dict) -> dict:
+    return {
+        "type": "BATCH_PROGRESS",
+        "batch_id": batch_id,
+        "data": progress_data,
+        "timestamp": _utcnow().isoformat(),
+    }
+
+# Gateways
+# send() delivers one item (outbox worker threads); send_many() delivers items in
+# grouped payloads and returns a per-item result keyed by idempotency key:
+# {"id": ...} on success or {"error": ..., "retryable": bool} on failure.
+class MockNDUGateway:
+    # In-process stand-in; ids derive from the idempotency key, like a real idempotent API
+    PREFIXES = {SYNC_CONTENT: "NDU", SYNC_TRAINING: "NDU-TR", SYNC_PROGRESS: "NDU-PR"}
+
+    def send(self, operation: str, payload: dict, idempotency_key: str) -> dict:
+        digest = hashlib.sha1(idempotency_key.encode()).hexdigest()[:8].upper()
+        return {"id": f"{self.PREFIXES[operation]}-{digest}", "status": "Synced", "message": "Received successfully"}
+
+    async def send_many(self, operation: str, items: list[tuple[str, dict]], batch_size: int = NDU_BULK_BATCH_SIZE) -> dict:
+        return {key: self.send(operation, payload, key) for key, payload in items}
+
+    def metrics(self) -> dict:
+        return {}
+
+    def close(self):
+        pass
+
+class HttpNDUGateway:
+    PATHS = {SYNC_CONTENT: "/content", SYNC_TRAINING: "/training", SYNC_PROGRESS: "/progress"}
 
-class MockNDUService:
-    def __init__(self, db: Session):
-        self.db = db
-
-    def sync_content(self, content: models.ContentItem):
-        # Simulate payload
-        payload = {
-            "title": content.title,
-            "category": content.category,
-            "duration": content.duration_minutes,
-            "source": "SAMARTH_PORTAL"
-        }
-        
-        # Mock API Call logic with Retry (Clause 4.6)
-        max_retries = 3
-        for attempt in range(max_retries):
-            # random failure simulation removed for deterministic demo, but structure supports it
-            is_success = True 
-            
-            if is_success:
-                mock_id = f"NDU-{uuid.uuid4().hex[:8].upper()}"
-                response = {"id": mock_id, "status": "Synced", "message": "Content received successfully"}
-                
-                # Update local entity
-                content.ndu_reference_id = mock_id
-                self.db.add(content)
-                self.db.commit()
-                
-                self._log_integration("SYNC_CONTENT", payload, response, "SUCCESS")
-                return True, "Successfully synced with NDU"
-            
-            # If failed, we would continue
-        
-        # If loop finishes without success
-        response = {"error": "Gateway Timeout", "code": 504}
-        self._log_integration("SYNC_CONTENT", payload, response, "FAILURE", "Max retries exceeded")
-        return False, "Failed to sync with NDU"
-
-    # Progress Sync Logic (Clause 4.6 Hardening)
-    def sync_progress(self, batch_id: int, progress_data: dict, user_id: int):
-        payload = {
-            "type": "BATCH_PROGRESS",
-            "batch_id": batch_id,
-            "data": progress_data,
-            "timestamp": "2024-03-20T10:00:00Z"
-        }
-        # Simulate Network Call
-        import random
-        success = random.choice([True, True, False]) # 66% success chance
-        
-        response = {"status": "ACK", "message": "Progress Updated"} if success else {"error": "Sync Failed"}
-        status_code = "SUCCESS" if success else "FAILURE"
-        
-        self._log_integration("SYNC_PROGRESS", payload, response, status_code)
-        
-        # Log to Audit Trail as well (RFP Requirement)
-        from .. import crud
-        crud.log_audit(self.db, user_id, "SYNC_PROGRESS", f"Synced progress for Batch {batch_id}: {status_code}")
-        
-        return success, response
-
-    def sync_training(self, training: models.TrainingProgram):
-        payload = {
-            "program_name": training.title,
-            "instructor": training.instructor,
-            "date": training.date,
-            "participants": training.participants_count
-        }
-        
-        # Mock API Call
-        is_success = True
-        
-        if is_success:
-            mock_id = f"NDU-TR-{uuid.uuid4().hex[:8].upper()}"
-            response = {"id": mock_id, "status": "Scheduled", "message": "Training program registered"}
-            
-            # Update local entity
-            training.ndu_mapping_id = mock_id
-            self.db.add(training)
-            self.db.commit()
-            
-            self._log_integration("SYNC_TRAINING", payload, response, "SUCCESS")
-            return True, "Successfully synced with NDU"
-        
-        return False, "Failed to sync"
-
-    def _log_integration(self, endpoint, payload, response, status, error=None):
-        log_entry = models.IntegrationLog(
-            endpoint=endpoint,
-            payload=json.dumps(payload),
-            response=json.dumps(response),
-            status=status,
-            error=error
+    def __init__(self, base_url: str):
+        self.client = AsyncNDUClient(
+            base_url,
+            timeout=NDU_TIMEOUT_SECONDS,
+            connect_timeout=float(os.getenv("NDU_CONNECT_TIMEOUT_SECONDS", "5")),
+            max_connections=int(os.getenv("NDU_MAX_CONNECTIONS", "20")),
+            per_host_concurrency=int(os.getenv("NDU_PER_HOST_CONCURRENCY", "8")),
+            failure_threshold=int(os.getenv("NDU_CIRCUIT_FAILURES", "5")),
+            reset_timeout=float(os.getenv("NDU_CIRCUIT_RESET_SECONDS", "30")),
         )
-        self.db.add(log_entry)
-        self.db.commit()
+        self.batch_retries = int(os.getenv("NDU_BULK_RETRIES", "2"))
+        self._loop = LoopThread("ndu-gateway")
+
+    def send(self, operation: str, payload: dict, idempotency_key: str) -> dict:
+        # Retries are the outbox worker's job (backoff + dead-lettering)
+        return self._loop.run(self.client.post(self.PATHS[operation], payload, headers={"Idempotency-Key": idempotency_key}))
+
+    async def send_many(self, operation: str, items: list[tuple[str, dict]], batch_size: int = NDU_BULK_BATCH_SIZE) -> dict:
+        return await self._loop.run_async(self._send_many(operation, items, batch_size))
+
+    async def _send_many(self, operation: str, items: list[tuple[str, dict]], batch_size: int) -> dict:
+        groups = [items[offset:offset + batch_size] for offset in range(0, len(items), batch_size)]
+        # Groups go out concurrently, bounded by the per-host limit
+        results = await asyncio.gather(*(self._send_group(operation, group) for group in groups))
+        return {key: result for group_results in results for key, result in group_results.items()}
+
+    async def _send_group(self, operation: str, group: list[tuple[str, dict]]) -> dict:
+        body = {"items": [{"idempotency_key": key, "data": payload} for key, payload in group]}
+        try:
+            response = await self.client.post(f"{self.PATHS[operation]}/batch", body, retries=self.batch_retries)
+        except NDUError as e:
+            return {key: {"error": str(e), "retryable": e.retryable} for key, _ in group}
+        results = {result.get("idempotency_key"): result for result in response.get("results", [])}
+        return {key: results.get(key, {"error": "Missing from NDU batch response", "retryable": True}) for key, _ in group}
+
+    def metrics(self) -> dict:
+        return self.client.metrics()
+
+    def close(self):
+        self._loop.run(self.client.aclose(), timeout=5)
+        self._loop.close()
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+def get_gateway():
+    # One shared gateway (and connection pool) per process
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = HttpNDUGateway(NDU_GATEWAY_URL) if NDU_GATEWAY_URL else MockNDUGateway()
+        return _gateway
+
+def close_gateway():
+    global _gateway
+    with _gateway_lock:
+        if _gateway is not None:
+            _gateway.close()
+            _gateway = None
+
+# Outbox
+def enqueue_sync(db: Session, operation: str, entity_id: int, payload: dict, idempotency_key: str | None = None) -> models.NduOutbox:
+    """Queue a sync in the caller's transaction (no commit)."""
+    Outbox = models.NduOutbox
+    if idempotency_key:
+        existing = db.query(Outbox).filter(Outbox.idempotency_key == idempotency_key).first()
+        if existing:
+            if (existing.operation, existing.entity_id) != (operation, entity_id):
+                raise ValueError("Idempotency key already used for a different request")
+            return existing
+    else:
+        # Repeated clicks while a sync for the same entity is still in flight
+        existing = db.query(Outbox).filter(
+            Outbox.operation == operation, Outbox.entity_id == entity_id, Outbox.status.in_((PENDING, IN_PROGRESS))
+        ).first()
+        if existing:
+            return existing
+        if _never_synced(db, operation, entity_id):
+            # The key bulk_sync() sends for the same item, so NDU registers it once
+            idempotency_key = item_key(operation, entity_id)
+            previous = db.query(Outbox).filter(Outbox.idempotency_key == idempotency_key).first()
+            if previous:
+                previous.payload = json.dumps(payload)
+                requeue(db, previous)
+                return previous
+        else:
+            idempotency_key = uuid.uuid4().hex
+
+    entry = Outbox(
+        idempotency_key=idempotency_key,
+        operation=operation,
+        entity_id=entity_id,
+        payload=json.dumps(payload),
+        status=PENDING,
+        attempts=0,
+        next_attempt_at=_utcnow(),
+    )
+    db.add(entry)
+    db.flush()
+    after_commit(db, outbox_worker.wake)
+    return entry
+
+def requeue(db: Session, entry: models.NduOutbox):
+    # Manual retry of a dead letter: fresh attempt budget, same idempotency key
+    entry.status = PENDING
+    entry.attempts = 0
+    entry.next_attempt_at = _utcnow()
+    entry.last_error = None
+    after_commit(db, outbox_worker.wake)
+
+def status_counts(db: Session) -> dict:
+    Outbox = models.NduOutbox
+    return dict(db.query(Outbox.status, func.count(Outbox.id)).group_by(Outbox.status).all())
+
+def _apply_content(db: Session, entity_id: int, ndu_id: str):
+    content = db.get(models.ContentItem, entity_id)
+    if content is None:
+        return
+    if set_references(db, SYNC_CONTENT, {entity_id: ndu_id}):
+        stats.content_synced(db)
+    else:
+        content.ndu_reference_id = ndu_id # Re-sync of an item NDU already has
+    changes.record(db, models.ContentItem, [entity_id])
+
+def _apply_training(db: Session, entity_id: int, ndu_id: str):
+    training = db.get(models.TrainingProgram, entity_id)
+    if training is not None:
+        training.ndu_mapping_id = ndu_id
+        changes.record(db, models.TrainingProgram, [entity_id])
+
+def _apply_progress(db: Session, entity_id: int, ndu_id: str):
+    # Progress updates are acknowledged only; nothing is stored locally
+    pass
+
+APPLY_RESULT = {SYNC_CONTENT: _apply_content, SYNC_TRAINING: _apply_training, SYNC_PROGRESS: _apply_progress}
+
+def _log_integration(db: Session, endpoint, payload, response, status, error=None, retry_count=0):
+    db.add(models.IntegrationLog(
+        endpoint=endpoint,
+        payload=json.dumps(payload),
+        response=json.dumps(response),
+        status=status,
+        error=error,
+        retry_count=retry_count,
+    ))
+
+class OutboxWorker:
+    def __init__(self, session_factory, gateway=None, concurrency: int = 4, poll_interval: float = 1.0,
+                 max_attempts: int = 6, backoff_base: float = 2.0, backoff_max: float = 300.0, lease_seconds: float = 60.0):
+        self.session_factory = session_factory
+        self.gateway = gateway
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # A claimed entry whose worker died becomes due again after the lease
+        self.lease = timedelta(seconds=lease_seconds)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._executor = None
+        # Metrics
+        self.delivered = 0
+        self.failed_attempts = 0
+        self.dead_lettered = 0
+
+    def wake(self):
+        self._wakeup.set()
+
+    def backoff(self, attempts: int) -> float:
+        # Exponential backoff with "equal jitter": half fixed, half random
+        ceiling = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+    def _due(self, now: datetime):
+        Outbox = models.NduOutbox
+        return or_(
+            and_(Outbox.status == PENDING, Outbox.next_attempt_at <= now),
+            and_(Outbox.status == IN_PROGRESS, Outbox.locked_until < now),
+        )
+
+    def claim(self, limit: int) -> list[dict]:
+        Outbox = models.NduOutbox
+        token = uuid.uuid4().hex
+        now = _utcnow()
+        db = self.session_factory()
+        try:
+            ids = db.execute(
+                select(Outbox.id).where(self._due(now)).order_by(Outbox.next_attempt_at, Outbox.id)
+                .limit(limit).with_for_update(skip_locked=True)
+            ).scalars().all()
+            if not ids:
+                db.rollback()
+                return []
+            # Guarded update: another worker process may have claimed some of them
+            db.execute(
+                update(Outbox).where(Outbox.id.in_(ids), self._due(now))
+                .values(status=IN_PROGRESS, locked_by=token, locked_until=now + self.lease, attempts=Outbox.attempts + 1)
+            )
+            rows = db.execute(
+                select(Outbox.id, Outbox.idempotency_key, Outbox.operation, Outbox.entity_id, Outbox.payload, Outbox.attempts)
+                .where(Outbox.locked_by == token)
+            ).mappings().all()
+            db.commit()
+            return [dict(row, token=token) for row in rows]
+        finally:
+            db.close()
+
+    def deliver(self, entry: dict):
+        payload = json.loads(entry["payload"])
+        try:
+            response, error = self.gateway.send(entry["operation"], payload, entry["idempotency_key"]), None
+        except NDUError as e:
+            response, error = None, e
+        except Exception as e:
+            response, error = None, NDUError(f"{type(e).__name__}: {e}")
+        self._record(entry, payload, response, error)
+
+    def _record(self, entry: dict, payload: dict, response: dict | None, error: NDUError | None):
+        Outbox = models.NduOutbox
+        attempts = entry["attempts"]
+        now = _utcnow()
+        if error is None:
+            values = {"status": DONE, "ndu_id": response.get("id"), "completed_at": now, "last_error": None}
+        elif error.retryable and attempts < self.max_attempts:
+            values = {"status": PENDING, "next_attempt_at": now + timedelta(seconds=self.backoff(attempts)), "last_error": str(error)}
+        else:
+            values = {"status": DEAD, "completed_at": now, "last_error": str(error)}
+
+        db = self.session_factory()
+        try:
+            # Only the claim holder may record; a takeover after lease expiry wins otherwise
+            updated = db.execute(
+                update(Outbox).where(Outbox.id == entry["id"], Outbox.locked_by == entry["token"])
+                .values(locked_by=None, locked_until=None, **values)
+            ).rowcount
+            if not updated:
+                db.rollback()
+                return
+            if error is None:
+                APPLY_RESULT[entry["operation"]](db, entry["entity_id"], response.get("id"))
+                _log_integration(db, entry["operation"], payload, response, "SUCCESS", retry_count=attempts - 1)
+            else:
+                detail = str(error) if values["status"] == PENDING else f"Dead-lettered after {attempts} attempt(s): {error}"
+                _log_integration(db, entry["operation"], payload, {"error": str(error)}, "FAILURE", detail, retry_count=attempts - 1)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            # The lease expires and the entry is retried with the same idempotency key
+            logger.error(f"Recording NDU outbox entry {entry['id']} failed: {e}")
+            return
+        finally:
+            db.close()
+
+        with self._lock:
+            if values["status"] == DONE:
+                self.delivered += 1
+            else:
+                self.failed_attempts += 1
+                if values["status"] == DEAD:
+                    self.dead_lettered += 1
+                    logger.warning(f"NDU outbox entry {entry['id']} dead-lettered: {error}")
+
+    def _deliver_and_release(self, entry: dict):
+        try:
+            self.deliver(entry)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._wakeup.set()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if self.gateway is None:
+            self.gateway = get_gateway()
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="ndu-sync")
+        self._thread = threading.Thread(target=self._run, name="ndu-outbox", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join(timeout=10)
+        self._thread = None
+        # In-flight deliveries finish; anything unclaimed stays in the outbox
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            # Cleared before claiming so a wake() during the claim is not lost
+            self._wakeup.clear()
+            with self._lock:
+                free = self.concurrency - self._in_flight
+            if free > 0:
+                try:
+                    claimed = self.claim(free)
+                except Exception as e:
+                    claimed = []
+                    logger.error(f"NDU outbox claim failed: {e}")
+                for entry in claimed:
+                    with self._lock:
+                        self._in_flight += 1
+                    self._executor.submit(self._deliver_and_release, entry)
+            # Woken by new entries and finished deliveries; the poll catches retries coming due
+            self._wakeup.wait(self.poll_interval)
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "gateway": type(self.gateway).__name__ if self.gateway else None,
+                "concurrency": self.concurrency,
+                "in_flight": self._in_flight,
+                "delivered": self.delivered,
+                "failed_attempts": self.failed_attempts,
+                "dead_lettered": self.dead_lettered,
+            }
+
+def _build_worker() -> OutboxWorker:
+    return OutboxWorker(
+        SessionLocal,
+        concurrency=int(os.getenv("NDU_WORKERS", "4")),
+        poll_interval=float(os.getenv("NDU_POLL_INTERVAL_SECONDS", "1.0")),
+        max_attempts=int(os.getenv("NDU_MAX_ATTEMPTS", "6")),
+        backoff_base=float(os.getenv("NDU_BACKOFF_BASE_SECONDS", "2")),
+        backoff_max=float(os.getenv("NDU_BACKOFF_MAX_SECONDS", "300")),
+        lease_seconds=float(os.getenv("NDU_LEASE_SECONDS", "60")),
+    )
+
+outbox_worker = _build_worker()
+
+# Bulk Sync
+# Every pending item (never synced, no outbox entry in flight) is sent in grouped
+# payloads; results come back per item and are applied and logged in bulk. An
+# item's first sync uses the same deterministic key here and in the outbox, so
+# re-running after a lost response, or mixing both paths, registers it once.
+BULK_TARGETS = {
+    SYNC_CONTENT: (models.ContentItem, models.ContentItem.ndu_reference_id, content_payload),
+    SYNC_TRAINING: (models.TrainingProgram, models.TrainingProgram.ndu_mapping_id, training_payload),
+}
+REFERENCE_CHUNK = 500
+
+def item_key(operation: str, entity_id: int) -> str:
+    return f"{operation}:{entity_id}"
+
+def _never_synced(db: Session, operation: str, entity_id: int) -> bool:
+    if operation not in BULK_TARGETS:
+        return False
+    Model, reference, _ = BULK_TARGETS[operation]
+    return db.execute(select(Model.id).where(Model.id == entity_id, reference.is_(None))).first() is not None
+
+def set_references(db: Session, operation: str, ndu_ids: dict[int, str]) -> int:
+    """Store NDU ids on items that have none yet; returns how many went from unset to set."""
+    Model, reference, _ = BULK_TARGETS[operation]
+    changed = 0
+    pairs = list(ndu_ids.items())
+    for offset in range(0, len(pairs), REFERENCE_CHUNK):
+        chunk = dict(pairs[offset:offset + REFERENCE_CHUNK])
+        # Rows already set elsewhere are left alone and not counted
+        statement = (update(Model).where(Model.id.in_(chunk), reference.is_(None))
+                     .values({reference.key: case(chunk, value=Model.id)})
+                     .execution_options(synchronize_session=False))
+        changed += db.execute(statement).rowcount
+    return changed
+
+def _pending_for_bulk(db: Session, operation: str, limit: int | None) -> list[tuple[int, str, dict]]:
+    Model, reference, build_payload = BULK_TARGETS[operation]
+    Outbox = models.NduOutbox
+    in_flight = select(Outbox.entity_id).where(Outbox.operation == operation, Outbox.status.in_((PENDING, IN_PROGRESS)))
+    query = db.query(Model).filter(reference.is_(None), Model.id.not_in(in_flight)).order_by(Model.id)
+    if limit:
+        query = query.limit(limit)
+    items = [(entity.id, item_key(operation, entity.id), build_payload(entity)) for entity in query]
+    # Release the connection while the gateway calls are in flight
+    db.rollback()
+    return items
+
+def _record_bulk(db: Session, operation: str, items: list[tuple[int, str, dict]], results: dict, user_id: int) -> dict:
+    Model, reference, _ = BULK_TARGETS[operation]
+    updates, logs, report = [], [], []
+    for entity_id, key, payload in items:
+        result = results.get(key) or {"error": "No result from NDU"}
+        ndu_id = result.get("id")
+        if ndu_id:
+            updates.append({"id": entity_id, reference.key: ndu_id})
+            report.append({"entity_id": entity_id, "status": "SUCCESS", "ndu_id": ndu_id})
+        else:
+            report.append({"entity_id": entity_id, "status": "FAILURE", "error": result.get("error")})
+        logs.append({
+            "endpoint": operation,
+            "payload": json.dumps(payload),
+            "response": json.dumps(result),
+            "status": "SUCCESS" if ndu_id else "FAILURE",
+            "error": None if ndu_id else result.get("error"),
+            "retry_count": 0,
+            "timestamp": _utcnow(),
+        })
+
+    if updates:
+        changed = set_references(db, operation, {row["id"]: row[reference.key] for row in updates})
+        changes.record(db, Model, [row["id"] for row in updates])
+        if operation == SYNC_CONTENT and changed:
+            stats.content_synced(db, changed)
+    if logs:
+        db.execute(insert(models.IntegrationLog), logs)
+
+    from .. import crud
+    synced = len(updates)
+    crud.log_audit(db, user_id, f"BULK_{operation}", f"Bulk NDU sync: {synced} synced, {len(items) - synced} failed")
+    return {"total": len(items), "synced": synced, "failed": len(items) - synced, "results": report}
+
+async def bulk_sync(db: Session, operation: str, user_id: int, batch_size: int = NDU_BULK_BATCH_SIZE, limit: int | None = None) -> dict:
+    items = await anyio.to_thread.run_sync(_pending_for_bulk, db, operation, limit)
+    results = {}
+    if items:
+        results = await get_gateway().send_many(operation, [(key, payload) for _, key, payload in items], batch_size)
+    return await anyio.to_thread.run_sync(_record_bulk, db, operation, items, results, user_id)
@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# NDU Gateway Transport
+# One long-lived httpx.AsyncClient per gateway: keep-alive connections are
+# reused across calls (NDU_MAX_CONNECTIONS), each host gets its own concurrency
+# limit (NDU_PER_HOST_CONCURRENCY) and circuit breaker, and every call has
+# connect/read timeouts. The client lives on a private event loop thread so the
+# outbox worker threads and async endpoints can share the same pool. httpx is
+# imported when a client is built, so the mock gateway never loads it.
+
+class NDUError(Exception):
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+class CircuitOpenError(NDUError):
+    pass
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._trial_in_flight:
+            # A single trial call decides whether the gateway has recovered
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+                logger.warning(f"NDU circuit opened after {self.failures} consecutive failure(s)")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+class _Host:
+    def __init__(self, concurrency: int, breaker: CircuitBreaker):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.breaker = breaker
+
+class AsyncNDUClient:
+    def __init__(self, base_url: str, timeout: float = 10.0, connect_timeout: float = 5.0, max_connections: int = 20,
+                 per_host_concurrency: int = 8, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.base_url = base_url
+        self.per_host_concurrency = per_host_concurrency
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        import httpx
+        self._client_options = {
+            "base_url": base_url,
+            "timeout": httpx.Timeout(timeout, connect=connect_timeout),
+            "limits": httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        }
+        self._client = None
+        self._hosts = {}
+        self.requests = 0
+        self.failures = 0
+
+    def _host(self, url) -> _Host:
+        key = (url.scheme, url.host, url.port)
+        if key not in self._hosts:
+            self._hosts[key] = _Host(self.per_host_concurrency, CircuitBreaker(self.failure_threshold, self.reset_timeout))
+        return self._hosts[key]
+
+    async def post(self, path: str, payload: dict, headers: dict | None = None, retries: int = 0) -> dict:
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(**self._client_options)
+        host = self._host(self._client.base_url.join(path))
+        for attempt in range(retries + 1):
+            try:
+                return await self._post_once(host, path, payload, headers)
+            except NDUError as e:
+                if not e.retryable or isinstance(e, CircuitOpenError) or attempt == retries:
+                    raise
+                await asyncio.sleep(random.uniform(0, 0.2 * 2 ** attempt))
+
+    async def _post_once(self, host: _Host, path: str, payload: dict, headers: dict | None) -> dict:
+        import httpx
+        async with host.semaphore:
+            if not host.breaker.allow():
+                raise CircuitOpenError("NDU circuit open")
+            self.requests += 1
+            try:
+                response = await self._client.post(path, json=payload, headers=headers)
+            except httpx.HTTPError as e:
+                self.failures += 1
+                host.breaker.record_failure()
+                raise NDUError(f"{type(e).__name__}: {e}")
+            if response.status_code >= 500 or response.status_code in (408, 429):
+                self.failures += 1
+                host.breaker.record_failure()
+                raise NDUError(f"HTTP {response.status_code}: {response.text[:200]}")
+            # 4xx means the payload itself was rejected; the gateway is healthy
+            host.breaker.record_success()
+            if response.status_code >= 400:
+                raise NDUError(f"HTTP {response.status_code}: {response.text[:200]}", retryable=False)
+            return response.json()
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def metrics(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "requests": self.requests,
+            "failures": self.failures,
+            "hosts": {
+                f"{host}:{port}": {"state": state.breaker.state, "trips": state.breaker.trips}
+                for (_, host, port), state in self._hosts.items()
+            },
+        }
+
+class LoopThread:
+    # Runs coroutines on a private event loop from any thread or loop
+    def __init__(self, name: str):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name=name, daemon=True)
+        self.thread.start()
+
+    def run(self, coro, timeout: float | None = None):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    async def run_async(self, coro):
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self.loop))
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from .. import models
+
+# Authenticated Principal Cache
+# Bounded LRU with TTL, keyed by (token subject, token version). Entries are
+# detached snapshots of the User row, so they stay readable after the session
+# that loaded them is closed. Role changes, deactivation and deletion bump the
+# user's token_version and call invalidate(); other workers converge within TTL.
+TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+MAX_ENTRIES = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+
+def snapshot_user(user: models.User) -> models.User:
+    return models.User(**{column.key: getattr(user, column.key) for column in models.User.__table__.columns})
+
+class PrincipalCache:
+    def __init__(self, ttl: float = TTL_SECONDS, max_entries: int = MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, int], tuple[float, models.User]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, subject: str, version: int):
+        key = (subject, version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, subject: str, version: int, user: models.User):
+        with self._lock:
+            self._entries[(subject, version)] = (time.monotonic() + self.ttl, snapshot_user(user))
+            self._entries.move_to_end((subject, version))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, subject: str):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == subject]:
+                del self._entries[key]
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+principal_cache = PrincipalCache()
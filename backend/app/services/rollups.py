@@ -0,0 +1,118 @@
+import logging
+from collections import Counter, defaultdict
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from .. import models
+from . import stats
+
+logger = logging.getLogger(__name__)
+
+# Location Rollups (Clause 4.5)
+# location_rollups holds kit counts by (status, category) for every node of the
+# state -> district -> institution tree. Write paths adjust the four nodes above
+# each created, deleted or moved kit in their own transaction, so a drill-down
+# is two indexed lookups on a small table instead of a GROUP BY over inventory.
+# The stats reconciler rebuilds the table periodically to correct any drift.
+NATIONAL, STATE, DISTRICT, INSTITUTION = range(4)
+LEVELS = ("national", "state", "district", "institution")
+LOCATION_COLUMNS = ("state", "district", "institution")
+KEY_COLUMNS = ("level", *LOCATION_COLUMNS, "status", "category")
+
+def leaf(item) -> tuple[str, str, str, str, str]:
+    # (state, district, institution, status, category) with missing parts as ''
+    return tuple(getattr(item, column) or "" for column in (*LOCATION_COLUMNS, "status", "category"))
+
+def _nodes(leaf_key: tuple) -> list[dict]:
+    state, district, institution, status, category = leaf_key
+    path = (state, district, institution)
+    return [{
+        "level": level,
+        **{column: path[index] if index < level else "" for index, column in enumerate(LOCATION_COLUMNS)},
+        "status": status,
+        "category": category,
+    } for level in range(INSTITUTION + 1)]
+
+def _row_key(row: dict) -> tuple:
+    return (row["level"], row["state"], row["district"], row["institution"], row["status"], row["category"])
+
+def adjust(db: Session, deltas: Counter):
+    """Apply {leaf key: count delta} to every level of the tree (no commit)."""
+    counts = Counter()
+    for leaf_key, delta in deltas.items():
+        if delta:
+            for node in _nodes(leaf_key):
+                counts[_row_key(node)] += delta
+    rows = [{**dict(zip(KEY_COLUMNS, key)), "count": delta} for key, delta in counts.items() if delta]
+    stats.increment(db, models.LocationRollup, KEY_COLUMNS, rows, ("count",))
+
+def items_created(db: Session, items: list):
+    adjust(db, Counter(leaf(item) for item in items))
+
+def item_deleted(db: Session, item):
+    adjust(db, Counter({leaf(item): -1}))
+
+# Drill-down
+def _summarize(rows) -> dict:
+    by_status, by_category = Counter(), Counter()
+    for row in rows:
+        by_status[row.status] += row.count
+        by_category[row.category] += row.count
+    return {
+        "total": sum(by_status.values()),
+        "by_status": {key: value for key, value in by_status.items() if value},
+        "by_category": {key: value for key, value in by_category.items() if value},
+    }
+
+def drill_down(db: Session, state: str | None = None, district: str | None = None, institution: str | None = None) -> dict:
+    """Totals for one node plus one entry per child node."""
+    if (district is not None and state is None) or (institution is not None and district is None):
+        raise ValueError("Drill down one level at a time: district needs state, institution needs district")
+    Rollup = models.LocationRollup
+    path = [value for value in (state, district, institution) if value is not None]
+    level = len(path)
+
+    prefix = [getattr(Rollup, column) == value for column, value in zip(LOCATION_COLUMNS, path)]
+    node_rows = db.query(Rollup.status, Rollup.category, Rollup.count).filter(Rollup.level == level, Rollup.count != 0, *prefix).all()
+    children = defaultdict(list)
+    if level < INSTITUTION:
+        child_column = getattr(Rollup, LOCATION_COLUMNS[level])
+        for row in db.query(child_column.label("child"), Rollup.status, Rollup.category, Rollup.count).filter(Rollup.level == level + 1, Rollup.count != 0, *prefix):
+            children[row.child].append(row)
+
+    return {
+        "level": LEVELS[level],
+        "state": state,
+        "district": district,
+        "institution": institution,
+        **_summarize(node_rows),
+        "children": [{"name": name or None, **_summarize(rows)} for name, rows in sorted(children.items())],
+    }
+
+def reconcile(db: Session) -> int:
+    """Rebuild the rollups from the inventory table; returns existing rows corrected."""
+    Item, Rollup = models.InventoryItem, models.LocationRollup
+    stats.lock_for_rebuild(db, Rollup)
+    leaves = Counter()
+    columns = [func.coalesce(getattr(Item, column), "") for column in (*LOCATION_COLUMNS, "status", "category")]
+    for *leaf_key, count in db.query(*columns, func.count(Item.id)).group_by(*columns):
+        leaves[tuple(leaf_key)] += count
+    actual = Counter()
+    for leaf_key, count in leaves.items():
+        for node in _nodes(leaf_key):
+            actual[_row_key(node)] += count
+
+    stored = {tuple(getattr(row, column) for column in KEY_COLUMNS): row.count for row in db.query(Rollup)}
+    corrected = 0
+    for key, count in actual.items():
+        if stored.get(key) != count:
+            db.merge(Rollup(**dict(zip(KEY_COLUMNS, key)), count=count))
+            if key in stored: # Missing rows are seeded, not drift
+                corrected += 1
+    for key in set(stored) - set(actual):
+        db.query(Rollup).filter(*(getattr(Rollup, column) == value for column, value in zip(KEY_COLUMNS, key))).delete()
+        if stored[key]:
+            corrected += 1
+    db.commit()
+    if corrected:
+        logger.warning(f"Location rollups drifted, corrected {corrected} row(s)")
+    return corrected
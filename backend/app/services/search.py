@@ -0,0 +1,102 @@
+import logging
+from sqlalchemy import func, or_, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Query
+from .. import models
+
+logger = logging.getLogger(__name__)
+
+# Free-text search over kit_id / name / serial_number / model.
+# SQLite: FTS5 external-content table with the trigram tokenizer (substring match).
+# Postgres: pg_trgm GIN index over the concatenated search columns.
+SEARCH_COLUMNS = ("kit_id", "name", "serial_number", "model")
+MIN_TRIGRAM_LENGTH = 3
+
+_SQLITE_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS inventory_fts USING fts5(
+        kit_id, name, serial_number, model,
+        content='inventory', content_rowid='id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS inventory_fts_ai AFTER INSERT ON inventory BEGIN
+        INSERT INTO inventory_fts(rowid, kit_id, name, serial_number, model)
+        VALUES (new.id, new.kit_id, new.name, new.serial_number, new.model);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS inventory_fts_ad AFTER DELETE ON inventory BEGIN
+        INSERT INTO inventory_fts(inventory_fts, rowid, kit_id, name, serial_number, model)
+        VALUES ('delete', old.id, old.kit_id, old.name, old.serial_number, old.model);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS inventory_fts_au AFTER UPDATE ON inventory BEGIN
+        INSERT INTO inventory_fts(inventory_fts, rowid, kit_id, name, serial_number, model)
+        VALUES ('delete', old.id, old.kit_id, old.name, old.serial_number, old.model);
+        INSERT INTO inventory_fts(rowid, kit_id, name, serial_number, model)
+        VALUES (new.id, new.kit_id, new.name, new.serial_number, new.model);
+    END
+    """,
+]
+
+_POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX IF NOT EXISTS ix_inventory_search_trgm ON inventory USING gin (
+        (coalesce(kit_id, '') || ' ' || coalesce(name, '') || ' ' ||
+         coalesce(serial_number, '') || ' ' || coalesce(model, '')) gin_trgm_ops
+    )
+    """,
+]
+
+def init_inventory_search(conn: Connection):
+    # Idempotent; applied by migration v0002_inventory_search
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        exists = conn.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'inventory_fts'"
+        )).first()
+        for ddl in _SQLITE_FTS_DDL:
+            conn.execute(text(ddl))
+        if not exists:
+            # Index rows that were inserted before the FTS table existed
+            conn.execute(text("INSERT INTO inventory_fts(inventory_fts) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        for ddl in _POSTGRES_DDL:
+            conn.execute(text(ddl))
+    logger.info(f"Inventory search index ready ({dialect}).")
+
+def _like_pattern(term: str) -> str:
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def _search_document():
+    Item = models.InventoryItem
+    parts = [func.coalesce(getattr(Item, column), "") for column in SEARCH_COLUMNS]
+    document = parts[0]
+    for part in parts[1:]:
+        document = document + " " + part
+    return document
+
+def apply_text_search(query: Query, term: str, dialect: str) -> Query:
+    term = term.strip()
+    if not term:
+        return query
+
+    Item = models.InventoryItem
+    if dialect == "sqlite" and len(term) >= MIN_TRIGRAM_LENGTH:
+        phrase = '"' + term.replace('"', '""') + '"'
+        matches = text("SELECT rowid FROM inventory_fts WHERE inventory_fts MATCH :phrase").bindparams(phrase=phrase)
+        return query.filter(Item.id.in_(matches))
+
+    if dialect == "postgresql":
+        # Same expression as ix_inventory_search_trgm so the planner can use it
+        return query.filter(_search_document().ilike(_like_pattern(term), escape="\\"))
+
+    # Short terms (below trigram length) or other backends
+    pattern = _like_pattern(term)
+    return query.filter(or_(*[
+        getattr(Item, column).ilike(pattern, escape="\\") for column in SEARCH_COLUMNS
+    ]))
@@ -0,0 +1,98 @@
+import enum
+import os
+import typing
+from functools import lru_cache
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import TypedDict
+
+# Fast List Serialization (opt-in, FAST_LIST_RESPONSES=true)
+# The default list path loads full ORM instances, validates each one into its
+# response_model and dumps the result with json. The fast path selects only the
+# schema's columns as Core rows and serializes the whole page in one call to a
+# cached TypeAdapter over a TypedDict mirror of the schema: no ORM identity map,
+# no per-row model validation. The schema's "before" field validators (e.g.
+# empty strings to null) are still applied to the rows, so the JSON body is
+# identical to the default path.
+FAST_LIST_RESPONSES = os.getenv("FAST_LIST_RESPONSES", "false").strip().lower() in ("1", "true", "yes", "on")
+# Sparse fieldsets (?fields=a,b,c) always take the row path, selecting only the
+# requested columns. Each field set gets its own row type and adapter, built on
+# first use and kept in a bounded cache (field sets are client-chosen).
+FIELDSET_CACHE_SIZE = int(os.getenv("FIELDSET_CACHE_SIZE", "256"))
+
+def _row_annotation(annotation):
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return row_type(annotation)
+    if isinstance(annotation, type) and issubclass(annotation, enum.Enum):
+        # Columns hold the raw value (e.g. User.role is a String column)
+        return str
+    origin = typing.get_origin(annotation)
+    if origin in (list, typing.List):
+        return typing.List[_row_annotation(typing.get_args(annotation)[0])]
+    if origin is typing.Union:
+        return typing.Union[tuple(_row_annotation(arg) for arg in typing.get_args(annotation))]
+    return annotation
+
+@lru_cache(maxsize=None)
+def row_type(schema: type[BaseModel]) -> type:
+    fields = {name: _row_annotation(field.annotation) for name, field in schema.model_fields.items()}
+    return TypedDict(f"{schema.__name__}Row", fields)
+
+@lru_cache(maxsize=None)
+def list_adapter(schema: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(typing.List[row_type(schema)])
+
+def schema_columns(model, schema: type[BaseModel]) -> list:
+    # Only the model columns the response schema exposes (relationships excluded)
+    columns = model.__table__.columns
+    return [getattr(model, name) for name in schema.model_fields if name in columns]
+
+def parse_fields(fields: str | None, model, schema: type[BaseModel]) -> tuple[str, ...] | None:
+    """Validate ?fields= against the schema's columns; None means every field."""
+    if fields is None:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    allowed = [column.key for column in schema_columns(model, schema)]
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}")
+    if not requested:
+        raise ValueError("fields must name at least one field")
+    return tuple(name for name in allowed if name in requested) # Schema order, so equal sets share a cache entry
+
+@lru_cache(maxsize=FIELDSET_CACHE_SIZE)
+def fieldset_adapter(schema: type[BaseModel], fields: tuple[str, ...]) -> TypeAdapter:
+    row = TypedDict(f"{schema.__name__}Fields", {name: _row_annotation(schema.model_fields[name].annotation) for name in fields})
+    return TypeAdapter(typing.List[row])
+
+def fieldset_columns(model, fields: tuple[str, ...], key: str | None = None) -> list:
+    # A keyset-paginated list also selects its key column; the adapter drops it if not requested
+    return [getattr(model, name) for name in dict.fromkeys((*fields, key) if key else fields)]
+
+def fieldset_response(rows: list[dict], schema: type[BaseModel], fields: tuple[str, ...], headers: dict | None = None) -> Response:
+    return Response(content=fieldset_adapter(schema, fields).dump_json(normalize_rows(rows, schema)), media_type="application/json", headers=headers)
+
+def row_dicts(rows) -> list[dict]:
+    return [dict(row._mapping) for row in rows]
+
+@lru_cache(maxsize=None)
+def _before_validators(schema: type[BaseModel]) -> tuple:
+    decorators = schema.__pydantic_decorators__.field_validators.values()
+    return tuple((frozenset(d.info.fields), d.func) for d in decorators if d.info.mode == "before")
+
+def normalize_rows(rows: list[dict], schema: type[BaseModel]) -> list[dict]:
+    """Run the schema's "before" field validators over row dicts, in place."""
+    validators = _before_validators(schema)
+    if validators:
+        for row in rows:
+            for fields, validate in validators:
+                for name in fields & row.keys():
+                    row[name] = validate(row[name])
+    return rows
+
+def dump_rows(rows: list[dict], schema: type[BaseModel]) -> bytes:
+    return list_adapter(schema).dump_json(normalize_rows(rows, schema))
+
+def rows_response(rows: list[dict], schema: type[BaseModel], headers: dict | None = None) -> Response:
+    # Returning a Response bypasses FastAPI's response_model validation
+    return Response(content=dump_rows(rows, schema), media_type="application/json", headers=headers)
@@ -0,0 +1,190 @@
+import logging
+import os
+import threading
+from collections import Counter
+from sqlalchemy import false, func, select, text, update
+from sqlalchemy.orm import Session
+from .. import models
+from ..database import after_commit
+from .events import COUNTERS, hub
+
+logger = logging.getLogger(__name__)
+
+# Dashboard Counters
+# Write paths bump counters inside their own transaction, so the dashboard reads
+# one tiny table instead of running COUNT(*) scans. A background reconciler
+# recomputes everything periodically to correct any drift. Committed deltas
+# are pushed to open dashboards (services/events.py).
+INVENTORY_TOTAL = "inventory.total"
+BATCHES_TOTAL = "batches.total"
+CONTENT_TOTAL = "content.total"
+CONTENT_PENDING_SYNC = "content.pending_sync"
+ATTENDANCE_PRESENT = "attendance.present"
+ATTENDANCE_TOTAL = "attendance.total"
+RECONCILE_INTERVAL_SECONDS = int(os.getenv("STATS_RECONCILE_INTERVAL_SECONDS", "3600"))
+
+def inventory_status(status: str) -> str:
+    return f"inventory.status.{status}"
+
+def content_category(category: str) -> str:
+    return f"content.category.{category}"
+
+def upsert_statement(dialect: str, model):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(model)
+
+def increment(db: Session, model, key: str | tuple[str, ...], rows: list[dict], columns: tuple[str, ...]):
+    """Upsert rows keyed on `key` (one column or several), adding `columns` onto existing values (no commit)."""
+    if not rows:
+        return
+    keys = (key,) if isinstance(key, str) else key
+    key_columns = [getattr(model, name) for name in keys]
+    rows = sorted(rows, key=lambda row: tuple(row[name] for name in keys)) # Stable order avoids lock-order deadlocks
+    statement = upsert_statement(db.get_bind().dialect.name, model)
+    if statement is not None:
+        db.execute(statement.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={column: getattr(model, column) + getattr(statement.excluded, column) for column in columns},
+        ), rows)
+        return
+    for row in rows:
+        updated = db.query(model).filter(*(column == row[name] for column, name in zip(key_columns, keys))).update(
+            {getattr(model, column): getattr(model, column) + row[column] for column in columns}
+        )
+        if not updated:
+            db.add(model(**row))
+
+def lock_for_rebuild(db: Session, *models_):
+    """Block writers of these tables until the caller commits (no commit)."""
+    # Taken before a rebuild counts anything: increments that arrive meanwhile
+    # wait and land on top of the rebuilt values instead of being overwritten
+    if db.get_bind().dialect.name == "postgresql":
+        for model in models_:
+            db.execute(text(f"LOCK TABLE {model.__table__.name} IN SHARE ROW EXCLUSIVE MODE"))
+        return
+    # SQLite has one database-wide write lock; a write that matches no rows takes it
+    table = models_[0].__table__
+    column = next(iter(table.primary_key.columns))
+    db.execute(update(table).where(false()).values({column.name: column}))
+
+def lock_row(db: Session, model, key) -> int:
+    """Lock one row until the caller commits, so writers keyed on it queue up (no commit)."""
+    # A no-op UPDATE: a row lock on Postgres, the database write lock on SQLite
+    table = model.__table__
+    column = next(iter(table.primary_key.columns))
+    return db.execute(update(table).where(column == key).values({column.name: column})).rowcount
+
+def bump(db: Session, deltas: dict[str, int]):
+    """Apply counter deltas in the caller's transaction (no commit)."""
+    rows = [{"name": name, "value": delta} for name, delta in deltas.items() if delta]
+    increment(db, models.StatCounter, "name", rows, ("value",))
+    if rows:
+        changed = {row["name"]: row["value"] for row in rows}
+        after_commit(db, lambda: hub.publish(COUNTERS, changed))
+
+def inventory_created(db: Session, statuses: list[str]):
+    deltas = Counter(inventory_status(status) for status in statuses)
+    deltas[INVENTORY_TOTAL] = len(statuses)
+    bump(db, deltas)
+
+def inventory_deleted(db: Session, status: str):
+    bump(db, {INVENTORY_TOTAL: -1, inventory_status(status): -1})
+
+def inventory_moved(db: Session, status_deltas: dict[str, int]):
+    bump(db, {inventory_status(status): delta for status, delta in status_deltas.items()})
+
+def content_created(db: Session, content: models.ContentItem):
+    bump(db, {
+        CONTENT_TOTAL: 1,
+        content_category(content.category): 1,
+        CONTENT_PENDING_SYNC: 1 if content.ndu_reference_id is None else 0,
+    })
+
+def content_synced(db: Session, count: int = 1):
+    bump(db, {CONTENT_PENDING_SYNC: -count})
+
+def batch_created(db: Session, count: int = 1):
+    bump(db, {BATCHES_TOTAL: count})
+
+def attendance_marked(db: Session, present: int, total: int):
+    bump(db, {ATTENDANCE_PRESENT: present, ATTENDANCE_TOTAL: total})
+
+def read_counters(db: Session) -> dict[str, int]:
+    return dict(db.execute(select(models.StatCounter.name, models.StatCounter.value)).all())
+
+def compute_counters(db: Session) -> dict[str, int]:
+    Item, Content = models.InventoryItem, models.ContentItem
+    counters = {
+        INVENTORY_TOTAL: db.query(func.count(Item.id)).scalar(),
+        BATCHES_TOTAL: db.query(func.count(models.Batch.id)).scalar(),
+        CONTENT_TOTAL: db.query(func.count(Content.id)).scalar(),
+        CONTENT_PENDING_SYNC: db.query(func.count(Content.id)).filter(Content.ndu_reference_id == None).scalar(),
+        ATTENDANCE_TOTAL: db.query(func.count(models.Attendance.id)).scalar(),
+        ATTENDANCE_PRESENT: db.query(func.count(models.Attendance.id)).filter(models.Attendance.status == "PRESENT").scalar(),
+    }
+    for status, count in db.query(Item.status, func.count(Item.id)).group_by(Item.status):
+        counters[inventory_status(status)] = count
+    for category, count in db.query(Content.category, func.count(Content.id)).group_by(Content.category):
+        counters[content_category(category)] = count
+    return counters
+
+def reconcile(db: Session) -> dict[str, tuple[int, int]]:
+    """Overwrite counters with freshly computed values; returns {name: (stored, actual)} drift."""
+    # Counters missing on a fresh or upgraded database are seeded, not drift
+    lock_for_rebuild(db, models.StatCounter)
+    actual = compute_counters(db)
+    stored = read_counters(db)
+    drift, deltas = {}, {}
+    for name in set(actual) | set(stored):
+        expected = actual.get(name, 0)
+        if stored.get(name, 0) == expected:
+            continue
+        db.merge(models.StatCounter(name=name, value=expected))
+        deltas[name] = expected - stored.get(name, 0)
+        if name in stored:
+            drift[name] = (stored[name], expected)
+    db.commit()
+    if drift:
+        logger.warning(f"Dashboard counters drifted, corrected: {drift}")
+    if deltas:
+        hub.publish(COUNTERS, deltas)
+    return drift
+
+class Reconciler:
+    # `jobs` are reconcile(db) style callables run on every pass
+    def __init__(self, session_factory, interval: int = RECONCILE_INTERVAL_SECONDS, jobs=(reconcile,), name: str = "stats-reconciler"):
+        self.session_factory = session_factory
+        self.name = name
+        self.interval = interval
+        self.jobs = jobs
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        # First pass runs immediately so a fresh or upgraded DB is seeded
+        while True:
+            for job in self.jobs:
+                try:
+                    db = self.session_factory()
+                    try:
+                        job(db)
+                    finally:
+                        db.close()
+                except Exception as e:
+                    logger.error(f"Periodic job failed ({job.__module__}.{job.__name__}): {e}")
+            if self._stop.wait(self.interval):
+                return
@@ -0,0 +1,148 @@
+import logging
+import os
+from collections import Counter, defaultdict
+from datetime import date, datetime, time, timedelta, timezone
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+from .. import models
+from . import ledger
+
+logger = logging.getLogger(__name__)
+
+# Utilization Analytics (Clause 4.5)
+# utilization_daily holds one row per (day, category, batch) with end-of-day
+# stock counts (kit-days when summed) and the day's movements. refresh() fills
+# complete days after the last one stored: it takes the positions at the start
+# of the first missing day from the stock snapshots (services/ledger.py) and
+# replays only the ledger rows of the missing days, keeping running counts, so
+# neither the raw ledger nor the inventory table is rescanned; the category
+# comes from the positions themselves. History queries read utilization_daily only.
+UTILIZATION_MAX_DAYS_PER_RUN = int(os.getenv("UTILIZATION_MAX_DAYS_PER_RUN", "366"))
+GRANULARITIES = ("day", "week", "month")
+NO_BATCH = 0
+METRIC_COLUMNS = ("kits", "allocated", "active", "idle", "allocations", "returns")
+
+def _start_of(day: date) -> datetime:
+    return datetime.combine(day, time.min, tzinfo=timezone.utc)
+
+def _group(position: dict) -> tuple[str, int, str]:
+    return (position["category"] or "", position["batch_id"] or NO_BATCH, position["status"])
+
+def _day_rows(day: date, groups: Counter, movements: Counter, windows: dict) -> list[dict]:
+    rows = defaultdict(Counter)
+    for (category, batch_id, status), count in groups.items():
+        if not count:
+            continue
+        row = rows[(category, batch_id)]
+        if status != ledger.CONSUMED:
+            row["kits"] += count
+        if status == ledger.ALLOCATED:
+            row["allocated"] += count
+            window = windows.get(batch_id)
+            if window and window[0] <= day <= window[1]:
+                row["active"] += count
+        elif status == ledger.AVAILABLE:
+            row["idle"] += count
+    for (category, batch_id, action_type), count in movements.items():
+        rows[(category, batch_id)]["allocations" if action_type == ledger.ALLOCATE else "returns"] += count
+    return [
+        {"day": day, "category": category, "batch_id": batch_id, **{column: values[column] for column in METRIC_COLUMNS}}
+        for (category, batch_id), values in rows.items() if any(values.values())
+    ]
+
+def refresh(db: Session, until: date | None = None) -> int:
+    """Fill utilization_daily for complete days up to `until` (default yesterday, UTC); returns days written."""
+    Daily, Tx = models.UtilizationDaily, models.InventoryTransaction
+    until = until or datetime.now(timezone.utc).date() - timedelta(days=1)
+    last = db.query(func.max(Daily.day)).scalar()
+    if last is not None:
+        start = last + timedelta(days=1)
+    else:
+        first = db.query(func.min(Tx.timestamp)).scalar()
+        if first is None:
+            return 0
+        start = ledger.as_utc(first).date()
+    end = min(until, start + timedelta(days=UTILIZATION_MAX_DAYS_PER_RUN - 1))
+    if start > end:
+        return 0
+
+    windows = {
+        batch_id: (start_date.date(), end_date.date())
+        for batch_id, start_date, end_date in db.query(models.Batch.id, models.Batch.start_date, models.Batch.end_date)
+        if start_date and end_date
+    }
+    positions = {item["kit_id"]: item for item in ledger.positions_at(db, _start_of(start))["items"]}
+    groups = Counter(_group(item) for item in positions.values())
+
+    tail = db.query(Tx.kit_id, Tx.action_type, Tx.timestamp, *(getattr(Tx, column) for column in ledger.POSITION_COLUMNS)).filter(
+        Tx.timestamp > _start_of(start), Tx.timestamp <= _start_of(end + timedelta(days=1))
+    ).order_by(Tx.seq)
+    rows, movements, day = [], Counter(), start
+    for row in tail.yield_per(ledger.SNAPSHOT_CHUNK_SIZE):
+        while ledger.as_utc(row.timestamp) > _start_of(day + timedelta(days=1)):
+            rows += _day_rows(day, groups, movements, windows)
+            movements, day = Counter(), day + timedelta(days=1)
+        previous = positions.get(row.kit_id)
+        if previous is not None:
+            groups[_group(previous)] -= 1
+        ledger.apply(positions, row)
+        current = positions.get(row.kit_id)
+        if current is not None:
+            groups[_group(current)] += 1
+        if row.action_type in (ledger.ALLOCATE, ledger.RETURN):
+            batch_id = (previous or current or {}).get("batch_id") if row.action_type == ledger.RETURN else row.batch_id
+            movements[(row.category or "", batch_id or NO_BATCH, row.action_type)] += 1
+    while day <= end:
+        rows += _day_rows(day, groups, movements, windows)
+        movements, day = Counter(), day + timedelta(days=1)
+
+    db.query(Daily).filter(Daily.day >= start, Daily.day <= end).delete(synchronize_session=False)
+    for offset in range(0, len(rows), ledger.SNAPSHOT_CHUNK_SIZE):
+        db.execute(insert(Daily), rows[offset:offset + ledger.SNAPSHOT_CHUNK_SIZE])
+    db.commit()
+    days = (end - start).days + 1
+    logger.info(f"Utilization metrics filled for {start}..{end} ({days} day(s), {len(rows)} row(s))")
+    return days
+
+# History
+def _bucket(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+def history(db: Session, start: date, end: date, granularity: str = "day", category: str | None = None, batch_id: int | None = None) -> list[dict]:
+    """Utilization buckets between `start` and `end` (inclusive)."""
+    Daily = models.UtilizationDaily
+    query = db.query(Daily.day, *(func.sum(getattr(Daily, column)).label(column) for column in METRIC_COLUMNS)).filter(Daily.day >= start, Daily.day <= end)
+    if category is not None:
+        query = query.filter(Daily.category == category)
+    if batch_id is not None:
+        query = query.filter(Daily.batch_id == batch_id)
+
+    buckets = defaultdict(Counter)
+    for row in query.group_by(Daily.day):
+        bucket = buckets[_bucket(row.day, granularity)]
+        bucket["days"] += 1
+        for column in METRIC_COLUMNS:
+            bucket[column] += row._mapping[column] or 0
+
+    results = []
+    for period, bucket in sorted(buckets.items()):
+        kit_days = bucket["kits"]
+        average_kits = kit_days / bucket["days"]
+        results.append({
+            "period": period,
+            "days": bucket["days"],
+            "kit_days": kit_days,
+            "allocated_kit_days": bucket["allocated"],
+            "active_kit_days": bucket["active"],
+            "idle_kit_days": bucket["idle"],
+            "allocations": bucket["allocations"],
+            "returns": bucket["returns"],
+            "utilization_rate": round(bucket["allocated"] / kit_days * 100, 2) if kit_days else 0.0,
+            # Allocations per kit in service over the period
+            "turnover": round(bucket["allocations"] / average_kits, 4) if average_kits else 0.0,
+        })
+    return results
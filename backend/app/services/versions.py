@@ -0,0 +1,44 @@
+import hashlib
+from fastapi import Request, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from .. import models
+from . import stats
+
+# Conditional GET for the list endpoints
+# Every write path bumps the version of the tables it changes, in the same
+# transaction as the change. A list response carries a strong ETag built from
+# the versions of the tables it reads and the request's query string; a
+# request whose If-None-Match still matches is answered 304 after reading only
+# those few version rows. Versions are read before the list itself, so a write
+# committing in between at worst makes the next request a full 200.
+CACHE_CONTROL = "private, no-cache" # Browsers keep the body but revalidate every time
+
+def bump(db: Session, *tables):
+    """Advance the version of each model's table (no commit)."""
+    rows = [{"name": table.__tablename__, "version": 1} for table in dict.fromkeys(tables)]
+    stats.increment(db, models.TableVersion, "name", rows, ("version",))
+
+def read(db: Session, *tables) -> dict[str, int]:
+    names = [table.__tablename__ for table in tables]
+    stored = dict(db.execute(select(models.TableVersion.name, models.TableVersion.version).where(models.TableVersion.name.in_(names))).all())
+    return {name: stored.get(name, 0) for name in names}
+
+def etag(request: Request, current: dict[str, int]) -> str:
+    query = sorted(request.query_params.multi_items())
+    key = f"{request.url.path}?{query}#{sorted(current.items())}"
+    return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+def _matches(request: Request, tag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match uses the weak comparison (RFC 9110 13.1.2)
+    return header.strip() == "*" or any(candidate.strip().removeprefix("W/") == tag for candidate in header.split(","))
+
+def conditional(db: Session, request: Request, *tables) -> tuple[dict, Response | None]:
+    """Validator headers for the list response, and a ready 304 if the client's copy is current."""
+    headers = {"ETag": etag(request, read(db, *tables)), "Cache-Control": CACHE_CONTROL}
+    if _matches(request, headers["ETag"]):
+        return headers, Response(status_code=304, headers=headers)
+    return headers, None
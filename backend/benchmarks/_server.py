@@ -0,0 +1,55 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+
+# Shared harness: runs the API under uvicorn in a background thread against a
+# throwaway SQLite database. DATABASE_URL must be set before `app` is imported,
+# so benchmarks call prepare_database() first.
+
+def prepare_database() -> str:
+    if "DATABASE_URL" not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(prefix="samarth-bench-"), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    # Benchmarks seed data before serving: the schema must exist once app.main is imported
+    os.environ.setdefault("STARTUP_BOOTSTRAP", "sync")
+    return os.environ["DATABASE_URL"]
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class BackgroundServer:
+    def __init__(self, app):
+        import uvicorn
+
+        self.port = _free_port()
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(samples: list[float]) -> str:
+    return (f"n={len(samples)} p50={percentile(samples, 50) * 1000:.1f}ms "
+            f"p99={percentile(samples, 99) * 1000:.1f}ms max={max(samples, default=0) * 1000:.1f}ms")
@@ -0,0 +1,111 @@
+# Audit trail search: keyset pages on (timestamp, id) (services/audit_search.py)
+# against LIMIT/OFFSET, at increasing depths into the history.
+#
+#   cd backend && python -m benchmarks.audit_search [--rows 500000] [--months 12] [--repeat 10]
+#
+# Seeds a throwaway database with audit rows spread over the last few months,
+# runs the retention job so that (on SQLite) they are rolled into monthly
+# partitions, checks that both approaches return the same page, then prints
+# the median time of one page per filter and depth. Set DATABASE_URL to run
+# against Postgres instead of SQLite.
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from ._server import prepare_database
+
+prepare_database()
+os.environ.setdefault("AUDIT_RETENTION_MONTHS", "120")
+
+from sqlalchemy import func, insert, select, union_all  # noqa: E402
+from app import models  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.migrations import run_migrations  # noqa: E402
+from app.services import audit_search, audit_storage  # noqa: E402
+
+ACTIONS = ["LOGIN"] * 6 + ["FAILED_LOGIN", "CREATE_INVENTORY", "ALLOCATE_INVENTORY", "MARK_ATTENDANCE", "EXPORT_REPORT"]
+PAGE = 100
+
+def seed(rows: int, months: int):
+    rng = random.Random(11)
+    now = datetime.now(timezone.utc)
+    start = now - timedelta(days=30 * months)
+    step = (now - start) / rows
+    db = SessionLocal()
+    try:
+        for offset in range(0, rows, 10000):
+            db.execute(insert(models.AuditLog), [
+                {"action": rng.choice(ACTIONS), "details": f"Event {i}", "user_id": rng.randrange(1, 200), "timestamp": start + step * i}
+                for i in range(offset, min(rows, offset + 10000))
+            ])
+        db.commit()
+        audit_storage.maintain(db)
+    finally:
+        db.close()
+
+def offset_page(db, depth: int, user_id=None, action=None) -> list[int]:
+    # The OFFSET equivalent over the same tables
+    tables = [models.AuditLog.__table__] + [audit_storage.partition_table(name) for name in audit_storage.partitions(db).values()]
+    selects = []
+    for table in tables:
+        query = select(table.c.id, table.c.timestamp)
+        if user_id is not None:
+            query = query.where(table.c.user_id == user_id)
+        if action is not None:
+            query = query.where(table.c.action == action)
+        selects.append(query)
+    combined = union_all(*selects).subquery() if len(selects) > 1 else selects[0].subquery()
+    query = select(combined.c.id).order_by(combined.c.timestamp.desc(), combined.c.id.desc()).offset(depth).limit(PAGE)
+    return list(db.scalars(query))
+
+def cursor_at(db, depth: int, **filters) -> str | None:
+    # Walks to `depth` once so the timed call is a single page
+    cursor = None
+    for _ in range(depth // audit_search.STREAM_PAGE_SIZE):
+        _, cursor = audit_search.page(db, limit=audit_search.STREAM_PAGE_SIZE, cursor=cursor, **filters)
+    if depth % audit_search.STREAM_PAGE_SIZE:
+        _, cursor = audit_search.page(db, limit=depth % audit_search.STREAM_PAGE_SIZE, cursor=cursor, **filters)
+    return cursor
+
+def median_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=500000)
+    parser.add_argument("--months", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    with engine.connect() as conn:
+        if conn.execute(func.count(models.AuditLog.id).select()).scalar():
+            raise SystemExit("Database already has audit rows; point DATABASE_URL at an empty database")
+    seed(args.rows, args.months)
+
+    db = SessionLocal()
+    try:
+        print(f"{args.rows} audit rows, {len(audit_storage.partitions(db))} monthly partition(s)")
+        print(f"{'filter':28s} {'depth':>8s} {'keyset':>10s} {'OFFSET':>10s}")
+        for label, filters in (("none", {}), ("user_id=42", {"user_id": 42}), ("action=EXPORT_REPORT", {"action": "EXPORT_REPORT"})):
+            total = sum(1 for _ in audit_search.stream(SessionLocal, **filters))
+            for fraction in (0, 0.5, 0.95):
+                depth = int(total * fraction)
+                cursor = cursor_at(db, depth, **filters)
+                keyset = [record["id"] for record in audit_search.page(db, limit=PAGE, cursor=cursor, **filters)[0]]
+                assert keyset == offset_page(db, depth, **filters), (label, depth)
+                fast = median_ms(lambda: audit_search.page(db, limit=PAGE, cursor=cursor, **filters), args.repeat)
+                slow = median_ms(lambda: offset_page(db, depth, **filters), args.repeat)
+                print(f"{label:28s} {depth:8d} {fast:8.2f}ms {slow:8.2f}ms")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Login storm vs. unrelated request latency.
+#
+#   cd backend && python -m benchmarks.auth_concurrency [--logins 100] [--concurrency 32]
+#
+# Measures p50/p99 of GET / and an authenticated GET /dashboard/stats, first on
+# an idle server and then while a burst of bcrypt logins is in flight. With the
+# auth path off the event loop the "storm" numbers should stay close to idle.
+# Requires httpx (dev dependency).
+import argparse
+import asyncio
+import time
+from ._server import BackgroundServer, prepare_database, summarize
+
+prepare_database()
+
+from app import crud, models, schemas  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+
+async def probe(client, path: str, headers: dict, stop: asyncio.Event, samples: list):
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        response.raise_for_status()
+        samples.append(time.perf_counter() - started)
+        await asyncio.sleep(0.01)
+
+async def login_storm(client, logins: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login(i):
+        async with semaphore:
+            # Mix of good and bad passwords, both pay a full bcrypt verify
+            password = "bench-pass" if i % 2 else "wrong-pass"
+            await client.post("/api/v1/auth/token", data={"username": "bench", "password": password})
+
+    await asyncio.gather(*(login(i) for i in range(logins)))
+
+async def measure(client, headers: dict, duration: float | None, storm=None) -> dict:
+    stop = asyncio.Event()
+    samples = {"/": [], "/api/v1/dashboard/stats": []}
+    probes = [asyncio.create_task(probe(client, path, headers if path != "/" else {}, stop, out)) for path, out in samples.items()]
+    if storm is not None:
+        started = time.perf_counter()
+        await storm
+        elapsed = time.perf_counter() - started
+    else:
+        await asyncio.sleep(duration)
+        elapsed = duration
+    stop.set()
+    await asyncio.gather(*probes)
+    return {"elapsed": elapsed, "samples": samples}
+
+async def run(args):
+    import httpx
+
+    with BackgroundServer(app) as server:
+        limits = httpx.Limits(max_connections=args.concurrency + 8)
+        async with httpx.AsyncClient(base_url=server.url, limits=limits, timeout=120) as client:
+            token = (await client.post("/api/v1/auth/token", data={"username": "bench", "password": "bench-pass"})).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+
+            idle = await measure(client, headers, duration=3.0)
+            storm = await measure(client, headers, duration=None, storm=login_storm(client, args.logins, args.concurrency))
+
+    print(f"Login storm: {args.logins} logins, concurrency {args.concurrency}, {storm['elapsed']:.2f}s "
+          f"({args.logins / storm['elapsed']:.0f} logins/s)")
+    for path in idle["samples"]:
+        print(f"GET {path}")
+        print(f"  idle : {summarize(idle['samples'][path])}")
+        print(f"  storm: {summarize(storm['samples'][path])}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if not crud.get_user_by_username(db, "bench"):
+            crud.create_user(db, schemas.UserCreate(username="bench", password="bench-pass", role=models.Role.ADMIN))
+    finally:
+        db.close()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
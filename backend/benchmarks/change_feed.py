@@ -0,0 +1,72 @@
+# Keeping a local copy of the inventory current: re-downloading the full list
+# against pulling the change feed (services/changes.py).
+#
+#   cd backend && python -m benchmarks.change_feed [--rows 20000] [--moves 50]
+#
+# Seeds the same data as benchmarks.list_serialization, moves a few kits, then
+# compares bytes, requests and time for both ways of catching up, and checks
+# that the replica built from the feed matches the list endpoint.
+import argparse
+import time
+from .list_serialization import seed # Sets up the throwaway database first
+
+from fastapi.testclient import TestClient
+from app.main import app
+
+def download_inventory(client, headers: dict) -> tuple[dict, int, int]:
+    rows, size, requests, cursor = {}, 0, 0, None
+    while True:
+        params = {"limit": 1000, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/v1/inventory/", params=params, headers=headers)
+        size, requests = size + len(response.content), requests + 1
+        rows.update((row["id"], row) for row in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return rows, size, requests
+
+def pull_changes(client, headers: dict, replica: dict, since: int) -> tuple[int, int, int]:
+    size = requests = 0
+    while True:
+        response = client.get("/api/v1/changes/", params={"since": since, "entity": "inventory"}, headers=headers)
+        size, requests = size + len(response.content), requests + 1
+        feed = response.json()
+        changes = feed["changes"].get("inventory", {"upserted": [], "deleted": []})
+        replica.update((row["id"], row) for row in changes["upserted"])
+        for deleted in changes["deleted"]:
+            replica.pop(deleted, None)
+        since = feed["next"]
+        if not feed["has_more"]:
+            return since, size, requests
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--moves", type=int, default=50)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    with TestClient(app) as client:
+        token = client.post("/api/v1/auth/token", data={"username": "bench", "password": "bench-pass"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        # The bulk seed bypasses the write paths, so the replica starts from a full download
+        replica, _, _ = download_inventory(client, headers)
+        since = client.get("/api/v1/changes/", params={"entity": "inventory", "limit": 1}, headers=headers).json()["next"]
+
+        kit_ids = [f"KIT-{i:07d}" for i in range(0, args.rows, max(1, args.rows // args.moves))][:args.moves]
+        client.post("/api/v1/inventory/movements", json={"action_type": "TRANSFER", "kit_ids": kit_ids, "state": "Delhi"}, headers=headers).raise_for_status()
+        client.delete(f"/api/v1/inventory/{next(iter(replica))}", headers=headers).raise_for_status()
+
+        started = time.perf_counter()
+        current, full_bytes, full_requests = download_inventory(client, headers)
+        full_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        since, feed_bytes, feed_requests = pull_changes(client, headers, replica, since)
+        feed_ms = (time.perf_counter() - started) * 1000
+        assert replica == current, "replica built from the change feed differs from the list endpoint"
+
+        print(f"{args.rows} kits, {len(kit_ids)} moved, 1 deleted")
+        print(f"{'full download':15s} {full_bytes / 1024:10.1f}KB {full_requests:4d} request(s) {full_ms:8.1f}ms")
+        print(f"{'change feed':15s} {feed_bytes / 1024:10.1f}KB {feed_requests:4d} request(s) {feed_ms:8.1f}ms")
+
+if __name__ == "__main__":
+    main()
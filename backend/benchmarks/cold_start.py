@@ -0,0 +1,99 @@
+# Cold start: import time of app.main and time from process spawn to the first
+# /healthz, /readyz and authenticated API response, per STARTUP_BOOTSTRAP mode
+# (app/bootstrap.py).
+#
+#   cd backend && python -m benchmarks.cold_start [--repeat 3]
+#
+# Every run uses a fresh SQLite database in a new process. "off" runs
+# `python -m app.bootstrap` first, as a release step would, and reports it
+# separately. Medians over --repeat runs.
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from ._server import _free_port
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ("sync", "background", "off")
+IMPORT_SCRIPT = "import time; started = time.perf_counter(); import app.main; print(time.perf_counter() - started)"
+
+def fresh_env(mode: str) -> dict:
+    path = os.path.join(tempfile.mkdtemp(prefix="samarth-cold-"), "cold.db")
+    return {**os.environ, "DATABASE_URL": f"sqlite:///{path}", "STARTUP_BOOTSTRAP": mode}
+
+def release_step(env: dict) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "app.bootstrap"], cwd=BACKEND, env=env, check=True, capture_output=True)
+    return time.perf_counter() - started
+
+def measure_import(mode: str) -> float:
+    env = fresh_env(mode)
+    if mode == "off":
+        release_step(env)
+    output = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], cwd=BACKEND, env=env, check=True, capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+def request(url: str, data: dict | None = None, headers: dict | None = None) -> tuple[int, bytes]:
+    body = urllib.parse.urlencode(data).encode() if data is not None else None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=body, headers=headers or {}), timeout=30) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+    except OSError:
+        return 0, b""
+
+def wait_for(check, started: float, timeout: float = 60) -> float:
+    while time.perf_counter() - started < timeout:
+        if check():
+            return time.perf_counter() - started
+        time.sleep(0.005)
+    raise TimeoutError("server did not become available")
+
+def measure_server(mode: str) -> dict:
+    env = fresh_env(mode)
+    release = release_step(env) if mode == "off" else None
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+                               cwd=BACKEND, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        healthz = wait_for(lambda: request(f"{base}/healthz")[0] == 200, started)
+        readyz = wait_for(lambda: request(f"{base}/readyz")[0] == 200, started)
+
+        def first_api_call():
+            status, body = request(f"{base}/api/v1/auth/token", data={"username": "admin", "password": "admin123"})
+            if status != 200:
+                return False
+            token = json.loads(body)["access_token"]
+            return request(f"{base}/api/v1/dashboard/stats", headers={"Authorization": f"Bearer {token}"})[0] == 200
+        api = wait_for(first_api_call, started)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return {"release": release, "healthz": healthz, "readyz": readyz, "api": api}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    ms = lambda samples: f"{statistics.median(samples) * 1000:8.0f}ms"  # noqa: E731
+    print(f"{'mode':10s} {'release':>10s} {'import':>10s} {'/healthz':>10s} {'/readyz':>10s} {'first API':>10s}")
+    for mode in MODES:
+        imports = [measure_import(mode) for _ in range(args.repeat)]
+        runs = [measure_server(mode) for _ in range(args.repeat)]
+        release = ms([run["release"] for run in runs]) if mode == "off" else f"{'-':>10s}"
+        print(f"{mode:10s} {release} {ms(imports)} {ms([r['healthz'] for r in runs])} "
+              f"{ms([r['readyz'] for r in runs])} {ms([r['api'] for r in runs])}")
+
+if __name__ == "__main__":
+    main()
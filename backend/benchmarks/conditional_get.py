@@ -0,0 +1,65 @@
+# Conditional GET on the list endpoints: a full 200 against a 304 revalidation
+# with If-None-Match (services/versions.py).
+#
+#   cd backend && python -m benchmarks.conditional_get [--rows 20000] [--page 1000] [--repeat 20]
+#
+# Seeds the same data as benchmarks.list_serialization, then reports the
+# median latency and SQL statements per request for both cases, and checks
+# that a write invalidates the ETag.
+import argparse
+import statistics
+import time
+from .list_serialization import seed # Sets up the throwaway database first
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.database import engine
+from app.main import app
+
+def measure(client, path: str, params: dict, headers: dict, repeat: int) -> tuple[float, int, int]:
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        timings = []
+        for _ in range(repeat):
+            statements.clear()
+            started = time.perf_counter()
+            response = client.get(path, params=params, headers=headers)
+            timings.append(time.perf_counter() - started)
+        return statistics.median(timings) * 1000, len(statements), response.status_code
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    cases = [
+        ("inventory", "/api/v1/inventory/", {"limit": args.page}),
+        ("content", "/api/v1/content/", {"limit": args.page}),
+        ("users", "/api/v1/auth/users/", {"limit": args.page}),
+        ("trainings (expand=participants)", "/api/v1/training/", {"limit": args.page, "expand": "participants"}),
+    ]
+    with TestClient(app) as client:
+        token = client.post("/api/v1/auth/token", data={"username": "bench", "password": "bench-pass"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        print(f"{'endpoint':34s} {'200':>10s} {'SQL':>4s} {'304':>10s} {'SQL':>4s}")
+        for label, path, params in cases:
+            etag = client.get(path, params=params, headers=headers).headers["ETag"]
+            full, full_sql, status = measure(client, path, params, headers, args.repeat)
+            assert status == 200, label
+            cached, cached_sql, status = measure(client, path, params, {**headers, "If-None-Match": etag}, args.repeat)
+            assert status == 304, label
+            print(f"{label:34s} {full:8.2f}ms {full_sql:4d} {cached:8.2f}ms {cached_sql:4d}  ({full / cached:.0f}x)")
+
+        etag = client.get("/api/v1/inventory/", headers=headers).headers["ETag"]
+        client.post("/api/v1/inventory/", json={"kit_id": "KIT-NEW", "name": "New kit", "category": "Robotics", "status": "AVAILABLE", "state": "Kerala", "quantity": 1}, headers=headers).raise_for_status()
+        assert client.get("/api/v1/inventory/", headers={**headers, "If-None-Match": etag}).status_code == 200, "a write must invalidate the ETag"
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# Live dashboard streams: what many open /dashboard/stream connections cost
+# between events, and how fast a write reaches all of them (services/events.py).
+#
+#   cd backend && python -m benchmarks.event_stream [--clients 500] [--idle 5] [--writes 20]
+#
+# Opens --clients SSE connections, measures process CPU while they sit idle,
+# then times each inventory write from POST to the counters event arriving at
+# the last client. Finally checks that a subscriber that stops reading is
+# evicted once its buffer fills. Requires httpx (dev dependency).
+import argparse
+import asyncio
+import time
+from ._server import BackgroundServer, prepare_database, summarize
+
+prepare_database()
+
+from app import crud, models, schemas  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.events import COUNTERS, hub  # noqa: E402
+
+class StreamClient:
+    def __init__(self, port: int, ticket: str):
+        self.port = port
+        self.ticket = ticket
+        self.received: dict[int, float] = {} # write number -> arrival time
+        self.connected = asyncio.Event()
+
+    async def run(self):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write(f"GET /api/v1/dashboard/stream?ticket={self.ticket} HTTP/1.1\r\nHost: bench\r\nAccept: text/event-stream\r\n\r\n".encode())
+        await writer.drain()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                if line.startswith(b"retry:"):
+                    self.connected.set()
+                elif line.startswith(b"event: counters"):
+                    self.received[len(self.received)] = time.perf_counter()
+        finally:
+            writer.close()
+
+async def run(args):
+    import httpx
+
+    with BackgroundServer(app) as server:
+        async with httpx.AsyncClient(base_url=server.url, timeout=60) as client:
+            token = (await client.post("/api/v1/auth/token", data={"username": "bench", "password": "bench-pass"})).json()["access_token"]
+            headers = {"Authorization": f"Bearer {token}"}
+
+            ticket = (await client.post("/api/v1/dashboard/stream-ticket", headers=headers)).json()["ticket"]
+            clients = [StreamClient(server.port, ticket) for _ in range(args.clients)]
+            tasks = [asyncio.create_task(c.run()) for c in clients]
+            await asyncio.wait_for(asyncio.gather(*(c.connected.wait() for c in clients)), 60)
+            print(f"{args.clients} streams open, {hub.metrics()['subscribers']} subscribers")
+
+            started_cpu, started = time.process_time(), time.perf_counter()
+            await asyncio.sleep(args.idle)
+            cpu = time.process_time() - started_cpu
+            print(f"idle: {cpu * 1000:.1f}ms CPU over {time.perf_counter() - started:.1f}s "
+                  f"({cpu / args.idle * 100:.2f}% of one core, server and clients together)")
+
+            latencies = []
+            for i in range(args.writes):
+                started = time.perf_counter()
+                response = await client.post("/api/v1/inventory/", json={"kit_id": f"KIT-SSE-{i:05d}", "name": "Stream kit", "category": "Robotics", "status": "AVAILABLE", "state": "Kerala", "quantity": 1}, headers=headers)
+                response.raise_for_status()
+                while any(i not in c.received for c in clients):
+                    await asyncio.sleep(0.001)
+                latencies.append(max(c.received[i] for c in clients) - started)
+            print(f"write -> last of {args.clients} clients: {summarize(latencies)}")
+
+            # A subscriber that never reads: its queue fills and it is dropped,
+            # while the clients that keep up stay connected
+            stalled = asyncio.run_coroutine_threadsafe(_subscribe(), hub._loop).result()
+            evicted = hub.metrics()["evicted"]
+            for _ in range(hub.buffer_size + 1):
+                hub.publish(COUNTERS, {"bench": 0})
+                await asyncio.sleep(0.005)
+            await asyncio.sleep(0.5)
+            assert stalled.evicted and hub.metrics()["evicted"] == evicted + 1, "stalled subscriber was not evicted"
+            assert hub.metrics()["subscribers"] == args.clients, "a live client was evicted"
+            print(f"stalled subscriber evicted after {hub.buffer_size + 1} events, {args.clients} live clients kept")
+
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+async def _subscribe():
+    return hub.subscribe((COUNTERS,))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--idle", type=float, default=5.0)
+    parser.add_argument("--writes", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if not crud.get_user_by_username(db, "bench"):
+            crud.create_user(db, schemas.UserCreate(username="bench", password="bench-pass", role=models.Role.ADMIN))
+            db.commit()
+    finally:
+        db.close()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# List endpoint serialization: default ORM + response_model path vs. the
+# FAST_LIST_RESPONSES path (Core rows + cached TypeAdapter).
+#
+#   cd backend && python -m benchmarks.list_serialization [--rows 20000] [--page 1000] [--repeat 5]
+#
+# Runs every list endpoint in-process in both modes and reports rows/s and the
+# peak traced memory (tracemalloc) per request. Responses are checked to be
+# identical between the two modes, including legacy rows with empty strings.
+import argparse
+import time
+import tracemalloc
+from datetime import datetime
+from ._server import prepare_database
+
+prepare_database()
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from app import crud, models, schemas  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services import serialization  # noqa: E402
+
+def seed(rows: int):
+    db = SessionLocal()
+    try:
+        if not crud.get_user_by_username(db, "bench"):
+            crud.create_user(db, schemas.UserCreate(username="bench", password="bench-pass", role=models.Role.SUPER_ADMIN))
+        db.execute(insert(models.InventoryItem), [{
+            "kit_id": f"KIT-{i:07d}", "name": f"Kit {i}", "model": "M1", "serial_number": f"SN-{i}",
+            "category": "Robotics", "status": "AVAILABLE", "state": "Kerala", "district": "Ernakulam",
+            "institution": "NIELIT Calicut", "quantity": 1, "description": "Benchmark kit",
+            # Every tenth kit as legacy rows store it: empty strings instead of NULL
+            **({"model": "", "district": "", "institution": "", "description": ""} if i % 10 == 0 else {}),
+        } for i in range(rows)])
+        db.execute(insert(models.ContentItem), [{
+            "title": f"Module {i}", "category": "Robotics", "duration_minutes": 45, "tags": "bench,robotics",
+        } for i in range(rows)])
+        db.execute(insert(models.User), [{
+            "username": f"user{i}", "hashed_password": "x", "role": models.Role.ADMIN.value, "full_name": f"User {i}", "is_active": True,
+        } for i in range(rows // 10)])
+        training_ids = db.execute(insert(models.TrainingProgram).returning(models.TrainingProgram.id), [{
+            "title": f"Program {i}", "instructor": "Bench", "date": "2025-01-01", "status": "Scheduled",
+        } for i in range(rows // 100)]).scalars().all()
+        batch_ids = db.execute(insert(models.Batch).returning(models.Batch.id), [{
+            "name": f"Batch {i}", "training_id": training_id, "start_date": datetime(2025, 1, 1), "end_date": datetime(2025, 1, 31), "location": "Lab",
+        } for training_id in training_ids for i in range(3)]).scalars().all()
+        db.execute(insert(models.Participant), [{
+            "name": f"Participant {i}", "email": f"p{i}@example.com", "batch_id": batch_id,
+        } for batch_id in batch_ids for i in range(10)])
+        db.commit()
+    finally:
+        db.close()
+
+def run_case(client, path: str, params: dict, headers: dict, repeat: int, fast: bool):
+    serialization.FAST_LIST_RESPONSES = fast
+    client.get(path, params=params, headers=headers).raise_for_status() # warm up
+    elapsed, peak, body, rows = 0.0, 0, b"", 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        started = time.perf_counter()
+        response = client.get(path, params=params, headers=headers)
+        elapsed += time.perf_counter() - started
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        response.raise_for_status()
+        body, rows = response.content, len(response.json())
+    return {"rows_per_s": rows * repeat / elapsed, "peak_mb": peak / 1024 / 1024, "body": body, "rows": rows}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    cases = [
+        ("inventory", "/api/v1/inventory/", {"limit": args.page}),
+        ("content", "/api/v1/content/", {"limit": args.page}),
+        ("users", "/api/v1/auth/users/", {"limit": args.page}),
+        ("trainings (expand=none)", "/api/v1/training/", {"limit": args.page, "expand": "none"}),
+        ("trainings (expand=participants)", "/api/v1/training/", {"limit": args.page, "expand": "participants"}),
+    ]
+    with TestClient(app) as client:
+        token = client.post("/api/v1/auth/token", data={"username": "bench", "password": "bench-pass"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        print(f"{'endpoint':34s} {'rows':>6s} {'default rows/s':>15s} {'fast rows/s':>12s} {'speedup':>8s} {'default peak':>13s} {'fast peak':>10s}")
+        for label, path, params in cases:
+            default = run_case(client, path, params, headers, args.repeat, fast=False)
+            fast = run_case(client, path, params, headers, args.repeat, fast=True)
+            if default["body"] != fast["body"]:
+                raise SystemExit(f"{label}: fast path response differs from the default path")
+            print(f"{label:34s} {fast['rows']:6d} {default['rows_per_s']:15,.0f} {fast['rows_per_s']:12,.0f} "
+                  f"{fast['rows_per_s'] / default['rows_per_s']:7.1f}x {default['peak_mb']:11.1f}MB {fast['peak_mb']:8.1f}MB")
+
+if __name__ == "__main__":
+    main()
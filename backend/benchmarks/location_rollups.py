@@ -0,0 +1,97 @@
+# Regional drill-down: maintained location_rollups (services/rollups.py) against
+# ad-hoc GROUP BYs over the inventory table.
+#
+#   cd backend && python -m benchmarks.location_rollups [--rows 200000] [--repeat 20]
+#
+# Seeds a throwaway database through the real write paths' bulk helpers, checks
+# that both approaches agree, then prints the median time of each drill-down
+# level. Set DATABASE_URL to run against Postgres instead of SQLite.
+import argparse
+import random
+import statistics
+import time
+from collections import Counter
+from ._server import prepare_database
+
+prepare_database()
+
+from sqlalchemy import func, insert  # noqa: E402
+from app import models  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.migrations import run_migrations  # noqa: E402
+from app.services import rollups  # noqa: E402
+
+STATUSES = ["AVAILABLE"] * 6 + ["ALLOCATED"] * 3 + ["DAMAGED"]
+
+def seed(rows: int):
+    rng = random.Random(7)
+    db = SessionLocal()
+    try:
+        for offset in range(0, rows, 5000):
+            chunk = []
+            for i in range(offset, min(rows, offset + 5000)):
+                state, district = rng.randrange(36), rng.randrange(20)
+                chunk.append({
+                    "kit_id": f"KIT-{i:07d}", "name": f"Kit {i}", "category": f"Category {i % 8}", "status": rng.choice(STATUSES),
+                    "state": f"State {state}", "district": f"District {state}-{district}",
+                    "institution": f"Institute {state}-{district}-{rng.randrange(30)}", "quantity": 1,
+                })
+            db.execute(insert(models.InventoryItem), chunk)
+            rollups.adjust(db, Counter(rollups.leaf(models.InventoryItem(**row)) for row in chunk))
+        db.commit()
+    finally:
+        db.close()
+
+def group_by(db, state=None, district=None, institution=None) -> dict:
+    # The ad-hoc equivalent of rollups.drill_down
+    Item = models.InventoryItem
+    path = [value for value in (state, district, institution) if value is not None]
+    prefix = [getattr(Item, column) == value for column, value in zip(rollups.LOCATION_COLUMNS, path)]
+    node = db.query(Item.status, Item.category, func.count(Item.id)).filter(*prefix).group_by(Item.status, Item.category).all()
+    children = []
+    if len(path) < rollups.INSTITUTION:
+        child = getattr(Item, rollups.LOCATION_COLUMNS[len(path)])
+        children = db.query(child, Item.status, Item.category, func.count(Item.id)).filter(*prefix).group_by(child, Item.status, Item.category).all()
+    return {"total": sum(row[-1] for row in node), "children": len({row[0] for row in children})}
+
+def median_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    with engine.connect() as conn:
+        if conn.execute(func.count(models.InventoryItem.id).select()).scalar():
+            raise SystemExit("Database already has inventory rows; point DATABASE_URL at an empty database")
+    seed(args.rows)
+
+    levels = {
+        "national": {},
+        "state": {"state": "State 3"},
+        "district": {"state": "State 3", "district": "District 3-7"},
+        "institution": {"state": "State 3", "district": "District 3-7", "institution": "Institute 3-7-11"},
+    }
+    db = SessionLocal()
+    try:
+        print(f"{args.rows} kits, {db.query(models.LocationRollup).count()} rollup rows")
+        print(f"{'level':12s} {'rollups':>10s} {'GROUP BY':>10s}")
+        for level, path in levels.items():
+            rolled, grouped = rollups.drill_down(db, **path), group_by(db, **path)
+            assert (rolled["total"], len(rolled["children"])) == (grouped["total"], grouped["children"]), level
+            fast = median_ms(lambda: rollups.drill_down(db, **path), args.repeat)
+            slow = median_ms(lambda: group_by(db, **path), args.repeat)
+            print(f"{level:12s} {fast:8.2f}ms {slow:8.2f}ms  ({slow / fast:.1f}x)")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# NDU sync throughput against the local stub gateway.
+#
+#   cd backend && python -m benchmarks.ndu_bulk_sync [--items 2000] [--latency-ms 50] [--batch-size 100]
+#
+# Compares three ways of pushing every pending content item to NDU:
+#   per-item, new connection  one request and one TCP connection per item (old style)
+#   per-item, pooled          AsyncNDUClient: keep-alive pool + per-host concurrency
+#   bulk                      POST /integration/sync/bulk/content (grouped payloads,
+#                             per-item results, IntegrationLog written in bulk)
+import argparse
+import asyncio
+import os
+import time
+from ._server import BackgroundServer, prepare_database
+from .ndu_stub import create_stub
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--sample", type=int, default=200, help="items sent in the per-item runs")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    prepare_database()
+    stub_server = BackgroundServer(create_stub(args.latency_ms, seed=3))
+    os.environ["NDU_GATEWAY_URL"] = stub_server.url
+    os.environ["NDU_PER_HOST_CONCURRENCY"] = str(args.concurrency)
+
+    import httpx
+    from fastapi.testclient import TestClient
+    from sqlalchemy import insert
+    from app import crud, models, schemas
+    from app.database import SessionLocal
+    from app.main import app
+    from app.services.ndu_gateway import AsyncNDUClient
+
+    db = SessionLocal()
+    try:
+        crud.create_user(db, schemas.UserCreate(username="bench", password="bench-pass", role=models.Role.ADMIN))
+        db.execute(insert(models.ContentItem), [
+            {"title": f"Module {i}", "category": "Robotics", "duration_minutes": 30, "tags": "bench"} for i in range(args.items)
+        ])
+        db.commit()
+    finally:
+        db.close()
+    payload = {"title": "Module", "category": "Robotics", "duration": 30, "source": "SAMARTH_PORTAL"}
+
+    with stub_server:
+        # Per-item, new connection each time (sequential, like the old inline sync)
+        started = time.perf_counter()
+        for i in range(args.sample):
+            with httpx.Client(base_url=stub_server.url) as client:
+                client.post("/content", json=payload, headers={"Idempotency-Key": f"fresh-{i}"}).raise_for_status()
+        fresh = args.sample / (time.perf_counter() - started)
+
+        # Per-item through the pooled client
+        async def pooled_run():
+            client = AsyncNDUClient(stub_server.url, per_host_concurrency=args.concurrency)
+            try:
+                await asyncio.gather(*(
+                    client.post("/content", payload, headers={"Idempotency-Key": f"pooled-{i}"}) for i in range(args.sample)
+                ))
+            finally:
+                await client.aclose()
+        started = time.perf_counter()
+        asyncio.run(pooled_run())
+        pooled = args.sample / (time.perf_counter() - started)
+
+        # Bulk endpoint: grouped payloads end to end, including DB writes
+        with TestClient(app) as client:
+            token = client.post("/api/v1/auth/token", data={"username": "bench", "password": "bench-pass"}).json()["access_token"]
+            started = time.perf_counter()
+            response = client.post("/api/v1/integration/sync/bulk/content", params={"batch_size": args.batch_size},
+                                   headers={"Authorization": f"Bearer {token}"})
+            elapsed = time.perf_counter() - started
+            response.raise_for_status()
+            report = response.json()
+        stub_stats = httpx.get(f"{stub_server.url}/stats").json()
+
+    db = SessionLocal()
+    try:
+        logs = db.query(models.IntegrationLog).count()
+        pending = db.query(models.ContentItem).filter(models.ContentItem.ndu_reference_id.is_(None)).count()
+    finally:
+        db.close()
+
+    print(f"Stub latency {args.latency_ms:.0f}ms, per-host concurrency {args.concurrency}")
+    print(f"per-item, new connection : {fresh:9.1f} items/s  ({args.sample} items)")
+    print(f"per-item, pooled         : {pooled:9.1f} items/s  ({args.sample} items)")
+    print(f"bulk (batch {args.batch_size:4d})        : {report['total'] / elapsed:9.1f} items/s  "
+          f"({report['total']} items, {stub_stats['batches']} batch requests, {elapsed:.2f}s)")
+    print(f"Bulk report: synced={report['synced']} failed={report['failed']}; IntegrationLog rows={logs}; still pending={pending}")
+
+if __name__ == "__main__":
+    main()
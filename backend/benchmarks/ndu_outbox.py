@@ -0,0 +1,96 @@
+# NDU outbox end to end against the local stub gateway.
+#
+#   cd backend && python -m benchmarks.ndu_outbox [--items 300] [--latency-ms 100] [--failure-rate 0.3] [--workers 8]
+#
+# Starts the stub (benchmarks/ndu_stub.py) and the API, requests a sync for every
+# content item through the HTTP endpoint, then waits for the outbox to drain.
+# Reports sync request latency (should not include NDU latency), drain
+# throughput, attempts per entry and dead letters, and checks that the stub
+# registered each item at most once despite retries (Idempotency-Key replays).
+import argparse
+import os
+import time
+from collections import Counter
+from ._server import BackgroundServer, prepare_database, summarize
+from .ndu_stub import create_stub
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--latency-ms", type=float, default=100)
+    parser.add_argument("--failure-rate", type=float, default=0.3)
+    parser.add_argument("--reject-rate", type=float, default=0.01)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=300)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    prepare_database()
+    stub_server = BackgroundServer(create_stub(args.latency_ms, args.latency_ms / 2, args.failure_rate, args.reject_rate, seed=11))
+    os.environ["NDU_GATEWAY_URL"] = stub_server.url
+    os.environ["NDU_WORKERS"] = str(args.workers)
+    os.environ.setdefault("NDU_BACKOFF_BASE_SECONDS", "0.1")
+    os.environ.setdefault("NDU_BACKOFF_MAX_SECONDS", "2")
+
+    import httpx
+    from fastapi.testclient import TestClient
+    from sqlalchemy import func, insert
+    from app import crud, models, schemas
+    from app.database import SessionLocal
+    from app.main import app
+
+    db = SessionLocal()
+    try:
+        crud.create_user(db, schemas.UserCreate(username="bench", password="bench-pass", role=models.Role.ADMIN))
+        db.execute(insert(models.ContentItem), [
+            {"title": f"Module {i}", "category": "Robotics", "duration_minutes": 30, "tags": "bench"} for i in range(args.items)
+        ])
+        db.commit()
+        content_ids = [row.id for row in db.query(models.ContentItem.id)]
+    finally:
+        db.close()
+
+    with stub_server, TestClient(app) as client:
+        token = client.post("/api/v1/auth/token", data={"username": "bench", "password": "bench-pass"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        latencies = []
+        started = time.perf_counter()
+        for content_id in content_ids:
+            request_started = time.perf_counter()
+            response = client.post(f"/api/v1/integration/sync/content/{content_id}", headers=headers)
+            latencies.append(time.perf_counter() - request_started)
+            assert response.status_code == 202, response.text
+
+        db = SessionLocal()
+        try:
+            deadline = time.monotonic() + args.timeout
+            while True:
+                counts = dict(db.query(models.NduOutbox.status, func.count()).group_by(models.NduOutbox.status).all())
+                db.rollback()
+                if not counts.get("PENDING") and not counts.get("IN_PROGRESS"):
+                    break
+                if time.monotonic() > deadline:
+                    raise SystemExit(f"Outbox did not drain within {args.timeout}s: {counts}")
+                time.sleep(0.1)
+            elapsed = time.perf_counter() - started
+            attempts = Counter(attempts for (attempts,) in db.query(models.NduOutbox.attempts))
+            synced = db.query(models.ContentItem).filter(models.ContentItem.ndu_reference_id.isnot(None)).count()
+            logged_retries = db.query(func.max(models.IntegrationLog.retry_count)).scalar()
+        finally:
+            db.close()
+        stub_stats = httpx.get(f"{stub_server.url}/stats").json()
+
+    print(f"Sync requests (202): {summarize(latencies)}  (stub latency {args.latency_ms:.0f}ms +/- jitter)")
+    print(f"Drained {args.items} entries in {elapsed:.2f}s ({args.items / elapsed:.1f} entries/s) with {args.workers} workers")
+    print(f"Outbox: {counts}")
+    print(f"Attempts per entry: {dict(sorted(attempts.items()))}  (max IntegrationLog.retry_count {logged_retries})")
+    print(f"Stub: {stub_stats}")
+    print(f"Content items synced: {synced}")
+    # Dead letters may still have reached NDU (lost response), but never more than once per entry
+    if stub_stats["registered"] > args.items or synced != counts.get("DONE", 0):
+        raise SystemExit("Items were registered at NDU more than once or results were not applied")
+
+if __name__ == "__main__":
+    main()
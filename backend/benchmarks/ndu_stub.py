@@ -0,0 +1,102 @@
+# Local stub of the NDU gateway with latency and failure injection.
+#
+#   cd backend && python -m benchmarks.ndu_stub [--port 9100] [--latency-ms 200] [--failure-rate 0.2]
+#   NDU_GATEWAY_URL=http://127.0.0.1:9100 uvicorn app.main:app
+#
+# Honours Idempotency-Key: a repeated key gets the original response back and is
+# not registered twice. /content/batch and /training/batch take grouped payloads
+# and answer per item; latency and 503s apply per request, 422s per item.
+# GET /stats reports requests, injected failures and how many distinct items
+# were registered.
+import argparse
+import asyncio
+import random
+import uuid
+from fastapi import FastAPI, Header, HTTPException
+
+PREFIXES = {"content": "NDU", "training": "NDU-TR", "progress": "NDU-PR"}
+
+def create_stub(latency_ms: float = 0, jitter_ms: float = 0, failure_rate: float = 0.0, reject_rate: float = 0.0, seed: int | None = None) -> FastAPI:
+    stub = FastAPI(title="NDU Gateway Stub")
+    rng = random.Random(seed)
+    registered = {}
+    counters = {"requests": 0, "batches": 0, "failures": 0, "rejections": 0, "replays": 0}
+
+    async def delay():
+        counters["requests"] += 1
+        wait = latency_ms + rng.uniform(0, jitter_ms)
+        if wait:
+            await asyncio.sleep(wait / 1000)
+        if rng.random() < failure_rate:
+            counters["failures"] += 1
+            raise HTTPException(status_code=503, detail="Injected failure")
+
+    def register(kind: str, idempotency_key: str | None) -> dict:
+        if idempotency_key and idempotency_key in registered:
+            counters["replays"] += 1
+            return registered[idempotency_key]
+        if rng.random() < reject_rate:
+            counters["rejections"] += 1
+            raise HTTPException(status_code=422, detail="Injected rejection")
+        prefix = PREFIXES[kind]
+        response = {"id": f"{prefix}-{uuid.uuid4().hex[:8].upper()}", "status": "Synced", "message": "Received successfully"}
+        registered[idempotency_key or uuid.uuid4().hex] = response
+        return response
+
+    def register_batch(kind: str, body: dict) -> dict:
+        counters["batches"] += 1
+        results = []
+        for item in body.get("items", []):
+            key = item.get("idempotency_key")
+            try:
+                results.append({"idempotency_key": key, **register(kind, key)})
+            except HTTPException as e:
+                results.append({"idempotency_key": key, "error": e.detail, "retryable": False})
+        return {"results": results}
+
+    @stub.post("/content")
+    async def content(payload: dict, idempotency_key: str | None = Header(None)):
+        await delay()
+        return register("content", idempotency_key)
+
+    @stub.post("/training")
+    async def training(payload: dict, idempotency_key: str | None = Header(None)):
+        await delay()
+        return register("training", idempotency_key)
+
+    @stub.post("/progress")
+    async def progress(payload: dict, idempotency_key: str | None = Header(None)):
+        await delay()
+        return register("progress", idempotency_key)
+
+    # Grouped payloads: {"items": [{"idempotency_key", "data"}]} -> per-item results
+    @stub.post("/content/batch")
+    async def content_batch(body: dict):
+        await delay()
+        return register_batch("content", body)
+
+    @stub.post("/training/batch")
+    async def training_batch(body: dict):
+        await delay()
+        return register_batch("training", body)
+
+    @stub.get("/stats")
+    async def stats():
+        return {**counters, "registered": len(registered)}
+
+    return stub
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="NDU gateway stub")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--reject-rate", type=float, default=0.0, help="fraction of requests answered with 422")
+    args = parser.parse_args()
+    uvicorn.run(create_stub(args.latency_ms, args.jitter_ms, args.failure_rate, args.reject_rate), host="127.0.0.1", port=args.port)
+
+if __name__ == "__main__":
+    main()
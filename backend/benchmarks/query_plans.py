@@ -0,0 +1,149 @@
+# Query plans and timings for the hot read paths, before and after the
+# hot-path index migration (v0003).
+#
+#   cd backend && python -m benchmarks.query_plans [--rows 50000] [--repeat 20]
+#
+# Migrates a throwaway database up to v0002, seeds it, prints the plan and the
+# median time of each query, then applies the remaining migrations and prints
+# them again. Set DATABASE_URL to run against Postgres instead of SQLite.
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from ._server import prepare_database
+
+prepare_database()
+
+from sqlalchemy import func, insert, text  # noqa: E402
+from app import models  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.migrations import run_migrations  # noqa: E402
+
+BEFORE_INDEXES = 2
+
+QUERIES = {
+    "recent audits": (
+        "SELECT * FROM audit_logs ORDER BY timestamp DESC LIMIT 5", {}),
+    "utilization count": (
+        "SELECT count(*) FROM inventory WHERE batch_id IS NOT NULL", {}),
+    "inventory by status (keyset page)": (
+        "SELECT * FROM inventory WHERE status = :status AND id > :last_id ORDER BY id LIMIT 100",
+        {"status": "DAMAGED", "last_id": 0}),
+    "inventory by location": (
+        "SELECT * FROM inventory WHERE state = :state AND district = :district AND institution = :institution ORDER BY id LIMIT 100",
+        {"state": "State 3", "district": "District 3-2", "institution": "Institute 3-2-1"}),
+    "content by category": (
+        "SELECT count(*) FROM content_items WHERE category = :category", {"category": "Category 4"}),
+    "pending NDU sync": (
+        "SELECT id FROM content_items WHERE ndu_reference_id IS NULL ORDER BY id LIMIT 100", {}),
+    "attendance by participant": (
+        "SELECT * FROM attendance WHERE participant_id = :participant_id AND date >= :since",
+        {"participant_id": 42, "since": datetime(2025, 1, 15)}),
+}
+
+def _chunks(rows: list, size: int = 5000):
+    for offset in range(0, len(rows), size):
+        yield rows[offset:offset + size]
+
+def seed(rows: int):
+    rng = random.Random(7)
+    statuses = ["AVAILABLE"] * 6 + ["ALLOCATED"] * 3 + ["DAMAGED"]
+    now = datetime.now(timezone.utc)
+    db = SessionLocal()
+    try:
+        training = models.TrainingProgram(title="Bench", instructor="Bench", date="2025-01-01", status="Scheduled")
+        db.add(training)
+        db.flush()
+        batches = [models.Batch(name=f"Batch {i}", training_id=training.id, location="Lab") for i in range(50)]
+        db.add_all(batches)
+        db.flush()
+        batch_ids = [batch.id for batch in batches]
+
+        inventory = []
+        for i in range(rows):
+            state = rng.randrange(10)
+            district = rng.randrange(5)
+            status = rng.choice(statuses)
+            inventory.append({
+                "kit_id": f"KIT-{i:07d}", "name": f"Kit {i}", "model": "M1", "category": f"Category {i % 8}",
+                "status": status, "state": f"State {state}", "district": f"District {state}-{district}",
+                "institution": f"Institute {state}-{district}-{rng.randrange(4)}", "quantity": 1,
+                "batch_id": rng.choice(batch_ids) if status == "ALLOCATED" else None,
+            })
+        for chunk in _chunks(inventory):
+            db.execute(insert(models.InventoryItem), chunk)
+
+        audits = [{"action": "BENCH", "details": f"event {i}", "timestamp": now - timedelta(seconds=rows - i)} for i in range(rows)]
+        for chunk in _chunks(audits):
+            db.execute(insert(models.AuditLog), chunk)
+
+        content = [{
+            "title": f"Module {i}", "category": f"Category {i % 8}", "duration_minutes": 30, "tags": "bench",
+            # Most content is already synced; the pending set is the small tail
+            "ndu_reference_id": None if i % 50 == 0 else f"NDU-{i}",
+        } for i in range(rows // 5)]
+        for chunk in _chunks(content):
+            db.execute(insert(models.ContentItem), chunk)
+
+        participants = [{"name": f"Participant {i}", "batch_id": batch_ids[i % len(batch_ids)]} for i in range(1000)]
+        db.execute(insert(models.Participant), participants)
+        start = datetime(2025, 1, 1)
+        attendance = [{
+            "participant_id": 1 + i % 1000, "batch_id": batch_ids[i % len(batch_ids)],
+            "date": start + timedelta(days=i // 1000), "status": "PRESENT" if rng.random() < 0.9 else "ABSENT",
+        } for i in range(rows)]
+        for chunk in _chunks(attendance):
+            db.execute(insert(models.Attendance), chunk)
+        db.commit()
+    finally:
+        db.close()
+
+def explain(conn, sql: str, params: dict) -> list[str]:
+    if conn.dialect.name == "sqlite":
+        return [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), params)]
+    return [row[0] for row in conn.execute(text(f"EXPLAIN {sql}"), params)]
+
+def measure(label: str, repeat: int) -> dict:
+    results = {}
+    print(f"\n=== {label} ===")
+    with engine.connect() as conn:
+        for name, (sql, params) in QUERIES.items():
+            plan = explain(conn, sql, params)
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                conn.execute(text(sql), params).all()
+                timings.append(time.perf_counter() - started)
+            results[name] = statistics.median(timings)
+            print(f"{name}: {results[name] * 1000:.2f}ms")
+            for line in plan:
+                print(f"    {line}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    run_migrations(engine, target=BEFORE_INDEXES)
+    with engine.connect() as conn:
+        seeded = conn.execute(func.count(models.InventoryItem.id).select()).scalar()
+    if seeded:
+        raise SystemExit("Database already has inventory rows; point DATABASE_URL at an empty database")
+    seed(args.rows)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    before = measure(f"before hot-path indexes (v{BEFORE_INDEXES:04d})", args.repeat)
+    run_migrations(engine)
+    after = measure("after all migrations", args.repeat)
+
+    print("\n=== summary (median) ===")
+    for name in QUERIES:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:36s} {before[name] * 1000:9.2f}ms -> {after[name] * 1000:9.2f}ms  ({speedup:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Sparse fieldsets: full list pages against ?fields= with the columns the
+# Inventory and Content tables render (services/serialization.py).
+#
+#   cd backend && python -m benchmarks.sparse_fields [--rows 20000] [--page 1000] [--repeat 5]
+#
+# Seeds the same data as benchmarks.list_serialization, then reports the
+# median latency and response size per page for the full row (default and
+# FAST_LIST_RESPONSES paths) and for the sparse field set, and checks that the
+# sparse rows equal the matching fields of the full rows.
+import argparse
+import statistics
+import time
+from .list_serialization import seed # Sets up the throwaway database first
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services import serialization
+
+CASES = [
+    ("inventory", "/api/v1/inventory/", "id,kit_id,name,category,model,serial_number,state,district,status"),
+    ("content", "/api/v1/content/", "id,title,category,duration_minutes,quality_checked,has_safety_checklist,has_troubleshooting,approval_status,ndu_reference_id"),
+]
+
+def measure(client, path: str, params: dict, headers: dict, repeat: int) -> tuple[float, int, list]:
+    client.get(path, params=params, headers=headers).raise_for_status() # warm up
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(path, params=params, headers=headers)
+        timings.append(time.perf_counter() - started)
+        response.raise_for_status()
+    return statistics.median(timings) * 1000, len(response.content), response.json()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    with TestClient(app) as client:
+        token = client.post("/api/v1/auth/token", data={"username": "bench", "password": "bench-pass"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        print(f"{'endpoint':10s} {'variant':12s} {'median':>10s} {'size':>10s}")
+        for label, path, fields in CASES:
+            params = {"limit": args.page}
+            for variant, fast in (("full", False), ("full (fast)", True)):
+                serialization.FAST_LIST_RESPONSES = fast
+                elapsed, size, full = measure(client, path, params, headers, args.repeat)
+                print(f"{label:10s} {variant:12s} {elapsed:8.2f}ms {size / 1024:8.1f}KB")
+            serialization.FAST_LIST_RESPONSES = False
+            elapsed, size, sparse = measure(client, path, {**params, "fields": fields}, headers, args.repeat)
+            print(f"{label:10s} {'fields':12s} {elapsed:8.2f}ms {size / 1024:8.1f}KB")
+            names = fields.split(",")
+            assert sparse == [{name: row[name] for name in names} for row in full], f"{label}: sparse rows differ from the full rows"
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# Point-in-time stock queries as the ledger grows: snapshot + tail replay
+# (services/ledger.py) against a full replay of the ledger.
+#
+#   cd backend && python -m benchmarks.stock_positions [--kits 5000] [--rounds 4] [--rows-per-round 250000]
+#
+# Each round appends movements to the ledger (taking a snapshot every
+# --snapshot-every rows, as the background snapshotter would), then asks "what
+# was at this institution" at a time inside the newest and the oldest round.
+# The snapshot path should stay flat while the full replay grows with the
+# ledger. Set DATABASE_URL to run against Postgres instead of SQLite.
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+from ._server import prepare_database
+
+prepare_database()
+
+from sqlalchemy import func, insert, text  # noqa: E402
+from app import models  # noqa: E402
+from app.database import SessionLocal, engine  # noqa: E402
+from app.migrations import run_migrations  # noqa: E402
+from app.services import ledger  # noqa: E402
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+INSTITUTIONS = [(f"State {s}", f"District {s}-{d}", f"Institute {s}-{d}-{i}") for s in range(10) for d in range(5) for i in range(4)]
+
+FULL_REPLAY = text(
+    "SELECT t.kit_id, t.status FROM inventory_transactions t JOIN "
+    "(SELECT kit_id, max(seq) AS seq FROM inventory_transactions WHERE timestamp <= :at GROUP BY kit_id) latest "
+    "ON t.seq = latest.seq WHERE t.institution = :institution AND t.action_type != 'REMOVE'"
+)
+
+def seed_kits(kits: int, rng: random.Random):
+    rows, ledger_rows = [], []
+    for i in range(kits):
+        state, district, institution = rng.choice(INSTITUTIONS)
+        row = {"kit_id": f"KIT-{i:07d}", "name": f"Kit {i}", "category": "Bench", "status": "AVAILABLE",
+               "state": state, "district": district, "institution": institution, "quantity": 1}
+        rows.append(row)
+        ledger_rows.append({"kit_id": row["kit_id"], "action_type": ledger.INITIAL_ALLOCATION, "from_location": "VENDOR",
+                            "to_location": f"{state}/{district}/{institution}", "timestamp": START,
+                            "status": "AVAILABLE", "state": state, "district": district, "institution": institution})
+    db = SessionLocal()
+    try:
+        db.execute(insert(models.InventoryItem), rows)
+        db.execute(insert(models.InventoryTransaction), ledger.stamp(db, ledger_rows))
+        db.commit()
+    finally:
+        db.close()
+
+def append_movements(count: int, kits: int, clock: datetime, rng: random.Random, snapshot_every: int) -> datetime:
+    # Direct inserts; the positions only need to be self-consistent per kit
+    db = SessionLocal()
+    try:
+        return _append_movements(db, count, kits, clock, rng, snapshot_every)
+    finally:
+        db.close()
+
+def _append_movements(db, count: int, kits: int, clock: datetime, rng: random.Random, snapshot_every: int) -> datetime:
+    pending = 0
+    for offset in range(0, count, 5000):
+        rows = []
+        for _ in range(min(5000, count - offset)):
+            clock += timedelta(seconds=1)
+            state, district, institution = rng.choice(INSTITUTIONS)
+            rows.append({"kit_id": f"KIT-{rng.randrange(kits):07d}", "action_type": ledger.TRANSFER, "timestamp": clock,
+                         "to_location": f"{state}/{district}/{institution}",
+                         "status": "AVAILABLE", "state": state, "district": district, "institution": institution})
+        db.execute(insert(models.InventoryTransaction), ledger.stamp(db, rows))
+        db.commit()
+        pending += len(rows)
+        if pending >= snapshot_every:
+            ledger.take_snapshot(db)
+            db.commit()
+            pending = 0
+    return clock
+
+def median_ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--kits", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=4)
+    parser.add_argument("--rows-per-round", type=int, default=250000)
+    parser.add_argument("--snapshot-every", type=int, default=ledger.STOCK_SNAPSHOT_ROWS)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    run_migrations(engine)
+    with engine.connect() as conn:
+        if conn.execute(func.count(models.InventoryTransaction.id).select()).scalar():
+            raise SystemExit("Database already has ledger rows; point DATABASE_URL at an empty database")
+    rng = random.Random(7)
+    seed_kits(args.kits, rng)
+    state, district, institution = INSTITUTIONS[0]
+
+    clock, first_round_at = START, None
+    print(f"{'ledger rows':>12s} {'at':>8s} {'snapshot+tail':>14s} {'replayed':>9s} {'full replay':>12s}")
+    for round_ in range(args.rounds):
+        round_start = clock
+        clock = append_movements(args.rows_per_round, args.kits, clock, rng, args.snapshot_every)
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+            rows = conn.execute(func.count(models.InventoryTransaction.id).select()).scalar()
+        at = round_start + (clock - round_start) * 0.37
+        first_round_at = first_round_at or at
+
+        for label, when in (("newest", at), ("oldest", first_round_at)):
+            db = SessionLocal()
+            try:
+                result = ledger.positions_at(db, when, state=state, district=district, institution=institution)
+                snapshot_ms = median_ms(lambda: ledger.positions_at(db, when, state=state, district=district, institution=institution), args.repeat)
+                expected = {row.kit_id for row in db.execute(FULL_REPLAY, {"at": when, "institution": institution})}
+                full_ms = median_ms(lambda: db.execute(FULL_REPLAY, {"at": when, "institution": institution}).all(), args.repeat)
+            finally:
+                db.close()
+            assert {item["kit_id"] for item in result["items"]} == expected, "snapshot replay disagrees with full replay"
+            print(f"{rows:12d} {label:>8s} {snapshot_ms:12.2f}ms {result['replayed']:9d} {full_ms:10.2f}ms")
+
+if __name__ == "__main__":
+    main()
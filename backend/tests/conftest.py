@@ -0,0 +1,72 @@
+import os
+import tempfile
+
+# DATABASE_URL is read when app.database is imported: point it at a throwaway
+# SQLite file first. Bootstrap runs at import so the schema and admin exist.
+_TMP = tempfile.mkdtemp(prefix="samarth-test-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'test.db')}"
+os.environ["STARTUP_BOOTSTRAP"] = "sync"
+
+import itertools  # noqa: E402
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from app import models  # noqa: E402
+from app.main import app  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+
+_ids = itertools.count(1)
+
+@pytest.fixture(scope="session")
+def client():
+    # No lifespan: the background workers (reconcilers, outbox) stay off
+    return TestClient(app)
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    token = client.post("/api/v1/auth/token", data={"username": "admin", "password": "admin123"}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def unique():
+    # Unique suffix for kit ids, titles, ... (tests share one database)
+    return lambda prefix: f"{prefix}-{next(_ids)}"
+
+@pytest.fixture
+def create_kit(client, admin_headers, unique):
+    def create(**fields):
+        payload = {"kit_id": unique("KIT"), "name": "Test kit", "category": "Robotics", "status": "AVAILABLE", "state": "Kerala", "quantity": 1, **fields}
+        response = client.post("/api/v1/inventory/", json=payload, headers=admin_headers)
+        assert response.status_code == 200, response.text
+        return response.json()
+    return create
+
+@pytest.fixture
+def legacy_kit(db, unique):
+    # Rows written before the schema validators existed hold "" instead of NULL
+    # (serial_number and qr_code are unique, so they stay NULL here)
+    kit_id = unique("LEGACY")
+    db.execute(insert(models.InventoryItem), [{
+        "kit_id": kit_id, "name": "Legacy kit", "category": "Robotics", "status": "AVAILABLE", "quantity": 1,
+        "model": "", "district": "", "institution": "", "description": "",
+    }])
+    db.commit()
+    return kit_id
+
+@pytest.fixture
+def create_batch(client, admin_headers, unique):
+    # A batch under a new training program with `participants` enrolled; returns (batch id, participant ids)
+    def create(participants: int = 3):
+        training = client.post("/api/v1/training/", json={"title": unique("Training"), "instructor": "Instructor", "date": "2026-01-05", "status": "PLANNED"}, headers=admin_headers).json()
+        batch = client.post("/api/v1/training/batches/", json={"training_id": training["id"], "name": unique("Batch"), "start_date": "2026-01-05T00:00:00", "end_date": "2026-03-05T00:00:00", "location": "Kerala"}, headers=admin_headers).json()
+        enrolled = client.post(f"/api/v1/training/batches/{batch['id']}/participants", json=[{"name": unique("Participant")} for _ in range(participants)], headers=admin_headers).json()
+        return batch["id"], [participant["id"] for participant in enrolled]
+    return create
@@ -0,0 +1,75 @@
+import threading
+from collections import Counter
+from datetime import date
+from app import models
+from app.database import SessionLocal
+from app.services import attendance, stats
+
+def _mark(client, headers, batch_id, day: str, marks: dict):
+    records = [{"participant_id": participant_id, "status": status} for participant_id, status in marks.items()]
+    return client.put(f"/api/v1/training/batches/{batch_id}/attendance", json={"date": day, "records": records}, headers=headers)
+
+def _recount(db, batch_id) -> dict:
+    # The summary computed straight from the attendance rows
+    rows = db.query(models.Attendance).filter(models.Attendance.batch_id == batch_id).all()
+    present, total = Counter(), Counter()
+    for row in rows:
+        total[row.participant_id] += 1
+        present[row.participant_id] += row.status == attendance.PRESENT
+    return {
+        "sessions": len({row.date for row in rows}),
+        "present": sum(present.values()),
+        "total": len(rows),
+        "participants": {participant_id: (present[participant_id], total[participant_id]) for participant_id in total},
+    }
+
+def test_aggregates_match_a_recount_after_remarks(client, admin_headers, db, create_batch):
+    batch_id, (first, second, third) = create_batch()
+    result = _mark(client, admin_headers, batch_id, "2026-01-06", {first: "PRESENT", second: "PRESENT", third: "ABSENT"}).json()
+    assert (result["created"], result["updated"]) == (3, 0)
+    # Same day again: one change, one unchanged, no new session
+    result = _mark(client, admin_headers, batch_id, "2026-01-06", {first: "ABSENT", second: "PRESENT"}).json()
+    assert (result["created"], result["updated"]) == (0, 2)
+    _mark(client, admin_headers, batch_id, "2026-01-07", {first: "PRESENT", third: "PRESENT"})
+    rejected = _mark(client, admin_headers, batch_id, "2026-01-07", {first: "ABSENT", 10**9: "PRESENT"})
+    assert rejected.status_code == 400 and str(10**9) in rejected.json()["detail"]
+
+    summary = client.get(f"/api/v1/training/batches/{batch_id}/attendance/summary", headers=admin_headers).json()
+    expected = _recount(db, batch_id)
+    assert (summary["sessions"], summary["present"], summary["total"]) == (expected["sessions"], expected["present"], expected["total"]) == (2, 3, 5)
+    assert {row["participant_id"]: (row["present"], row["total"]) for row in summary["participants"]} == expected["participants"]
+    assert summary["attendance_pct"] == 60.0
+    # Nothing for the reconciler to correct
+    assert attendance.reconcile(db) == 0
+
+def test_concurrent_marks_of_one_batch_count_once(monkeypatch, db, create_batch):
+    batch_id, participants = create_batch()
+    marks = {participant_id: attendance.PRESENT for participant_id in participants}
+    # Both marks read the existing rows before either writes, unless the batch lock queues them
+    barrier = threading.Barrier(2)
+    upsert_statement = stats.upsert_statement
+    def after_read(*args):
+        try:
+            barrier.wait(timeout=1)
+        except threading.BrokenBarrierError:
+            pass
+        return upsert_statement(*args)
+    monkeypatch.setattr(stats, "upsert_statement", after_read)
+
+    def mark():
+        session = SessionLocal()
+        try:
+            attendance.mark_batch(session, batch_id, date(2026, 1, 6), marks)
+            session.commit()
+        finally:
+            session.close()
+    threads = [threading.Thread(target=mark) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    summary = attendance.batch_summary(db, batch_id)
+    assert (summary["sessions"], summary["present"], summary["total"]) == (1, len(participants), len(participants))
+    assert all(row["total"] == 1 for row in summary["participants"])
+    assert db.query(models.Attendance).filter(models.Attendance.batch_id == batch_id).count() == len(participants)
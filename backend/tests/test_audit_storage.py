@@ -0,0 +1,32 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert
+from app import models
+from app.database import engine
+from app.services import audit_storage
+
+def test_archive_dir_defaults_next_to_the_database():
+    assert audit_storage.AUDIT_ARCHIVE_DIR == os.path.join(os.path.dirname(engine.url.database), "audit_archive")
+
+def test_maintenance_endpoint_archives_expired_months(client, admin_headers, db, unique):
+    action = unique("OLD_EVENT")
+    old = datetime.now(timezone.utc) - timedelta(days=31 * (audit_storage.AUDIT_RETENTION_MONTHS + 2))
+    db.execute(insert(models.AuditLog).values(action=action, details="", timestamp=old))
+    db.commit()
+
+    response = client.post("/api/v1/audit/maintenance", headers=admin_headers)
+    assert response.status_code == 200, response.text
+    assert f"{old:%Y-%m}" in response.json()["archived"]
+    archive = db.query(models.AuditArchive).filter(models.AuditArchive.period_start <= old, models.AuditArchive.period_end > old).order_by(models.AuditArchive.id.desc()).first()
+    assert os.path.dirname(archive.path) == audit_storage.AUDIT_ARCHIVE_DIR
+    assert any(record["action"] == action for record in audit_storage.search_archive([archive.path], old, old + timedelta(seconds=1)))
+
+def test_json_and_ndjson_pages_share_the_timestamp_format(client, admin_headers, db, unique):
+    action = unique("FORMAT_EVENT")
+    db.execute(insert(models.AuditLog).values(action=action, details="", timestamp=datetime(2026, 1, 2, 3, 4, 5, 678000, tzinfo=timezone.utc)))
+    db.commit()
+    params = {"action": action}
+    page = client.get("/api/v1/audit/", params=params, headers=admin_headers).json()
+    lines = client.get("/api/v1/audit/", params={**params, "format": "ndjson"}, headers=admin_headers).text.splitlines()
+    assert page[0]["timestamp"] == json.loads(lines[0])["timestamp"] == "2026-01-02T03:04:05.678000Z"
@@ -0,0 +1,40 @@
+import pytest
+from app import models
+from app.database import SessionLocal
+from app.services.audit_writer import ASYNC, MODES, REQUEST, AuditWriter
+
+def audit_count(action: str) -> int:
+    db = SessionLocal()
+    try:
+        return db.query(models.AuditLog).filter(models.AuditLog.action == action).count()
+    finally:
+        db.close()
+
+@pytest.mark.parametrize("mode", MODES)
+def test_rolled_back_unit_of_work_leaves_no_audit_row(mode, unique):
+    writer = AuditWriter(SessionLocal, mode=mode)
+    action = unique(f"ROLLBACK_{mode}")
+    db = SessionLocal()
+    try:
+        writer.submit(db, None, action, "never committed")
+        db.rollback()
+    finally:
+        db.close()
+    assert writer.queue_depth == 0
+    writer.flush()
+    assert audit_count(action) == 0
+
+@pytest.mark.parametrize("mode", MODES)
+def test_committed_unit_of_work_writes_its_audit_row(mode, unique):
+    writer = AuditWriter(SessionLocal, mode=mode)
+    action = unique(f"COMMIT_{mode}")
+    db = SessionLocal()
+    try:
+        writer.submit(db, None, action, "committed")
+        if mode in (REQUEST, ASYNC):
+            assert writer.queue_depth == 0 # Nothing is queued before the commit
+        db.commit()
+    finally:
+        db.close()
+    writer.flush()
+    assert audit_count(action) == 1
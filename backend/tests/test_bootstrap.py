@@ -0,0 +1,85 @@
+import threading
+import time
+from app import bootstrap, main
+
+def test_failed_background_bootstrap_is_retried_until_it_succeeds(monkeypatch):
+    failures = iter([RuntimeError("database is not reachable"), RuntimeError("database is not reachable")])
+    def flaky():
+        error = next(failures, None)
+        if error:
+            raise error
+        return []
+    monkeypatch.setattr(bootstrap, "bootstrap", flaky)
+    state = bootstrap.BootstrapState(retry_delay=0.01, retry_max=0.02)
+    workers_started = threading.Event()
+
+    state.start(then=workers_started.set)
+    assert state.ready.wait(5)
+    assert workers_started.wait(5)
+    assert state.attempts == 3 and state.error is None
+    state.stop()
+
+def test_stopping_ends_the_retries(monkeypatch):
+    def failing():
+        raise RuntimeError("database is not reachable")
+    monkeypatch.setattr(bootstrap, "bootstrap", failing)
+    state = bootstrap.BootstrapState(retry_delay=0.01, retry_max=0.01)
+    state.start()
+    state.stop()
+    attempts = state.attempts
+    time.sleep(0.05)
+    assert state.attempts == attempts
+    assert not state.ready.is_set() and state.error == "database is not reachable"
+
+def _wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+def _use_state(monkeypatch, mode: str) -> bootstrap.BootstrapState:
+    # main reads the mode and the state as module globals on every request
+    state = bootstrap.BootstrapState(retry_delay=0.01, retry_max=0.01)
+    monkeypatch.setattr(main, "bootstrap_state", state)
+    monkeypatch.setattr(main, "STARTUP_BOOTSTRAP", mode)
+    monkeypatch.setattr(bootstrap, "STARTUP_BOOTSTRAP", mode)
+    return state
+
+def test_readiness_follows_a_background_bootstrap(monkeypatch, client, admin_headers):
+    release = threading.Event()
+    calls = []
+    def slow_then_flaky():
+        calls.append(None)
+        if len(calls) == 1:
+            raise RuntimeError("database is not reachable")
+        release.wait(5)
+        return []
+    monkeypatch.setattr(bootstrap, "bootstrap", slow_then_flaky)
+    state = _use_state(monkeypatch, bootstrap.BACKGROUND)
+
+    # Starting: the API is held back, liveness is not
+    starting = client.get("/api/v1/inventory/", headers=admin_headers)
+    assert starting.status_code == 503 and starting.headers["Retry-After"] == "1"
+    assert client.get("/healthz").status_code == 200
+    ready = client.get("/readyz")
+    assert ready.status_code == 503 and ready.json()["checks"] == {"database": True, "bootstrap": False}
+
+    # Failed once, retrying: the failure is reported until an attempt succeeds
+    state.start()
+    _wait_for(lambda: state.attempts == 2)
+    failing = client.get("/readyz").json()
+    assert failing["error"] == "database is not reachable" and failing["attempts"] == 2
+    assert client.get("/api/v1/inventory/", headers=admin_headers).status_code == 503
+
+    release.set()
+    assert state.ready.wait(5)
+    ready = client.get("/readyz")
+    assert ready.status_code == 200 and "error" not in ready.json() and ready.json()["bootstrap_ms"] is not None
+    assert client.get("/api/v1/inventory/", headers=admin_headers).status_code == 200
+    state.stop()
+
+def test_off_mode_is_ready_once_migrations_are_applied(monkeypatch, client):
+    # The test database is fully migrated; the web process ran no bootstrap itself
+    state = _use_state(monkeypatch, bootstrap.OFF)
+    ready = client.get("/readyz")
+    assert ready.status_code == 200 and ready.json()["mode"] == bootstrap.OFF and state.attempts == 0
@@ -0,0 +1,19 @@
+import threading
+from app.database import PoolStats
+
+def test_pool_stats_counters_are_not_lost_under_concurrency():
+    stats = PoolStats()
+
+    def work():
+        for _ in range(5000):
+            stats.record("connects")
+            stats.record("timeouts")
+            stats.record_wait(0.0)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    metrics = stats.metrics(pool=None)
+    assert metrics["connects"] == metrics["timeouts"] == metrics["checkouts"] == 40000
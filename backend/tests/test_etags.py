@@ -0,0 +1,64 @@
+import pytest
+from app import models
+
+def _get(client, headers, path, etag=None, **params):
+    if etag:
+        headers = {**headers, "If-None-Match": etag}
+    return client.get(path, params=params, headers=headers)
+
+def _assert_fresh(client, headers, path, etag, **params):
+    # Still current: 304 with the same validator and no body
+    response = _get(client, headers, path, etag, **params)
+    assert response.status_code == 304 and response.headers["ETag"] == etag and response.content == b""
+
+def _assert_stale(client, headers, path, etag, **params) -> str:
+    response = _get(client, headers, path, etag, **params)
+    assert response.status_code == 200 and response.headers["ETag"] != etag
+    return response.headers["ETag"]
+
+def test_inventory_etag_changes_with_every_write(client, admin_headers, create_kit):
+    path = "/api/v1/inventory/"
+    etag = _get(client, admin_headers, path).headers["ETag"]
+    _assert_fresh(client, admin_headers, path, etag)
+    assert _get(client, admin_headers, path, f"W/{etag}").status_code == 304
+    assert _get(client, admin_headers, path, '"other", ' + etag).status_code == 304
+    # The query string is part of the validator
+    assert _get(client, admin_headers, path, etag, limit=5).status_code == 200
+
+    kit = create_kit()
+    etag = _assert_stale(client, admin_headers, path, etag)
+    client.post("/api/v1/inventory/movements", json={"kit_ids": [kit["kit_id"]], "action_type": "TRANSFER", "state": "Goa"}, headers=admin_headers)
+    etag = _assert_stale(client, admin_headers, path, etag)
+    client.delete(f"/api/v1/inventory/{kit['id']}", headers=admin_headers)
+    etag = _assert_stale(client, admin_headers, path, etag)
+    _assert_fresh(client, admin_headers, path, etag)
+
+def test_failed_write_keeps_the_etag(client, admin_headers, create_kit):
+    kit = create_kit()
+    path = "/api/v1/inventory/"
+    etag = _get(client, admin_headers, path).headers["ETag"]
+    assert client.post("/api/v1/inventory/", json={"kit_id": kit["kit_id"], "name": "Again", "category": "Robotics", "status": "AVAILABLE", "quantity": 1}, headers=admin_headers).status_code == 409
+    _assert_fresh(client, admin_headers, path, etag)
+
+@pytest.mark.parametrize("expand, changes", [("none", False), ("batches", True), ("participants", True)])
+def test_training_etag_follows_the_tables_it_reads(client, admin_headers, db, create_batch, expand, changes):
+    batch_id, _ = create_batch(participants=1)
+    training_id = db.get(models.Batch, batch_id).training_id
+    path = "/api/v1/training/"
+    etag = _get(client, admin_headers, path, expand=expand).headers["ETag"]
+    client.post("/api/v1/training/batches/", json={"training_id": training_id, "name": "Extra", "start_date": "2026-01-05T00:00:00", "end_date": "2026-03-05T00:00:00", "location": "Kerala"}, headers=admin_headers)
+    if changes:
+        _assert_stale(client, admin_headers, path, etag, expand=expand)
+    else:
+        # A new batch leaves the shallow listing as it was
+        _assert_fresh(client, admin_headers, path, etag, expand=expand)
+
+def test_users_etag_changes_on_update(client, admin_headers, unique):
+    path = "/api/v1/auth/users/"
+    user = client.post(path, json={"username": unique("user"), "password": "secret", "role": "ADMIN"}, headers=admin_headers).json()
+    etag = _get(client, admin_headers, path).headers["ETag"]
+    assert client.patch(f"/api/v1/auth/users/{user['id']}", json={"full_name": "Renamed"}, headers=admin_headers).status_code == 200
+    etag = _assert_stale(client, admin_headers, path, etag)
+    # A no-op update changes nothing
+    client.patch(f"/api/v1/auth/users/{user['id']}", json={"full_name": "Renamed"}, headers=admin_headers)
+    _assert_fresh(client, admin_headers, path, etag)
@@ -0,0 +1,43 @@
+import csv
+import io
+import re
+from openpyxl import load_workbook
+from app.services import export
+
+def _export(client, headers, **params):
+    response = client.get("/api/v1/inventory/export", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return response
+
+def test_csv_export_applies_the_list_filters(client, admin_headers, create_kit, unique):
+    district = unique("District")
+    kits = [create_kit(district=district, name="Kit, with comma")["kit_id"] for _ in range(3)]
+    create_kit(district=district, status="CONSUMED")
+    response = _export(client, admin_headers, format="csv", district=district, status="AVAILABLE")
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="inventory_report_' in response.headers["content-disposition"]
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == [label for label, _ in export.EXPORT_COLUMNS]
+    assert [row[0] for row in rows[1:]] == kits and rows[1][1] == "Kit, with comma"
+
+def test_csv_stream_flushes_every_fetch_size_rows(monkeypatch):
+    monkeypatch.setattr(export, "FETCH_SIZE", 2)
+    rows = [(f"KIT-{n}",) + (None,) * (len(export.EXPORT_COLUMNS) - 1) for n in range(5)]
+    chunks = list(export.stream_csv(iter(rows)))
+    # Header + rows 1-2, rows 3-4, row 5
+    assert len(chunks) == 3
+    assert len(list(csv.reader(io.StringIO(b"".join(chunks).decode())))) == 6
+
+def test_xlsx_and_pdf_exports(client, admin_headers, create_kit, unique):
+    district = unique("District")
+    kit_id = create_kit(district=district, name="Kit (boxed)")["kit_id"]
+    sheet = load_workbook(io.BytesIO(_export(client, admin_headers, format="xlsx", district=district).content)).active
+    assert [cell.value for cell in sheet[2]][:2] == [kit_id, "Kit (boxed)"]
+
+    pdf = _export(client, admin_headers, format="pdf", district=district).content
+    assert pdf.startswith(b"%PDF-1.4") and pdf.rstrip().endswith(b"%%EOF")
+    assert f"({kit_id})".encode() in pdf and b"(Kit \\(boxed\\))" in pdf
+    # The xref offsets point at their objects
+    offsets = re.search(rb"xref\n0 \d+\n0000000000 65535 f \n((?:\d{10} 00000 n \n)+)", pdf).group(1).split(b"\n")
+    for obj_id, line in enumerate(filter(None, offsets), start=1):
+        assert pdf[int(line[:10]):].startswith(f"{obj_id} 0 obj".encode())
@@ -0,0 +1,60 @@
+from app import models
+from app.services.importer import import_inventory
+
+def test_duplicate_kit_is_a_conflict(client, admin_headers, create_kit, db):
+    kit = create_kit(serial_number="SN-DUP-1")
+    before = db.query(models.InventoryTransaction).count()
+    duplicate = client.post("/api/v1/inventory/", json={"kit_id": kit["kit_id"], "name": "Again", "category": "Robotics", "status": "AVAILABLE", "state": "Kerala", "quantity": 1}, headers=admin_headers)
+    assert duplicate.status_code == 409 and duplicate.json()["detail"] == f"Duplicate kit_id: {kit['kit_id']}"
+    serial = client.post("/api/v1/inventory/", json={"kit_id": kit["kit_id"] + "-B", "serial_number": "SN-DUP-1", "name": "Again", "category": "Robotics", "status": "AVAILABLE", "state": "Kerala", "quantity": 1}, headers=admin_headers)
+    assert serial.status_code == 409 and serial.json()["detail"] == "Duplicate serial_number: SN-DUP-1"
+    # Nothing of the failed creates is kept
+    db.expire_all()
+    assert db.query(models.InventoryTransaction).count() == before
+    assert db.query(models.InventoryItem).filter(models.InventoryItem.kit_id == kit["kit_id"] + "-B").count() == 0
+
+def _import(client, headers, content: str, filename: str = "delivery.csv"):
+    return client.post("/api/v1/inventory/import", files={"file": (filename, content.encode(), "text/csv")}, headers=headers)
+
+def test_import_reports_bad_rows_and_keeps_the_good_ones(client, admin_headers, create_kit, unique, db):
+    existing = create_kit()["kit_id"]
+    ok, repeated, serial = unique("IMP"), unique("IMP"), unique("SN")
+    content = "\n".join([
+        "Kit ID,Name,Category,Status,Quantity,Serial Number",
+        f"{ok},Kit,Robotics,AVAILABLE,2,{serial}",
+        f"{repeated},Kit,Robotics,AVAILABLE,1,",
+        ",,,,,", # Blank lines are skipped, not reported
+        f"{unique('IMP')},Kit,Robotics,AVAILABLE,many,",
+        f"{existing},Kit,Robotics,AVAILABLE,1,",
+        f"{repeated},Kit,Robotics,AVAILABLE,1,",
+        f"{unique('IMP')},Kit,Robotics,AVAILABLE,1,{serial}",
+    ])
+    response = _import(client, admin_headers, content)
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert (report["total"], report["created"], report["failed"]) == (6, 2, 4)
+    errors = {error["row"]: error["error"] for error in report["errors"]}
+    assert list(errors) == [5, 6, 7, 8]
+    assert errors[5].startswith("quantity:")
+    assert errors[6] == f"Duplicate kit_id: {existing}"
+    assert errors[7] == f"Duplicate kit_id: {repeated}"
+    assert errors[8] == f"Duplicate serial_number: {serial}"
+
+    imported = db.query(models.InventoryItem).filter(models.InventoryItem.kit_id.in_([ok, repeated])).all()
+    assert {item.kit_id: item.quantity for item in imported} == {ok: 2, repeated: 1}
+    rows = db.query(models.InventoryTransaction).filter(models.InventoryTransaction.kit_id.in_([ok, repeated])).all()
+    assert sorted(row.action_type for row in rows) == ["INITIAL_ALLOCATION"] * 2
+
+def test_import_chunks_see_each_others_keys(db):
+    user_id = db.query(models.User.id).filter(models.User.username == "admin").scalar()
+    kit_id = "IMP-CHUNKED"
+    rows = iter([(2, {"kit_id": kit_id, "name": "Kit", "category": "Robotics", "status": "AVAILABLE"}),
+                 (3, {"kit_id": kit_id, "name": "Kit", "category": "Robotics", "status": "AVAILABLE"})])
+    report = import_inventory(db, rows, user_id=user_id, filename="chunks.csv", chunk_size=1)
+    db.rollback()
+    assert (report["created"], report["failed"]) == (1, 1)
+
+def test_import_rejects_unreadable_files(client, admin_headers):
+    assert _import(client, admin_headers, "name,category\nKit,Robotics").json()["detail"] == "Missing required column: kit_id"
+    assert _import(client, admin_headers, "kit_id\nA", filename="delivery.txt").status_code == 400
+    assert _import(client, admin_headers, "").json()["detail"] == "File is empty"
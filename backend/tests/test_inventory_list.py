@@ -0,0 +1,41 @@
+def _list(client, headers, **params):
+    response = client.get("/api/v1/inventory/", params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return response
+
+def _kit_ids(response) -> list[str]:
+    return [row["kit_id"] for row in response.json()]
+
+def test_search_matches_substrings_and_short_terms(client, admin_headers, create_kit, unique):
+    model = unique("Quadcopter")
+    kit = create_kit(name="Drone trainer", model=model, serial_number=unique("SN"))
+    # Trigram (FTS) path, a LIKE-special character, and the short-term fallback
+    assert _kit_ids(_list(client, admin_headers, q=model[2:])) == [kit["kit_id"]]
+    assert kit["kit_id"] in _kit_ids(_list(client, admin_headers, q=kit["serial_number"], limit=1000))
+    assert _list(client, admin_headers, q="%_%").json() == []
+    assert kit["kit_id"] in _kit_ids(_list(client, admin_headers, q="Dr", limit=1000))
+
+def test_filters_combine(client, admin_headers, create_kit, unique):
+    district = unique("District")
+    wanted = create_kit(state="Goa", district=district, category="IoT")
+    create_kit(state="Goa", district=district, category="Robotics")
+    create_kit(state="Goa", district=district, category="IoT", status="CONSUMED")
+    rows = _list(client, admin_headers, state="Goa", district=district, category="IoT", status="AVAILABLE").json()
+    assert [row["kit_id"] for row in rows] == [wanted["kit_id"]]
+
+def test_cursor_pages_cover_every_row_once(client, admin_headers, create_kit, unique):
+    district = unique("District")
+    kit_ids = [create_kit(district=district)["kit_id"] for _ in range(5)]
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"district": district, "limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = _list(client, admin_headers, **params)
+        seen += _kit_ids(response)
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert seen == kit_ids and pages == 3
+    # A page that ends on the last row has no cursor; a bad cursor is a 400
+    assert "X-Next-Cursor" not in _list(client, admin_headers, district=district, limit=5).headers
+    assert client.get("/api/v1/inventory/", params={"cursor": "bogus"}, headers=admin_headers).status_code == 400
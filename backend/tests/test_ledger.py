@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import func, insert
+from app import models
+from app.services import ledger
+
+def _move(db, kit_id: str, state: str, **fields):
+    row = {"kit_id": kit_id, "action_type": ledger.TRANSFER, "status": ledger.AVAILABLE, "state": state, **fields}
+    db.execute(insert(models.InventoryTransaction), ledger.stamp(db, [row]))
+    db.commit()
+
+def _state_now(db, kit_id: str) -> str:
+    items = ledger.positions_at(db, datetime.now(timezone.utc) + timedelta(minutes=1))["items"]
+    return next(item["state"] for item in items if item["kit_id"] == kit_id)
+
+def test_snapshot_watermark_follows_commit_order(db, create_kit):
+    kit_id = create_kit()["kit_id"]
+    top = db.query(func.max(models.InventoryTransaction.id)).scalar()
+    # Ids come from INSERT: an earlier transaction holds id top + 1 but commits
+    # after this one and after the snapshot
+    _move(db, kit_id, "Goa", id=top + 100)
+    assert ledger.take_snapshot(db) is not None
+    db.commit()
+    _move(db, kit_id, "Punjab", id=top + 1)
+
+    assert _state_now(db, kit_id) == "Punjab"
+    snapshot = ledger.take_snapshot(db)
+    db.commit()
+    assert snapshot is not None and snapshot.transaction_id == top + 1
+    item = db.get(models.StockSnapshotItem, (snapshot.id, kit_id))
+    assert item.state == "Punjab"
+
+def test_take_snapshot_leaves_the_commit_to_the_caller(db, create_kit):
+    create_kit()
+    snapshot_id = ledger.take_snapshot(db).id
+    db.rollback()
+    assert db.get(models.StockSnapshot, snapshot_id) is None
+
+def _pages(fetch, limit: int) -> list[list[str]]:
+    # Follows the cursors to the end; `fetch(cursor)` returns (items, next cursor)
+    pages, cursor = [], None
+    while True:
+        items, cursor = fetch(cursor)
+        pages.append([item["kit_id"] for item in items])
+        assert len(items) <= limit
+        if cursor is None:
+            return pages
+
+def test_positions_page_by_kit_id(db, create_kit, unique):
+    state = unique("State")
+    kit_ids = sorted(create_kit(state=state)["kit_id"] for _ in range(5))
+    assert ledger.take_snapshot(db) is not None
+    db.commit()
+    # One kit moves away and one arrives after the snapshot, so pages mix snapshot and tail rows
+    user_id = db.query(models.User.id).filter(models.User.username == "admin").scalar()
+    moved_in = create_kit(state="Goa")["kit_id"]
+    ledger.move(db, [kit_ids[1]], ledger.TRANSFER, user_id, destination={"state": "Goa"})
+    ledger.move(db, [moved_in], ledger.TRANSFER, user_id, destination={"state": state})
+    db.commit()
+    expected = sorted(set(kit_ids) - {kit_ids[1]} | {moved_in})
+    at = datetime.now(timezone.utc) + timedelta(minutes=1)
+
+    def at_page(cursor):
+        result = ledger.positions_at(db, at, limit=2, cursor=cursor, state=state)
+        return result["items"], result["next_cursor"]
+    pages = _pages(at_page, 2)
+    assert sum(pages, []) == expected and [len(page) for page in pages] == [2, 2, 1]
+    assert sum(_pages(lambda cursor: ledger.current_positions(db, limit=5, cursor=cursor, state=state), 5), []) == expected
+    # A page that ends exactly on the last kit has no next cursor
+    assert ledger.current_positions(db, limit=len(expected), state=state)[1] is None
+
+def test_positions_endpoint_returns_the_next_cursor(client, admin_headers, create_kit, unique):
+    state = unique("State")
+    kit_ids = sorted(create_kit(state=state)["kit_id"] for _ in range(3))
+    first = client.get("/api/v1/inventory/positions", params={"state": state, "limit": 2}, headers=admin_headers)
+    assert [item["kit_id"] for item in first.json()["items"]] == kit_ids[:2]
+    rest = client.get("/api/v1/inventory/positions", params={"state": state, "limit": 2, "cursor": first.headers["X-Next-Cursor"]}, headers=admin_headers)
+    assert [item["kit_id"] for item in rest.json()["items"]] == kit_ids[2:] and "X-Next-Cursor" not in rest.headers
+    assert client.get("/api/v1/inventory/positions", params={"cursor": "not-a-cursor"}, headers=admin_headers).status_code == 400
+
+def test_stamp_timestamps_follow_seq(db):
+    rows = ledger.stamp(db, [{"kit_id": "A"}, {"kit_id": "B"}])
+    later = ledger.stamp(db, [{"kit_id": "C"}])
+    db.rollback()
+    assert rows[0]["seq"] < later[0]["seq"] and rows[0]["timestamp"] <= later[0]["timestamp"]
@@ -0,0 +1,44 @@
+import pytest
+from app import models
+from app.services import changes, serialization
+
+def list_inventory(client, headers, monkeypatch, fast: bool, **params):
+    monkeypatch.setattr(serialization, "FAST_LIST_RESPONSES", fast)
+    response = client.get("/api/v1/inventory/", params={"limit": 1000, **params}, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_fast_path_matches_default_path_on_empty_strings(client, admin_headers, monkeypatch, legacy_kit):
+    default = list_inventory(client, admin_headers, monkeypatch, fast=False)
+    fast = list_inventory(client, admin_headers, monkeypatch, fast=True)
+    assert fast == default
+    row = next(row for row in fast if row["kit_id"] == legacy_kit)
+    assert row["model"] is None and row["district"] is None and row["description"] is None
+
+@pytest.mark.parametrize("path", ["/api/v1/content/", "/api/v1/auth/users/", "/api/v1/training/"])
+def test_fast_path_matches_default_path(client, admin_headers, monkeypatch, path):
+    bodies = []
+    for fast in (False, True):
+        monkeypatch.setattr(serialization, "FAST_LIST_RESPONSES", fast)
+        response = client.get(path, headers=admin_headers)
+        assert response.status_code == 200, response.text
+        bodies.append(response.json())
+    assert bodies[0] == bodies[1]
+
+def test_fieldset_matches_default_path_on_empty_strings(client, admin_headers, monkeypatch, legacy_kit):
+    fields = "kit_id,model,district,institution,description"
+    sparse = client.get("/api/v1/inventory/", params={"limit": 1000, "fields": fields}, headers=admin_headers).json()
+    default = list_inventory(client, admin_headers, monkeypatch, fast=False)
+    expected = {row["kit_id"]: {name: row[name] for name in fields.split(",")} for row in default}
+    row = next(row for row in sparse if row["kit_id"] == legacy_kit)
+    assert row == expected[legacy_kit]
+    assert row["model"] is None and row["description"] is None
+
+def test_change_feed_rows_match_default_path_on_empty_strings(client, admin_headers, monkeypatch, db, legacy_kit):
+    kit = db.query(models.InventoryItem).filter(models.InventoryItem.kit_id == legacy_kit).one()
+    since = changes.latest_seq(db)
+    changes.record(db, models.InventoryItem, [kit.id])
+    db.commit()
+    feed = client.get("/api/v1/changes/", params={"since": since}, headers=admin_headers).json()
+    default = next(row for row in list_inventory(client, admin_headers, monkeypatch, fast=False) if row["kit_id"] == legacy_kit)
+    assert feed["changes"]["inventory"]["upserted"] == [default]
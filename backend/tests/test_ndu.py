@@ -0,0 +1,42 @@
+from app import models
+from app.services import ndu, stats
+
+def _pending(db):
+    return stats.read_counters(db)[stats.CONTENT_PENDING_SYNC]
+
+def test_bulk_sync_counts_only_items_it_set(db, client, admin_headers, unique):
+    ids = [client.post("/api/v1/content/", json={"title": unique("Content"), "category": "Robotics", "duration_minutes": 5, "tags": ""}, headers=admin_headers).json()["id"] for _ in range(3)]
+    items = [(entity_id, ndu.item_key(ndu.SYNC_CONTENT, entity_id), {}) for entity_id in ids]
+    results = {key: {"id": f"NDU-{entity_id}"} for entity_id, key, _ in items}
+    # Synced through the outbox while the bulk request was in flight
+    db.get(models.ContentItem, ids[0]).ndu_reference_id = "NDU-OUTBOX"
+    stats.content_synced(db)
+    db.commit()
+    before = _pending(db)
+
+    report = ndu._record_bulk(db, ndu.SYNC_CONTENT, items, results, user_id=None)
+    db.commit()
+    assert report["synced"] == 3
+    assert _pending(db) == before - 2
+    assert db.get(models.ContentItem, ids[0]).ndu_reference_id == "NDU-OUTBOX"
+    assert db.get(models.ContentItem, ids[1]).ndu_reference_id == f"NDU-{ids[1]}"
+
+def test_outbox_and_bulk_share_the_first_sync_key(db, client, admin_headers, unique):
+    content_id = client.post("/api/v1/content/", json={"title": unique("Content"), "category": "Robotics", "duration_minutes": 5, "tags": ""}, headers=admin_headers).json()["id"]
+    entry = ndu.enqueue_sync(db, ndu.SYNC_CONTENT, content_id, {"title": "v1"})
+    assert entry.idempotency_key == ndu.item_key(ndu.SYNC_CONTENT, content_id)
+
+    # A dead letter is requeued under the same key rather than duplicated
+    entry.status = ndu.DEAD
+    db.commit()
+    again = ndu.enqueue_sync(db, ndu.SYNC_CONTENT, content_id, {"title": "v2"})
+    db.commit()
+    assert again.id == entry.id and again.status == ndu.PENDING and '"v2"' in again.payload
+
+    # Once NDU knows the item, a re-sync is a new request with its own key
+    ndu._apply_content(db, content_id, "NDU-X")
+    again.status = ndu.DONE
+    db.commit()
+    resync = ndu.enqueue_sync(db, ndu.SYNC_CONTENT, content_id, {"title": "v3"})
+    assert resync.id != entry.id and resync.idempotency_key != entry.idempotency_key
+    db.rollback()
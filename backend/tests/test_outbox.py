@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from app import models
+from app.database import SessionLocal
+from app.services import ndu
+from app.services.ndu_gateway import NDUError
+
+class FailingGateway(ndu.MockNDUGateway):
+    # Fails the first `failures` sends, then behaves like the mock
+    def __init__(self, failures: int, retryable: bool = True):
+        self.failures, self.retryable, self.sent = failures, retryable, []
+
+    def send(self, operation, payload, idempotency_key):
+        self.sent.append(idempotency_key)
+        if len(self.sent) <= self.failures:
+            raise NDUError("NDU unavailable", retryable=self.retryable)
+        return super().send(operation, payload, idempotency_key)
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+@pytest.fixture
+def entry(db, client, admin_headers, unique):
+    # The only entry in the outbox, so claims see nothing else
+    content_id = client.post("/api/v1/content/", json={"title": unique("Content"), "category": "Robotics", "duration_minutes": 5, "tags": ""}, headers=admin_headers).json()["id"]
+    db.query(models.NduOutbox).delete()
+    entry = ndu.enqueue_sync(db, ndu.SYNC_CONTENT, content_id, {"title": "v1"})
+    db.commit()
+    return entry
+
+def _worker(gateway, **options) -> ndu.OutboxWorker:
+    return ndu.OutboxWorker(SessionLocal, gateway=gateway, **{"max_attempts": 3, "backoff_base": 2.0, "lease_seconds": 60.0, **options})
+
+def test_claim_leases_the_entry_until_it_expires(db, entry):
+    worker = _worker(ndu.MockNDUGateway())
+    first = worker.claim(10)
+    assert [claimed["id"] for claimed in first] == [entry.id] and first[0]["attempts"] == 1
+    assert worker.claim(10) == []
+
+    # The lease runs out (the worker died): another claim takes the entry over
+    db.query(models.NduOutbox).filter_by(id=entry.id).update({"locked_until": datetime.now(timezone.utc) - timedelta(seconds=1)})
+    db.commit()
+    second = worker.claim(10)
+    assert [claimed["attempts"] for claimed in second] == [2] and second[0]["token"] != first[0]["token"]
+
+    # The late first delivery is not recorded; the current holder's is
+    worker.deliver(first[0])
+    db.expire_all()
+    assert db.get(models.NduOutbox, entry.id).status == ndu.IN_PROGRESS
+    worker.deliver(second[0])
+    db.expire_all()
+    done = db.get(models.NduOutbox, entry.id)
+    assert done.status == ndu.DONE and done.locked_by is None
+    assert db.get(models.ContentItem, entry.entity_id).ndu_reference_id == done.ndu_id
+
+def test_retryable_failures_back_off_then_dead_letter(db, entry):
+    gateway = FailingGateway(failures=3)
+    worker = _worker(gateway)
+    for attempt in (1, 2):
+        before = datetime.now(timezone.utc)
+        [claimed] = worker.claim(10)
+        worker.deliver(claimed)
+        db.expire_all()
+        row = db.get(models.NduOutbox, entry.id)
+        ceiling = 2.0 * 2 ** (attempt - 1)
+        delay = (_as_utc(row.next_attempt_at) - before).total_seconds()
+        assert row.status == ndu.PENDING and row.last_error == "NDU unavailable"
+        assert ceiling / 2 <= delay <= ceiling + 1
+        # Not due until the backoff has passed
+        assert worker.claim(10) == []
+        db.query(models.NduOutbox).filter_by(id=entry.id).update({"next_attempt_at": datetime.now(timezone.utc)})
+        db.commit()
+
+    [claimed] = worker.claim(10)
+    worker.deliver(claimed)
+    db.expire_all()
+    row = db.get(models.NduOutbox, entry.id)
+    assert (row.status, row.attempts) == (ndu.DEAD, 3) and worker.dead_lettered == 1
+    # Every attempt sent the same idempotency key
+    assert gateway.sent == [entry.idempotency_key] * 3
+
+    # A manual retry starts a fresh attempt budget under the same key
+    ndu.requeue(db, row)
+    db.commit()
+    [claimed] = worker.claim(10)
+    worker.deliver(claimed)
+    db.expire_all()
+    assert db.get(models.NduOutbox, entry.id).status == ndu.DONE and gateway.sent[-1] == entry.idempotency_key
+
+def test_rejected_payload_is_dead_lettered_at_once(db, entry):
+    worker = _worker(FailingGateway(failures=1, retryable=False))
+    [claimed] = worker.claim(10)
+    worker.deliver(claimed)
+    db.expire_all()
+    row = db.get(models.NduOutbox, entry.id)
+    assert (row.status, row.attempts) == (ndu.DEAD, 1)
+    log = db.query(models.IntegrationLog).order_by(models.IntegrationLog.id.desc()).first()
+    assert log.status == "FAILURE" and log.error.startswith("Dead-lettered after 1 attempt(s)")
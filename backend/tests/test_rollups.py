@@ -0,0 +1,41 @@
+from collections import Counter
+from app import models
+from app.services import rollups
+
+def _recount(db, **path) -> dict:
+    # Totals of one node straight from the inventory table
+    Item = models.InventoryItem
+    rows = db.query(Item).filter(*(getattr(Item, column) == value for column, value in path.items())).all()
+    return {"total": len(rows), "by_status": dict(Counter(row.status for row in rows)), "by_category": dict(Counter(row.category for row in rows))}
+
+def _node(client, headers, **path) -> dict:
+    response = client.get("/api/v1/inventory/rollups", params=path, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_rollups_match_a_recount_after_writes(client, admin_headers, db, create_kit, unique):
+    # Earlier tests insert kits behind the write paths' back; start from a clean tree
+    rollups.reconcile(db)
+    state = unique("State")
+    north, south = unique("District"), unique("District")
+    kits = [create_kit(state=state, district=north, institution="School A", category="IoT") for _ in range(3)]
+    kits += [create_kit(state=state, district=south, category="Robotics") for _ in range(2)]
+    movement = {"kit_ids": [kits[0]["kit_id"]], "action_type": "TRANSFER", "state": state, "district": south, "institution": "School B"}
+    assert client.post("/api/v1/inventory/movements", json=movement, headers=admin_headers).status_code == 200
+    assert client.post("/api/v1/inventory/movements", json={"kit_ids": [kits[1]["kit_id"]], "action_type": "CONSUME"}, headers=admin_headers).status_code == 200
+    assert client.delete(f"/api/v1/inventory/{kits[3]['id']}", headers=admin_headers).status_code == 204
+    db.expire_all()
+
+    node = _node(client, admin_headers, state=state)
+    assert {key: node[key] for key in ("total", "by_status", "by_category")} == _recount(db, state=state)
+    children = {child["name"]: child["total"] for child in node["children"]}
+    assert children == {north: 2, south: 2}
+    for district in (north, south):
+        node = _node(client, admin_headers, state=state, district=district)
+        assert {key: node[key] for key in ("total", "by_status", "by_category")} == _recount(db, state=state, district=district)
+    # Kits without an institution are grouped under a None child
+    assert {child["name"]: child["total"] for child in node["children"]} == {None: 1, "School B": 1}
+    assert rollups.reconcile(db) == 0
+
+def test_drill_down_needs_every_parent_level(client, admin_headers):
+    assert client.get("/api/v1/inventory/rollups", params={"district": "Anywhere"}, headers=admin_headers).status_code == 400
@@ -0,0 +1,67 @@
+import logging
+import threading
+import time
+from app import models
+from app.database import SessionLocal
+from app.services import attendance, rollups, stats
+
+def test_reconcile_seeds_missing_counters_without_drift_warning(db, create_kit, caplog):
+    create_kit()
+    db.query(models.StatCounter).delete()
+    db.commit()
+    with caplog.at_level(logging.WARNING):
+        assert stats.reconcile(db) == {}
+    assert "drifted" not in caplog.text
+    assert stats.read_counters(db)[stats.INVENTORY_TOTAL] == db.query(models.InventoryItem).count()
+
+def test_reconcile_reports_and_fixes_wrong_counters(db, create_kit, caplog):
+    create_kit()
+    stats.reconcile(db)
+    actual = db.query(models.InventoryItem).count()
+    db.merge(models.StatCounter(name=stats.INVENTORY_TOTAL, value=actual + 7))
+    db.commit()
+    with caplog.at_level(logging.WARNING):
+        assert stats.reconcile(db) == {stats.INVENTORY_TOTAL: (actual + 7, actual)}
+    assert "drifted" in caplog.text
+    assert stats.read_counters(db)[stats.INVENTORY_TOTAL] == actual
+
+def test_rollups_and_attendance_seed_silently(db, create_kit, caplog):
+    create_kit()
+    db.query(models.LocationRollup).delete()
+    db.query(models.ParticipantAttendanceStat).delete()
+    db.query(models.BatchAttendanceStat).delete()
+    db.commit()
+    with caplog.at_level(logging.WARNING):
+        assert rollups.reconcile(db) == 0
+        assert attendance.reconcile(db) == 0
+    assert "drifted" not in caplog.text
+    assert db.query(models.LocationRollup).count() > 0
+
+def test_write_during_reconcile_is_not_overwritten(monkeypatch, create_kit):
+    # A kit created while reconcile sits between counting and writing must survive it
+    create_kit()
+    counted = threading.Event()
+    compute = stats.compute_counters
+
+    def slow_compute(db):
+        result = compute(db)
+        counted.set()
+        time.sleep(0.5)
+        return result
+
+    monkeypatch.setattr(stats, "compute_counters", slow_compute)
+    session = SessionLocal()
+    reconciler = threading.Thread(target=stats.reconcile, args=(session,))
+    reconciler.start()
+    try:
+        assert counted.wait(5)
+        create_kit() # Waits for the reconcile's lock, then increments on top
+    finally:
+        reconciler.join()
+        session.close()
+
+    check = SessionLocal()
+    try:
+        assert stats.read_counters(check)[stats.INVENTORY_TOTAL] == check.query(models.InventoryItem).count()
+    finally:
+        check.close()
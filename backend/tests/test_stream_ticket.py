@@ -0,0 +1,31 @@
+import pytest
+from fastapi import HTTPException
+from app import models
+from app.routers import auth
+
+def _ticket(client, headers) -> str:
+    response = client.post("/api/v1/dashboard/stream-ticket", headers=headers)
+    assert response.status_code == 200, response.text
+    assert response.json()["expires_in"] == auth.STREAM_TICKET_SECONDS
+    return response.json()["ticket"]
+
+def test_stream_ticket_opens_the_stream(client, admin_headers, db):
+    assert auth.get_stream_user(ticket=_ticket(client, admin_headers), db=db).username == "admin"
+
+def test_access_token_is_not_a_stream_ticket(client, admin_headers, db):
+    access_token = admin_headers["Authorization"].removeprefix("Bearer ")
+    with pytest.raises(HTTPException) as error:
+        auth.get_stream_user(ticket=access_token, db=db)
+    assert error.value.status_code == 401
+    assert client.get("/api/v1/dashboard/stream", params={"token": access_token}).status_code == 422
+
+def test_stream_ticket_is_not_an_access_token(client, admin_headers):
+    ticket = _ticket(client, admin_headers)
+    assert client.get("/api/v1/dashboard/stats", headers={"Authorization": f"Bearer {ticket}"}).status_code == 401
+
+def test_expired_stream_ticket_is_rejected(monkeypatch, db):
+    monkeypatch.setattr(auth, "STREAM_TICKET_SECONDS", -1)
+    ticket = auth.create_stream_ticket(db.query(models.User).filter_by(username="admin").one())
+    with pytest.raises(HTTPException) as error:
+        auth.get_stream_user(ticket=ticket, db=db)
+    assert error.value.status_code == 401
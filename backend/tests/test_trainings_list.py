@@ -0,0 +1,48 @@
+import pytest
+from sqlalchemy import event
+from app import crud, models, schemas
+from app.database import engine
+from app.routers.training import TRAINING_SCHEMAS
+from app.services import serialization
+
+@pytest.fixture
+def count_queries():
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+def _training(trainings, training_id):
+    return next(training for training in trainings if training["id"] == training_id)
+
+@pytest.mark.parametrize("fast", [False, True])
+def test_expand_modes_shape_the_response(client, admin_headers, monkeypatch, create_batch, db, fast):
+    monkeypatch.setattr(serialization, "FAST_LIST_RESPONSES", fast)
+    batch_id, participant_ids = create_batch(participants=2)
+    training_id = db.get(models.Batch, batch_id).training_id
+    shapes = {}
+    for expand in schemas.TrainingExpand:
+        response = client.get("/api/v1/training/", params={"expand": expand.value, "limit": 1000}, headers=admin_headers)
+        assert response.status_code == 200, response.text
+        shapes[expand] = _training(response.json(), training_id)
+    assert "batches" not in shapes[schemas.TrainingExpand.NONE]
+    assert [batch["id"] for batch in shapes[schemas.TrainingExpand.BATCHES]["batches"]] == [batch_id]
+    assert "participants" not in shapes[schemas.TrainingExpand.BATCHES]["batches"][0]
+    participants = shapes[schemas.TrainingExpand.PARTICIPANTS]["batches"][0]["participants"]
+    assert [participant["id"] for participant in participants] == participant_ids
+
+@pytest.mark.parametrize("expand, queries", [(schemas.TrainingExpand.NONE, 1), (schemas.TrainingExpand.BATCHES, 2), (schemas.TrainingExpand.PARTICIPANTS, 3)])
+def test_one_query_per_level(db, create_batch, count_queries, expand, queries):
+    # The ORM and row paths both stay at one SELECT per level, however many trainings there are
+    for _ in range(3):
+        create_batch(participants=2)
+    count_queries.clear()
+    # Serializing would trigger any lazy load the eager options missed
+    [TRAINING_SCHEMAS[expand].model_validate(training) for training in crud.get_trainings(db, limit=1000, expand=expand)]
+    assert len(count_queries) == queries, count_queries
+    count_queries.clear()
+    crud.get_training_rows(db, limit=1000, expand=expand)
+    assert len(count_queries) == queries, count_queries
@@ -0,0 +1,26 @@
+import pytest
+from fastapi.testclient import TestClient
+from app import crud, models
+from app.main import app
+from app.services.audit_writer import MODES, audit_writer
+
+@pytest.mark.parametrize("mode", MODES)
+def test_failed_movement_rolls_back_ledger_and_audit(mode, monkeypatch, db, admin_headers, create_kit):
+    kit = create_kit()
+    monkeypatch.setattr(audit_writer, "mode", mode)
+    log_audit = crud.log_audit
+
+    def log_then_fail(*args, **kwargs):
+        log_audit(*args, **kwargs)
+        raise RuntimeError("failure after the audit was written")
+
+    monkeypatch.setattr(crud, "log_audit", log_then_fail)
+    client = TestClient(app, raise_server_exceptions=False)
+    response = client.post("/api/v1/inventory/movements", json={"action_type": "TRANSFER", "kit_ids": [kit["kit_id"]], "state": "Delhi"}, headers=admin_headers)
+    assert response.status_code == 500
+    audit_writer.flush()
+
+    Tx, Log = models.InventoryTransaction, models.AuditLog
+    assert db.query(models.InventoryItem).filter_by(kit_id=kit["kit_id"]).one().state == "Kerala"
+    assert db.query(Tx).filter(Tx.kit_id == kit["kit_id"], Tx.action_type == "TRANSFER").count() == 0
+    assert db.query(Log).filter(Log.action == "TRANSFER_INVENTORY", Log.details.contains("Delhi")).count() == 0
@@ -0,0 +1,65 @@
+from datetime import datetime, time, timedelta, timezone
+from sqlalchemy import insert
+from app import models
+from app.services import ledger, utilization
+
+METRICS = ("kit_days", "allocated_kit_days", "active_kit_days", "idle_kit_days", "allocations", "returns")
+
+def _at(day, hour: int) -> datetime:
+    return datetime.combine(day, time(hour), tzinfo=timezone.utc)
+
+def _daily(db) -> list[tuple]:
+    Daily = models.UtilizationDaily
+    return [tuple(row) for row in db.query(Daily.day, Daily.category, Daily.batch_id, *(getattr(Daily, column) for column in utilization.METRIC_COLUMNS)).order_by(Daily.day, Daily.category, Daily.batch_id)]
+
+def test_refresh_matches_a_recount_of_the_ledger(db, create_batch, unique):
+    # Three days after today, so the rows follow every other ledger row in both seq and time
+    first = datetime.now(timezone.utc).date() + timedelta(days=1)
+    second, third = first + timedelta(days=1), first + timedelta(days=2)
+    batch_id, _ = create_batch(participants=0)
+    batch = db.get(models.Batch, batch_id)
+    batch.start_date, batch.end_date = datetime.combine(first, time.min), datetime.combine(second, time.min)
+    category = unique("Category")
+    kits = [unique("UTIL") for _ in range(3)]
+
+    def row(kit_id, at, action_type, status, batch_id=None):
+        return {"kit_id": kit_id, "action_type": action_type, "timestamp": at, "status": status, "category": category, "state": "Kerala", "batch_id": batch_id}
+    rows = [row(kit_id, _at(first, 9), ledger.INITIAL_ALLOCATION, ledger.AVAILABLE) for kit_id in kits] + [
+        row(kits[0], _at(first, 10), ledger.ALLOCATE, ledger.ALLOCATED, batch_id),
+        row(kits[1], _at(second, 9), ledger.ALLOCATE, ledger.ALLOCATED, batch_id),
+        row(kits[2], _at(second, 10), ledger.CONSUME, ledger.CONSUMED),
+        row(kits[0], _at(third, 9), ledger.RETURN, ledger.AVAILABLE),
+    ]
+    db.execute(insert(models.InventoryTransaction), ledger.stamp(db, rows))
+    db.query(models.UtilizationDaily).delete()
+    db.commit()
+    try:
+        # Incrementally, a day at a time past `second`, then all at once
+        utilization.refresh(db, until=second)
+        assert utilization.refresh(db, until=third) == 1
+        incremental = _daily(db)
+        db.query(models.UtilizationDaily).delete()
+        db.commit()
+        utilization.refresh(db, until=third)
+        assert _daily(db) == incremental
+
+        # Counted by hand: kits, allocated, active (batch running), idle, allocations, returns
+        history = {bucket["period"]: tuple(bucket[metric] for metric in METRICS) for bucket in utilization.history(db, first, third, category=category)}
+        assert history == {
+            first: (3, 1, 1, 2, 1, 0),
+            second: (2, 2, 2, 0, 1, 0),
+            third: (2, 1, 0, 1, 0, 1),
+        }
+        # Allocated kits are counted against their batch, the rest against no batch
+        per_batch = {bucket["period"]: bucket["allocated_kit_days"] for bucket in utilization.history(db, first, third, category=category, batch_id=batch_id)}
+        assert per_batch == {first: 1, second: 2, third: 1}
+        # Weekly buckets add the days up, wherever the week boundary falls
+        weeks = utilization.history(db, first, third, granularity="week", category=category)
+        assert all(week["period"].weekday() == 0 for week in weeks)
+        for index, metric in enumerate(METRICS):
+            assert sum(week[metric] for week in weeks) == sum(values[index] for values in history.values())
+    finally:
+        db.rollback()
+        db.query(models.InventoryTransaction).filter(models.InventoryTransaction.kit_id.in_(kits)).delete()
+        db.query(models.UtilizationDaily).delete()
+        db.commit()
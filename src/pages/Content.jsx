@@ -1,6 +1,9 @@
 import React, { useState, useEffect } from 'react';
 import { useAuth } from '../context/AuthContext';
-import { API_BASE_URL } from '../utils/api';
+import { API_BASE_URL, waitForSync } from '../utils/api';
+
+// Columns the table renders; the API selects only these (?fields=)
+const TABLE_FIELDS = 'id,title,category,duration_minutes,quality_checked,has_safety_checklist,has_troubleshooting,approval_status,ndu_reference_id';
 
 const Content = () => {
     const [contents, setContents] = useState([]);
@@ -13,7 +16,7 @@ const Content = () => {
 
     const fetchContent = async () => {
         try {
-            const response = await fetch(`${API_BASE_URL}/api/v1/content/`, {
+            const response = await fetch(`${API_BASE_URL}/api/v1/content/?fields=${TABLE_FIELDS}`, {
                 headers: {
                     'Authorization': `Bearer ${token}`
                 }
@@ -110,7 +113,12 @@ const Content = () => {
                                                             method: 'POST',
                                                             headers: { 'Authorization': `Bearer ${token}` }
                                                         });
-                                                        if (res.ok) fetchContent();
+                                                        if (res.ok) {
+                                                            const { status_url } = await res.json();
+                                                            const entry = await waitForSync(status_url, token);
+                                                            if (entry?.status === 'DEAD') alert("NDU sync failed: " + (entry.last_error || "Unknown error"));
+                                                            fetchContent();
+                                                        }
                                                     } catch (e) {
                                                         console.error("Sync failed", e);
                                                     }
@@ -2,8 +2,29 @@ import React, { useState, useEffect } from 'react';
 import { useAuth } from '../context/AuthContext';
 import { API_BASE_URL } from '../utils/api';
 
+// Counter names pushed by /dashboard/stream -> fields of /dashboard/stats
+const COUNTER_FIELDS = {
+    'inventory.total': 'inventory',
+    'batches.total': 'batches',
+    'content.total': 'content_total',
+    'content.category.Practical': 'content_practical',
+    'content.category.Pedagogy': 'content_pedagogy',
+    'content.pending_sync': 'pending_syncs',
+    'attendance.present': 'attendance_present',
+    'attendance.total': 'attendance_total',
+};
+
+// Delay before reopening a dropped stream (matches the server's SSE retry)
+const STREAM_RETRY_MS = 3000;
+
+const formatLogTime = (timestamp) => {
+    const d = new Date(timestamp);
+    const pad = (n) => String(n).padStart(2, '0');
+    return `${pad(d.getHours())}:${pad(d.getMinutes())} ${pad(d.getDate())}-${d.toLocaleString('en', { month: 'short' })}`;
+};
+
 const Dashboard = () => {
-    const { user } = useAuth();
+    const { user, token } = useAuth();
     const [stats, setStats] = useState({
         inventory: 0,
         batches: 0,
@@ -18,7 +39,7 @@ const Dashboard = () => {
             if (!user) return;
             try {
                 const res = await fetch(`${API_BASE_URL}/api/v1/dashboard/stats`, {
-                    headers: { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
+                    headers: { 'Authorization': `Bearer ${token}` }
                 });
                 if (res.ok) {
                     const data = await res.json();
@@ -29,7 +50,68 @@ const Dashboard = () => {
             }
         };
         fetchStats();
-    }, [user]);
+        if (!user) return;
+
+        // Live updates: counter deltas and new audit entries; refetch on every (re)connect.
+        // EventSource cannot send headers, so each connection opens with a fresh
+        // short-lived stream ticket; on error the stream is reopened with a new one.
+        let source = null;
+        let retry = null;
+        let closed = false;
+        const reconnect = () => {
+            if (source) source.close();
+            if (!closed) retry = setTimeout(connect, STREAM_RETRY_MS);
+        };
+        const connect = async () => {
+            let ticket;
+            try {
+                const res = await fetch(`${API_BASE_URL}/api/v1/dashboard/stream-ticket`, {
+                    method: 'POST',
+                    headers: { 'Authorization': `Bearer ${token}` }
+                });
+                if (!res.ok) throw new Error(`Stream ticket request failed: ${res.status}`);
+                ({ ticket } = await res.json());
+            } catch (e) {
+                console.error("Stream ticket failed", e);
+                reconnect();
+                return;
+            }
+            if (closed) return;
+            source = new EventSource(`${API_BASE_URL}/api/v1/dashboard/stream?ticket=${encodeURIComponent(ticket)}`);
+            source.onopen = fetchStats;
+            source.onerror = reconnect;
+            source.addEventListener('counters', (e) => {
+                const deltas = JSON.parse(e.data);
+                setStats(prev => {
+                    const next = { ...prev };
+                    for (const [name, delta] of Object.entries(deltas)) {
+                        const field = COUNTER_FIELDS[name];
+                        if (field) next[field] = (next[field] || 0) + delta;
+                    }
+                    next.attendance_rate = next.attendance_total
+                        ? Math.round(next.attendance_present / next.attendance_total * 10000) / 100
+                        : 0;
+                    return next;
+                });
+            });
+            source.addEventListener('audit', (e) => {
+                const log = JSON.parse(e.data);
+                setStats(prev => ({
+                    ...prev,
+                    recent_logs: [
+                        { action: log.action, user: log.user_id ? `User ${log.user_id}` : 'System', time: formatLogTime(log.timestamp) },
+                        ...(prev.recent_logs || []),
+                    ].slice(0, 5),
+                }));
+            });
+        };
+        connect();
+        return () => {
+            closed = true;
+            clearTimeout(retry);
+            if (source) source.close();
+        };
+    }, [user, token]);
 
     const statCards = [
         { label: 'Total Inventory Kits', value: stats.inventory, change: 'Live Count', color: 'bg-blue-500' },
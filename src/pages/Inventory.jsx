@@ -2,39 +2,43 @@ import React, { useState, useEffect } from 'react';
 import { useAuth } from '../context/AuthContext';
 import { API_BASE_URL } from '../utils/api';
 
+// Columns the table renders; the API selects only these (?fields=)
+const TABLE_FIELDS = 'id,kit_id,name,category,model,serial_number,state,district,status';
+
 const Inventory = () => {
     const [items, setItems] = useState([]);
     const [searchTerm, setSearchTerm] = useState('');
     const [showModal, setShowModal] = useState(false);
     const [currentItem, setCurrentItem] = useState(null); // For edit
+    const [nextCursor, setNextCursor] = useState(null); // Keyset cursor from X-Next-Cursor
     const { token } = useAuth();
 
+    // Search runs server-side (FTS index); debounce keystrokes
     useEffect(() => {
-        fetchInventory();
-    }, []);
+        const timer = setTimeout(() => fetchInventory(), 300);
+        return () => clearTimeout(timer);
+    }, [searchTerm]);
 
-    const fetchInventory = async () => {
+    const fetchInventory = async (cursor = null) => {
         try {
-            const response = await fetch(`${API_BASE_URL}/api/v1/inventory/`, {
+            const params = new URLSearchParams({ limit: '100', fields: TABLE_FIELDS });
+            if (searchTerm.trim()) params.set('q', searchTerm.trim());
+            if (cursor) params.set('cursor', cursor);
+            const response = await fetch(`${API_BASE_URL}/api/v1/inventory/?${params}`, {
                 headers: {
                     'Authorization': `Bearer ${token}`
                 }
             });
             if (response.ok) {
                 const data = await response.json();
-                setItems(data);
+                setItems(cursor ? (prev) => [...prev, ...data] : data);
+                setNextCursor(response.headers.get('X-Next-Cursor'));
             }
         } catch (error) {
             console.error("Failed to fetch inventory", error);
         }
     };
 
-    // Filter items
-    const filteredItems = items.filter(item =>
-        item.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
-        item.category.toLowerCase().includes(searchTerm.toLowerCase())
-    );
-
     const handleDelete = async (id) => {
         if (window.confirm('Are you sure you want to delete this item?')) {
             try {
@@ -62,35 +66,54 @@ const Inventory = () => {
         }
     };
 
-    // Hardening #1: PDF Report Generation (Clause 4.5)
-    const handleExportPDF = async () => {
-        // Audit Log Trigger
+    // Bulk vendor delivery import (CSV / XLSX)
+    const handleImport = async (e) => {
+        const file = e.target.files[0];
+        e.target.value = '';
+        if (!file) return;
+        const body = new FormData();
+        body.append('file', file);
         try {
-            await fetch(`${API_BASE_URL}/api/v1/inventory/audit-export`, {
+            const response = await fetch(`${API_BASE_URL}/api/v1/inventory/import`, {
                 method: 'POST',
-                headers: { 'Authorization': `Bearer ${token}` }
+                headers: { 'Authorization': `Bearer ${token}` },
+                body
             });
-        } catch (e) { console.error("Audit log failed"); }
+            const report = await response.json();
+            if (!response.ok) {
+                alert("Import failed: " + report.detail);
+                return;
+            }
+            const preview = report.errors.slice(0, 10).map(err => `Row ${err.row}: ${err.error}`).join('\n');
+            alert(`Imported ${report.created} of ${report.total} rows.` + (report.failed ? `\n${report.failed} rejected:\n${preview}` : ''));
+            fetchInventory();
+        } catch (error) {
+            console.error("Failed to import inventory", error);
+        }
+    };
 
-        import('jspdf').then(jsPDF => {
-            import('jspdf-autotable').then(() => {
-                const doc = new jsPDF.default();
-                doc.text("Project SAMARTH - Inventory Report", 14, 15);
-                doc.autoTable({
-                    head: [['Kit ID', 'Name', 'Category', 'Location', 'Status']],
-                    body: filteredItems.map(item => [
-                        item.kit_id,
-                        item.name,
-                        item.category,
-                        `${item.state}/${item.district}`,
-                        item.status
-                    ]),
-                    startY: 20
-                });
-                doc.save(`inventory_report_${new Date().toISOString().split('T')[0]}.pdf`);
-                alert("Compliance Verified: PDF Report Generated.");
+    // Hardening #1/#2: PDF & Excel Reports (Clause 4.5), streamed by the server
+    // with the current search applied; the server records the export audit.
+    const handleExport = async (format) => {
+        try {
+            const params = new URLSearchParams({ format });
+            if (searchTerm.trim()) params.set('q', searchTerm.trim());
+            const response = await fetch(`${API_BASE_URL}/api/v1/inventory/export?${params}`, {
+                headers: { 'Authorization': `Bearer ${token}` }
             });
-        });
+            if (!response.ok) {
+                alert("Export failed.");
+                return;
+            }
+            const url = URL.createObjectURL(await response.blob());
+            const link = document.createElement('a');
+            link.href = url;
+            link.download = `inventory_report_${new Date().toISOString().split('T')[0]}.${format}`;
+            link.click();
+            URL.revokeObjectURL(url);
+        } catch (error) {
+            console.error("Failed to export inventory", error);
+        }
     };
 
     return (
@@ -102,43 +125,21 @@ const Inventory = () => {
                 </div>
                 <div className="flex gap-3">
                     <button
-                        onClick={handleExportPDF}
+                        onClick={() => handleExport('pdf')}
                         className="btn btn-secondary border border-slate-300 text-slate-700 bg-white hover:bg-slate-50"
                     >
                         Export PDF
                     </button>
-                    {/* Hardening #2: Excel (XLSX) Export (Clause 4.5 Literal Compliance) */}
                     <button
-                        onClick={async () => {
-                            // Audit Log
-                            try {
-                                await fetch(`${API_BASE_URL}/api/v1/inventory/audit-export`, {
-                                    method: 'POST',
-                                    headers: { 'Authorization': `Bearer ${token}` }
-                                });
-                            } catch (e) { console.error("Audit log failed"); }
-
-                            // Excel Generation
-                            import('xlsx').then(XLSX => {
-                                const ws = XLSX.utils.json_to_sheet(filteredItems.map(item => ({
-                                    "Kit ID": item.kit_id,
-                                    "Item Name": item.name,
-                                    "Category": item.category,
-                                    "Model": item.model,
-                                    "Serial No": item.serial_number,
-                                    "Status": item.status,
-                                    "Location": `${item.state} - ${item.district} (${item.institution || 'N/A'})`
-                                })));
-                                const wb = XLSX.utils.book_new();
-                                XLSX.utils.book_append_sheet(wb, ws, "Inventory");
-                                XLSX.writeFile(wb, `Inventory_Report_${new Date().toISOString().split('T')[0]}.xlsx`);
-                                alert("Compliance Verified: Excel (.xlsx) Report Generated.");
-                            });
-                        }}
+                        onClick={() => handleExport('xlsx')}
                         className="btn btn-secondary border border-slate-300 text-slate-700 bg-white hover:bg-slate-50"
                     >
                         Export Excel
                     </button>
+                    <label className="btn btn-secondary border border-slate-300 text-slate-700 bg-white hover:bg-slate-50 cursor-pointer">
+                        Import CSV/Excel
+                        <input type="file" accept=".csv,.xlsx" className="hidden" onChange={handleImport} />
+                    </label>
                     <button className="btn btn-primary" onClick={() => { setCurrentItem(null); setShowModal(true); }}>
                         <span className="mr-2">+</span> Add New Item
                     </button>
@@ -169,7 +170,7 @@ const Inventory = () => {
                             </tr>
                         </thead>
                         <tbody className="divide-y divide-slate-100">
-                            {filteredItems.map((item) => (
+                            {items.map((item) => (
                                 <tr key={item.id} className="hover:bg-slate-50 transition-colors">
                                     <td className="px-6 py-4 whitespace-nowrap text-sm font-medium text-slate-900">{item.kit_id}</td>
                                     <td className="px-6 py-4 whitespace-nowrap text-sm text-slate-800">
@@ -202,7 +203,7 @@ const Inventory = () => {
                                     </td>
                                 </tr>
                             ))}
-                            {filteredItems.length === 0 && (
+                            {items.length === 0 && (
                                 <tr>
                                     <td colSpan="6" className="px-6 py-12 text-center text-slate-500">
                                         No items found matching your search.
@@ -212,6 +213,13 @@ const Inventory = () => {
                         </tbody>
                     </table>
                 </div>
+                {nextCursor && (
+                    <div className="p-4 border-t border-slate-100 text-center">
+                        <button className="btn btn-secondary" onClick={() => fetchInventory(nextCursor)}>
+                            Load more
+                        </button>
+                    </div>
+                )}
             </div>
 
             {/* Modal for Add/Edit */}
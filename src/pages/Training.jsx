@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useAuth } from '../context/AuthContext';
-import { API_BASE_URL } from '../utils/api';
+import { API_BASE_URL, waitForSync } from '../utils/api';
 
 const Training = () => {
     const [trainings, setTrainings] = useState([]);
@@ -13,7 +13,7 @@ const Training = () => {
 
     const fetchTrainings = async () => {
         try {
-            const response = await fetch(`${API_BASE_URL}/api/v1/training/`, {
+            const response = await fetch(`${API_BASE_URL}/api/v1/training/?expand=none`, {
                 headers: {
                     'Authorization': `Bearer ${token}`
                 }
@@ -74,7 +74,12 @@ const Training = () => {
                                                     method: 'POST',
                                                     headers: { 'Authorization': `Bearer ${token}` }
                                                 });
-                                                if (res.ok) fetchTrainings();
+                                                if (res.ok) {
+                                                    const { status_url } = await res.json();
+                                                    const entry = await waitForSync(status_url, token);
+                                                    if (entry?.status === 'DEAD') alert("NDU sync failed: " + (entry.last_error || "Unknown error"));
+                                                    fetchTrainings();
+                                                }
                                             } catch (e) { console.error("Sync failed", e); }
                                         }}
                                     >
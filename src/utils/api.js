@@ -4,3 +4,16 @@ const isVercel = typeof window !== 'undefined' && window.location.hostname.inclu
 export const API_BASE_URL = isVercel ? '' : (import.meta.env.VITE_API_URL || (import.meta.env.PROD ? '' : 'http://localhost:8000'));
 
 export const apiUrl = (path) => `${API_BASE_URL}${path}`;
+
+// NDU sync requests return 202 + status_url; poll until the outbox entry settles
+export const waitForSync = async (statusUrl, token, { interval = 1000, timeout = 30000 } = {}) => {
+    const deadline = Date.now() + timeout;
+    while (Date.now() < deadline) {
+        const res = await fetch(apiUrl(statusUrl), { headers: { 'Authorization': `Bearer ${token}` } });
+        if (!res.ok) throw new Error(`Status check failed (${res.status})`);
+        const entry = await res.json();
+        if (entry.status === 'DONE' || entry.status === 'DEAD') return entry;
+        await new Promise(resolve => setTimeout(resolve, interval));
+    }
+    return null;
+};